@@ -1,11 +1,16 @@
 """Chat API endpoints"""
 
 import logging
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, WebSocket, status
 from fastapi.responses import StreamingResponse
 
-from app.schemas.chat_schemas import ChatRequest, ChatResponse
+from app.config import settings
+from app.core.responses import FastJSONResponse, dumps
+from app.core.tracing import current_trace
+from app.schemas.chat_schemas import BatchChatRequest, ChatRequest, ChatResponse
+from app.services.batch_service import batch_service
 from app.services.chat_service import chat_service
+from app.services.chat_socket import ChatSocket
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -17,10 +22,13 @@ async def chat(request: ChatRequest):
     Process a chat message and return recommendations
     
     Args:
-        request: Chat request with message and optional session/location
+        request: Chat request with message and optional session/location;
+            include_timings adds the request's span waterfall to metadata
         
     Returns:
-        Chat response with AI message and restaurant recommendations
+        Chat response with AI message and restaurant recommendations;
+        restaurants come normalized from the tool boundary, so the result is
+        serialized as is instead of being validated into ChatResponse
     """
     try:
         result = await chat_service.process_message(
@@ -30,7 +38,11 @@ async def chat(request: ChatRequest):
             preferences=request.preferences
         )
         
-        return ChatResponse(**result)
+        trace = current_trace()
+        if request.include_timings and trace is not None:
+            result["metadata"]["timings"] = trace.waterfall()
+        
+        return FastJSONResponse(result)
     
     except Exception as e:
         logger.error(f"Error processing chat request: {e}", exc_info=True)
@@ -40,6 +52,51 @@ async def chat(request: ChatRequest):
         )
 
 
+@router.post("/chat/batch")
+async def chat_batch(request: BatchChatRequest):
+    """
+    Answer many independent chat queries, streamed as JSON lines
+    
+    Queries share their geocodes, searches and review lookups and have
+    their embeddings requested together (see BatchService), so a bulk job
+    costs a fraction of the upstream calls of one request per query.
+    
+    Args:
+        request: Queries (chat requests) and whether to keep their sessions
+        
+    Returns:
+        application/x-ndjson stream with one chat result per line, tagged
+        with the query's index and in completion order
+    """
+    if len(request.queries) > settings.batch_max_queries:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A batch takes at most {settings.batch_max_queries} queries"
+        )
+    
+    async def lines():
+        async for result in batch_service.run(request.queries, keep_sessions=request.keep_sessions):
+            yield dumps(result) + b"\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.websocket("/chat/ws")
+async def chat_websocket(websocket: WebSocket):
+    """
+    Chat over a persistent WebSocket connection
+    
+    Streams restaurants and answer tokens per turn, runs turns of several
+    sessions concurrently and lets the client cancel a turn in flight
+    (see ChatSocket for the frame protocol).
+    
+    Args:
+        websocket: Client connection
+    """
+    await websocket.accept()
+    await ChatSocket(websocket).run()
+
+
 @router.get("/chat/session/{session_id}")
 async def get_session(session_id: str):
     """
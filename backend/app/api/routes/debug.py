@@ -0,0 +1,276 @@
+"""Admin-only diagnostics endpoints"""
+
+import asyncio
+import hmac
+import logging
+from typing import Any, Dict, Optional, Set
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.core.cache import cache_manager, cache_namespaces
+from app.core.embeddings import embedding_service
+from app.core.gazetteer import gazetteer
+from app.core.lexical_index import lexical_index
+from app.core.memory import allocation_tracker, deep_sizeof, lru_stats, process_memory
+from app.core.profiler import profiler
+from app.core.query_parser import query_parser
+from app.core.spatial_index import spatial_index
+from app.core.tracing import span_exporter
+from app.core.vector_store import vector_store
+from app.services.chat_service import chat_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Whether a token matches settings.admin_token (always False while unset)"""
+    return bool(settings.admin_token) and token is not None and hmac.compare_digest(
+        token.encode(), settings.admin_token.encode()
+    )
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Reject requests without the admin token; hide the endpoints while it is unset"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def profile(
+    seconds: float = Query(default=10.0, gt=0, description="Profile duration"),
+    interval: Optional[float] = Query(
+        default=None, ge=0.001, description="Seconds between samples"
+    ),
+    format: str = Query(default="collapsed", pattern="^(collapsed|json)$"),
+    include_idle: bool = Query(
+        default=False, description="Keep samples of the loop waiting for I/O"
+    )
+):
+    """
+    Sample this worker's event loop for a number of seconds
+    
+    Args:
+        seconds: Profile duration (capped at settings.profile_max_seconds)
+        interval: Seconds between samples (default settings.profile_interval)
+        format: "collapsed" stacks for flamegraph.pl/speedscope, or a "json" summary
+        include_idle: Keep samples of the loop waiting for I/O
+        
+    Returns:
+        Collapsed stacks (text) or the profile summary
+    """
+    seconds = min(seconds, settings.profile_max_seconds)
+    logger.info(f"Profiling event loop for {seconds:.1f}s")
+    session = await profiler.profile(seconds, interval or settings.profile_interval, include_idle)
+    
+    if format == "json":
+        return session.summary()
+    return PlainTextResponse(session.collapsed(), headers={"X-Profile-Id": session.id})
+
+
+@router.get("/profile/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(
+    profile_id: str,
+    format: str = Query(default="collapsed", pattern="^(collapsed|json)$")
+):
+    """
+    Get a recent profile, e.g. one recorded for a request sent with X-Profile
+    
+    Args:
+        profile_id: Profile ID (X-Profile-Id response header)
+        format: "collapsed" stacks or a "json" summary
+        
+    Returns:
+        Collapsed stacks (text) or the profile summary
+    """
+    session = profiler.recent.get(profile_id)
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    
+    if format == "json":
+        return session.summary()
+    return PlainTextResponse(session.collapsed())
+
+
+def _in_process_report() -> Dict[str, Any]:
+    # Shared objects (e.g. payloads held by both indexes) count once, against
+    # the first component that reaches them
+    seen: Set[int] = set()
+    
+    session_sizes = []
+    for session_id, session in list(chat_service.sessions.items()):
+        session_sizes.append((deep_sizeof(session, seen), len(session.messages), session_id))
+    session_sizes.sort(reverse=True)
+    
+    lexical_bytes = (
+        deep_sizeof(lexical_index.docs, seen) + deep_sizeof(lexical_index.postings, seen)
+    )
+    spatial_bytes = sum(
+        deep_sizeof(part, seen)
+        for part in (spatial_index.cells, spatial_index.points, spatial_index.records)
+    )
+    
+    return {
+        "process": process_memory(),
+        "sessions": {
+            "count": len(session_sizes),
+            "messages": sum(messages for _, messages, _ in session_sizes),
+            "estimated_bytes": sum(size for size, _, _ in session_sizes),
+            "largest": [
+                {"session_id": session_id, "messages": messages, "estimated_bytes": size}
+                for size, messages, session_id in session_sizes[:5]
+            ]
+        },
+        "caches": {
+            "query_parser": lru_stats(query_parser.parse),
+            "gazetteer": lru_stats(gazetteer.lookup),
+            "query_embeddings": {
+                "entries": len(embedding_service.query_cache),
+                "max_entries": settings.query_embedding_cache_size,
+                "estimated_bytes": deep_sizeof(embedding_service.query_cache, seen)
+            },
+            "profiles": {"entries": len(profiler.recent), "max_entries": settings.profile_keep},
+            "trace_export_queue": {
+                "entries": len(span_exporter._queue),
+                "max_entries": settings.trace_max_queue
+            },
+            "tracemalloc_snapshots": {
+                "entries": len(allocation_tracker.snapshots),
+                "max_entries": settings.memory_snapshot_keep
+            }
+        },
+        "indexes": {
+            "lexical": {
+                "documents": len(lexical_index),
+                "terms": len(lexical_index.postings),
+                "estimated_bytes": lexical_bytes
+            },
+            "spatial": {
+                "restaurants": len(spatial_index),
+                "cells": len(spatial_index.cells),
+                "estimated_bytes": spatial_bytes
+            }
+        }
+    }
+
+
+async def _vector_index_report() -> Dict[str, Any]:
+    try:
+        stats = await asyncio.wait_for(vector_store.get_collection_stats(), timeout=5.0)
+    except Exception as e:
+        return {"error": str(e) or type(e).__name__}
+    
+    points = stats.get("points_count") or 0
+    return {
+        "collection": settings.qdrant_collection,
+        "points": points,
+        "status": str(stats.get("status")) if stats else None,
+        # Held by Qdrant, not this worker: float32 vectors before index overhead
+        "estimated_vector_bytes": points * settings.embedding_dimension * 4
+    }
+
+
+@router.get("/memory", dependencies=[Depends(require_admin)])
+async def memory(
+    include_redis: bool = Query(default=True, description="Count Redis cache keys per namespace")
+):
+    """
+    Report what this worker's memory is used by
+    
+    In-process structures are measured by walking their references (off
+    the event loop), so sizes are estimates and shared objects are counted
+    once.
+    
+    Args:
+        include_redis: Count Redis cache keys per namespace (SCAN)
+        
+    Returns:
+        Process RSS, chat sessions, caches, index footprints and tracemalloc status
+    """
+    report = await asyncio.to_thread(_in_process_report)
+    report["indexes"]["vector"] = await _vector_index_report()
+    if include_redis:
+        report["caches"]["redis"] = await cache_manager.namespace_stats(cache_namespaces)
+    report["tracemalloc"] = allocation_tracker.status()
+    return report
+
+
+@router.post("/memory/tracemalloc", dependencies=[Depends(require_admin)])
+async def start_tracemalloc(
+    frames: int = Query(default=1, ge=1, le=50, description="Stack frames per allocation")
+):
+    """
+    Start tracing allocations (slows allocation-heavy code until stopped)
+    
+    Args:
+        frames: Stack frames recorded per allocation
+        
+    Returns:
+        tracemalloc status
+    """
+    allocation_tracker.start(frames)
+    return allocation_tracker.status()
+
+
+@router.delete("/memory/tracemalloc", dependencies=[Depends(require_admin)])
+async def stop_tracemalloc():
+    """Stop tracing allocations and drop all snapshots"""
+    allocation_tracker.stop()
+    return allocation_tracker.status()
+
+
+@router.post("/memory/snapshots", dependencies=[Depends(require_admin)])
+async def take_snapshot(
+    compare_to: Optional[str] = Query(default=None, description="Earlier snapshot to diff against"),
+    group_by: str = Query(default="lineno", pattern="^(lineno|filename|traceback)$"),
+    top: int = Query(default=25, ge=1, le=500)
+):
+    """
+    Take a tracemalloc snapshot
+    
+    Args:
+        compare_to: Earlier snapshot to diff against
+        group_by: Group allocations by "lineno", "filename" or "traceback"
+        top: Number of allocation sites to report
+        
+    Returns:
+        Snapshot ID with its largest allocation sites (or growth since compare_to)
+    """
+    if compare_to is not None and compare_to not in allocation_tracker.snapshots:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+    try:
+        snapshot_id = await asyncio.to_thread(allocation_tracker.take_snapshot)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return await asyncio.to_thread(allocation_tracker.top, snapshot_id, compare_to, group_by, top)
+
+
+@router.get("/memory/snapshots/{snapshot_id}", dependencies=[Depends(require_admin)])
+async def get_snapshot(
+    snapshot_id: str,
+    compare_to: Optional[str] = Query(default=None, description="Earlier snapshot to diff against"),
+    group_by: str = Query(default="lineno", pattern="^(lineno|filename|traceback)$"),
+    top: int = Query(default=25, ge=1, le=500)
+):
+    """
+    Report a tracemalloc snapshot, or its growth since an earlier one
+    
+    Args:
+        snapshot_id: Snapshot ID
+        compare_to: Earlier snapshot to diff against
+        group_by: Group allocations by "lineno", "filename" or "traceback"
+        top: Number of allocation sites to report
+        
+    Returns:
+        Largest allocation sites (or growth since compare_to)
+    """
+    try:
+        return await asyncio.to_thread(
+            allocation_tracker.top, snapshot_id, compare_to, group_by, top
+        )
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
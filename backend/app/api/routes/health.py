@@ -1,13 +1,14 @@
 """Health check endpoints"""
 
 import logging
+from typing import Any, Dict
 from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from app.config import settings
-from app.mcp_server.client import mcp_client
-from app.core.cache import cache_manager
-from app.core.vector_store import vector_store
+from app.services.health_service import health_service
+from app.services.startup import startup_manager
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -19,58 +20,30 @@ class HealthResponse(BaseModel):
     version: str
     environment: str
     services: dict
+    upstreams: Dict[str, Dict[str, Any]] = {}
+    latency_ms: Dict[str, float] = {}
+    checked_at: float
 
 
 @router.get("/health", response_model=HealthResponse, status_code=status.HTTP_200_OK)
 async def health_check():
     """
     Check application health and service status
-    """
-    services = {
-        "mcp_server": "unknown",
-        "cache": "unknown",
-        "vector_db": "unknown"
-    }
-    
-    # Check MCP server
-    try:
-        if mcp_client._connected:
-            services["mcp_server"] = "healthy"
-        else:
-            services["mcp_server"] = "disconnected"
-    except Exception as e:
-        logger.error(f"MCP server health check failed: {e}")
-        services["mcp_server"] = "unhealthy"
     
-    # Check cache
-    try:
-        if cache_manager._connected:
-            services["cache"] = "healthy"
-        else:
-            services["cache"] = "disconnected"
-    except Exception as e:
-        logger.error(f"Cache health check failed: {e}")
-        services["cache"] = "unhealthy"
-    
-    # Check vector DB
-    try:
-        if vector_store._initialized:
-            stats = await vector_store.get_collection_stats()
-            if stats:
-                services["vector_db"] = "healthy"
-            else:
-                services["vector_db"] = "unhealthy"
-        else:
-            services["vector_db"] = "not_initialized"
-    except Exception as e:
-        logger.error(f"Vector DB health check failed: {e}")
-        services["vector_db"] = "unhealthy"
+    Redis and Qdrant are pinged concurrently, each with a timeout; the
+    result is cached for a few seconds so frequent probes stay cheap.
+    """
+    health = await health_service.check()
+    healthy = (
+        all(s == "healthy" for s in health["services"].values()) and
+        all(u["state"] in ("healthy", "idle") for u in health["upstreams"].values())
+    )
     
     return HealthResponse(
-        status="healthy" if all(s == "healthy" for s in services.values()) else "degraded",
+        status="healthy" if healthy else "degraded",
         version="1.0.0",
         environment=settings.app_env,
-        services=services
+        **health
     )
 
 
@@ -78,16 +51,24 @@ async def health_check():
 async def readiness_check():
     """
     Check if application is ready to serve requests
+    
+    Not ready (503) until the startup warm-up has finished, or while a
+    required dependency is down.
     """
-    ready = (
-        mcp_client._connected and
-        cache_manager._connected
-    )
+    health = await health_service.check()
+    readiness = health_service.readiness(health)
     
-    if ready:
+    if readiness["ready"]:
         return {"status": "ready"}
-    else:
-        return {"status": "not_ready"}, 503
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "warming_up" if "warming_up" in readiness["reasons"] else "not_ready",
+            "reasons": readiness["reasons"],
+            "services": health["services"],
+            "warmup": startup_manager.steps
+        }
+    )
 
 
 @router.get("/liveness")
@@ -9,8 +9,11 @@ from app.schemas.restaurant_schemas import (
     RestaurantSearchResponse,
     RestaurantDetailsRequest
 )
+from app.core.responses import FastJSONResponse
+from app.core.spatial_index import spatial_index
+from app.core.timing import stage
 from app.mcp_server.client import mcp_client
-from app.models.restaurant import Restaurant
+from app.models.restaurant import RestaurantRecord
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -29,32 +32,90 @@ async def search_restaurants(request: RestaurantSearchRequest):
     """
     try:
         # Search using Yelp
-        result = await mcp_client.search_restaurants(
-            location=request.location,
-            latitude=request.latitude,
-            longitude=request.longitude,
-            term=request.query,
-            categories=request.categories,
-            price=request.price,
-            radius=request.radius,
-            limit=request.limit,
-            sort_by=request.sort_by
+        with stage("yelp"):
+            result = await mcp_client.search_restaurants(
+                location=request.location,
+                latitude=request.latitude,
+                longitude=request.longitude,
+                term=request.query,
+                categories=request.categories,
+                price=request.price,
+                radius=request.radius,
+                limit=request.limit,
+                sort_by=request.sort_by
+            )
+        
+        # Records come from the MCP client already projected; skip
+        # re-validating them into RestaurantSearchResponse
+        return FastJSONResponse({
+            "restaurants": [business.to_response() for business in result.get("businesses", [])],
+            "total": result.get("total", 0),
+            "query": request.query
+        })
+    
+    except Exception as e:
+        logger.error(f"Error searching restaurants: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search restaurants"
         )
+
+
+@router.get("/restaurants/nearby")
+async def get_nearby_restaurants(
+    latitude: float = Query(..., description="Latitude"),
+    longitude: float = Query(..., description="Longitude"),
+    radius: int = Query(default=5000, description="Search radius in meters"),
+    limit: int = Query(default=20, ge=1, le=50)
+):
+    """
+    Get restaurants near a location
+    
+    Served from the in-memory spatial index of the ingested catalog; Yelp
+    is only called for areas that have not been ingested.
+    
+    Args:
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Search radius in meters
+        limit: Number of results
         
-        businesses = result.get("businesses", [])
-        total = result.get("total", 0)
+    Returns:
+        List of nearby restaurants
+    """
+    try:
+        spatial_index.refresh()
+        if spatial_index.covers(latitude, longitude):
+            restaurants, total = spatial_index.within_radius(
+                latitude, longitude, radius, limit=limit
+            )
+            if restaurants:
+                return FastJSONResponse({
+                    "restaurants": [
+                        RestaurantRecord.from_upstream(restaurant).to_response()
+                        for restaurant in restaurants
+                    ],
+                    "total": total
+                })
         
-        return RestaurantSearchResponse(
-            restaurants=businesses,
-            total=total,
-            query=request.query
+        result = await mcp_client.search_restaurants(
+            latitude=latitude,
+            longitude=longitude,
+            radius=radius,
+            limit=limit,
+            categories="restaurants"
         )
+        
+        return FastJSONResponse({
+            "restaurants": [business.to_response() for business in result.get("businesses", [])],
+            "total": result.get("total", 0)
+        })
     
     except Exception as e:
-        logger.error(f"Error searching restaurants: {e}", exc_info=True)
+        logger.error(f"Error getting nearby restaurants: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to search restaurants"
+            detail="Failed to get nearby restaurants"
         )
 
 
@@ -66,6 +127,9 @@ async def get_restaurant_details(
     """
     Get detailed information about a restaurant
     
+    Search and chat only keep compact RestaurantRecords; the full Yelp
+    business (hours, photos, transactions) is fetched here, on demand.
+    
     Args:
         restaurant_id: Restaurant ID
         include_reviews: Whether to include reviews
@@ -98,45 +162,3 @@ async def get_restaurant_details(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get restaurant details"
         )
-
-
-@router.get("/restaurants/nearby")
-async def get_nearby_restaurants(
-    latitude: float = Query(..., description="Latitude"),
-    longitude: float = Query(..., description="Longitude"),
-    radius: int = Query(default=5000, description="Search radius in meters"),
-    limit: int = Query(default=20, ge=1, le=50)
-):
-    """
-    Get restaurants near a location
-    
-    Args:
-        latitude: Latitude coordinate
-        longitude: Longitude coordinate
-        radius: Search radius in meters
-        limit: Number of results
-        
-    Returns:
-        List of nearby restaurants
-    """
-    try:
-        result = await mcp_client.search_restaurants(
-            latitude=latitude,
-            longitude=longitude,
-            radius=radius,
-            limit=limit,
-            categories="restaurants"
-        )
-        
-        return {
-            "restaurants": result.get("businesses", []),
-            "total": result.get("total", 0)
-        }
-    
-    except Exception as e:
-        logger.error(f"Error getting nearby restaurants: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to get nearby restaurants"
-        )
-
@@ -1,6 +1,6 @@
 """Application configuration management"""
 
-from typing import Literal
+from typing import Dict, List, Literal, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -25,6 +25,53 @@ class Settings(BaseSettings):
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
     frontend_url: str = "http://localhost:3000"
+    server_timing_enabled: bool = True  # per-stage durations in a Server-Timing header
+    metrics_enabled: bool = True  # Prometheus metrics at /metrics
+    
+    # WebSocket chat (/api/v1/chat/ws)
+    ws_max_turns: int = 4  # turns in flight per connection
+    ws_send_queue_size: int = 64  # outgoing frames buffered per connection
+    ws_send_timeout: float = 30.0  # seconds a send may block before the client is dropped
+    
+    # Batch chat (/api/v1/chat/batch)
+    batch_max_queries: int = 5000
+    batch_concurrency: int = 8  # queries answered at once (one LLM call each)
+    batch_chunk_size: int = 100  # queries whose embeddings are requested together
+    
+    # Tracing: spans are recorded per request; sampled traces are exported
+    # as OTLP/JSON to a file or an OTLP/HTTP collector
+    tracing_enabled: bool = True
+    trace_sample_rate: float = 0.1
+    trace_export: Literal["none", "file", "otlp"] = "none"
+    trace_file: str = "data/traces.jsonl"
+    trace_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    trace_export_interval: float = 5.0  # seconds
+    trace_max_queue: int = 1000  # pending traces before the oldest are dropped
+    
+    # Startup warm-up: /readiness reports ready once the vector store is
+    # initialized and popular queries and top cities have been fetched
+    warmup_enabled: bool = True
+    warmup_timeout: float = 30.0  # seconds before readiness flips regardless
+    warmup_queries: List[str] = Field(default_factory=lambda: [
+        "italian restaurants",
+        "best sushi",
+        "cheap eats",
+        "vegetarian restaurants",
+        "coffee shops"
+    ])
+    warmup_locations: List[str] = Field(default_factory=lambda: [
+        "San Francisco, CA",
+        "New York, NY",
+        "Los Angeles, CA"
+    ])
+    
+    # Debug endpoints (/debug/*) require this token in X-Admin-Token; they
+    # are disabled while it is empty
+    admin_token: str = Field(default="")
+    profile_interval: float = 0.005  # seconds between profiler samples
+    profile_max_seconds: float = 60.0
+    profile_keep: int = 20  # finished profiles kept for retrieval
+    memory_snapshot_keep: int = 5  # tracemalloc snapshots kept for comparison
     
     # API Keys
     openai_api_key: str = Field(default="")
@@ -42,6 +89,7 @@ class Settings(BaseSettings):
     # Embeddings
     embedding_model: str = "text-embedding-3-large"
     embedding_dimension: int = 1536
+    query_embedding_cache_size: int = 1024  # in-process LRU of query embeddings
     
     # Vector Database
     vector_db_type: Literal["qdrant", "pinecone"] = "qdrant"
@@ -64,16 +112,91 @@ class Settings(BaseSettings):
     mcp_server_version: str = "1.0.0"
     mcp_timeout: int = 30
     mcp_max_retries: int = 3
+    health_check_timeout: float = 2.0  # seconds per dependency probe
+    health_cache_ttl: float = 5.0  # seconds a health result is reused by probes
+    upstream_health_window: float = 60.0  # seconds of upstream calls judged
+    upstream_failing_rate: float = 0.5  # failure rate at which an upstream is failing
+    http_max_connections: int = 100
+    http_max_keepalive: int = 20
+    
+    # Upstream mode: live network, record cassettes, replay cassettes
+    # (templates for unrecorded calls) or synthetic templates only
+    upstream_mode: Literal["live", "record", "replay", "synthetic"] = "live"
+    cassette_dir: str = "data/cassettes"
+    replay_latency_ms: Dict[str, float] = Field(default_factory=lambda: {
+        "default": 80.0,
+        "api.openai.com": 600.0,
+        "api.anthropic.com": 800.0
+    })
+    replay_latency_distribution: Literal[
+        "fixed", "uniform", "lognormal", "exponential"
+    ] = "lognormal"
+    replay_latency_spread: float = 0.5
+    replay_error_rate: float = 0.0
+    replay_timeout_rate: float = 0.0
+    replay_seed: Optional[int] = None
     
     # Rate Limiting
     yelp_rate_limit: int = 5000
     google_rate_limit: int = 10000
     rate_limit_per_minute: int = 60
+    # Budget for bulk Yelp traffic (search paging, ingestion); chat turns
+    # call Yelp directly
+    yelp_requests_per_second: float = 5.0
+    yelp_max_concurrency: int = 5
+    yelp_max_results: int = 240  # Yelp rejects offset + limit beyond this
+    google_requests_per_second: float = 10.0
+    google_max_concurrency: int = 10
     
     # Search Configuration
     default_search_radius: int = 5000  # meters
     default_search_limit: int = 20
     max_restaurants_return: int = 10
+    candidate_max_distance: int = 25000  # meters, applied to merged candidates
+    spatial_cell_size: float = 0.01  # degrees (~1.1 km)
+    taxonomy_path: str = ""  # defaults to the bundled app/data/taxonomy.json
+    gazetteer_path: str = ""  # defaults to the bundled app/data/gazetteer.json
+    reverse_geocode_precision: int = 3  # decimal places of the cache cell (~110 m)
+    boundaries_path: str = ""  # optional GeoJSON with city/state/zip_code polygons
+    
+    # Hybrid retrieval
+    lexical_index_path: str = "data/lexical_index.json"
+    bm25_k1: float = 1.5
+    bm25_b: float = 0.75
+    rrf_k: int = 60
+    fusion_weight_yelp: float = 1.0
+    fusion_weight_vector: float = 1.0
+    fusion_weight_lexical: float = 1.0
+    fusion_weight_google: float = 1.0
+    google_places_enabled: bool = True
+    source_timeout: float = 8.0  # seconds per retrieval source
+    
+    # Entity resolution across sources
+    entity_cell_size: float = 0.002  # degrees (~220 m)
+    entity_match_distance: float = 150.0  # meters
+    entity_name_similarity: float = 0.6  # name token overlap coefficient
+    
+    # Reranking (weights file, if set, overrides rerank_weights)
+    rerank_weights: Dict[str, float] = Field(default_factory=lambda: {
+        "retrieval": 1.0,
+        "semantic": 0.5,
+        "proximity": 0.75,
+        "rating": 0.5,
+        "review_count": 0.25,
+        "price_match": 0.5,
+        "category_match": 0.5,
+        "open": 1.0,
+        "ambience_match": 0.5
+    })
+    rerank_weights_path: str = ""
+    
+    # Ingestion
+    ingest_manifest_path: str = "data/ingest_manifest.json"
+    ingest_batch_size: int = 100
+    ingest_concurrency: int = 5
+    ingest_max_per_location: int = 240
+    index_reviews: bool = True
+    review_snippets_per_restaurant: int = 3
     
     @property
     def redis_url(self) -> str:
@@ -0,0 +1,154 @@
+"""Local point-in-polygon lookup of administrative boundaries"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# GeoJSON properties copied onto reverse-geocode results
+ADDRESS_FIELDS = ("city", "state", "zip_code", "country")
+
+
+def _point_in_ring(longitude: float, latitude: float, ring: np.ndarray) -> bool:
+    """Even-odd ray casting test against one closed (N x 2) lng/lat ring"""
+    x1, y1 = ring[:-1, 0], ring[:-1, 1]
+    x2, y2 = ring[1:, 0], ring[1:, 1]
+    crosses = (y1 > latitude) != (y2 > latitude)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_at = x1 + (latitude - y1) * (x2 - x1) / (y2 - y1)
+    return bool(np.count_nonzero(crosses & (longitude < x_at)) % 2)
+
+
+class BoundaryIndex:
+    """
+    Polygons (cities, postal codes, ...) loaded from a GeoJSON file
+    
+    Candidate polygons are found with one vectorized bounding-box test and
+    then checked with ray casting; the address fields of every polygon that
+    contains the point are merged, so overlapping city and postal code
+    layers combine into one address.
+    """
+    
+    def __init__(self, features: Optional[List[Dict[str, Any]]] = None):
+        self.polygons: List[List[np.ndarray]] = []
+        self.properties: List[Dict[str, Any]] = []
+        boxes = []
+        
+        for feature in features or []:
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") == "Polygon":
+                parts = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                parts = geometry["coordinates"]
+            else:
+                continue
+            
+            properties = {
+                field: value for field, value in (feature.get("properties") or {}).items()
+                if field in ADDRESS_FIELDS and value
+            }
+            for part in parts:
+                rings = [np.asarray(ring, dtype=float)[:, :2] for ring in part if len(ring) >= 3]
+                if not rings:
+                    continue
+                outer = rings[0]
+                boxes.append((
+                    outer[:, 0].min(), outer[:, 1].min(),
+                    outer[:, 0].max(), outer[:, 1].max()
+                ))
+                self.polygons.append(rings)
+                self.properties.append(properties)
+        
+        self.boxes = np.array(boxes, dtype=float).reshape(-1, 4)
+    
+    def __len__(self) -> int:
+        return len(self.polygons)
+    
+    @classmethod
+    def from_file(cls, path: str) -> "BoundaryIndex":
+        """Create an index from a GeoJSON FeatureCollection"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f).get("features", []))
+    
+    def _contains(self, idx: int, longitude: float, latitude: float) -> bool:
+        outer, *holes = self.polygons[idx]
+        if not _point_in_ring(longitude, latitude, outer):
+            return False
+        return not any(_point_in_ring(longitude, latitude, hole) for hole in holes)
+    
+    def lookup(self, latitude: float, longitude: float) -> Dict[str, Any]:
+        """
+        Address fields of the polygons containing a point
+        
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            
+        Returns:
+            Merged city/state/zip_code/country fields (empty if none match)
+        """
+        if not self.polygons:
+            return {}
+        
+        boxes = self.boxes
+        candidates = np.flatnonzero(
+            (boxes[:, 0] <= longitude) & (longitude <= boxes[:, 2])
+            & (boxes[:, 1] <= latitude) & (latitude <= boxes[:, 3])
+        )
+        
+        fields: Dict[str, Any] = {}
+        for idx in candidates.tolist():
+            if self._contains(idx, longitude, latitude):
+                for field, value in self.properties[idx].items():
+                    fields.setdefault(field, value)
+        return fields
+    
+    def address(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        """
+        A reverse-geocode result built from local polygons
+        
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            
+        Returns:
+            Result shaped like the remote reverse geocoder's, or None unless
+            at least the city and state are known locally
+        """
+        fields = self.lookup(latitude, longitude)
+        if not fields.get("city") or not fields.get("state"):
+            return None
+        
+        region = fields["state"]
+        if fields.get("zip_code"):
+            region = f"{region} {fields['zip_code']}"
+        country = fields.get("country", "US")
+        country_name = "USA" if country == "US" else country
+        return {
+            "formatted_address": f"{fields['city']}, {region}, {country_name}",
+            "place_id": None,
+            **fields,
+            "source": "boundaries"
+        }
+
+
+def load_boundaries() -> BoundaryIndex:
+    """Create the boundary index from the configured GeoJSON file (empty if unset)"""
+    if not settings.boundaries_path:
+        return BoundaryIndex()
+    try:
+        index = BoundaryIndex.from_file(settings.boundaries_path)
+        logger.info(f"Loaded {len(index)} boundary polygons")
+        return index
+    except Exception as e:
+        logger.error(f"Failed to load boundaries from {settings.boundaries_path}: {e}")
+        return BoundaryIndex()
+
+
+# Global boundary index instance
+boundaries = load_boundaries()
@@ -2,11 +2,13 @@
 
 import json
 import logging
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 from functools import wraps
 import redis.asyncio as redis
 
 from app.config import settings
+from app.core.metrics import CACHE_ERRORS, CACHE_REQUESTS
+from app.core.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +42,12 @@ class CacheManager:
             self._connected = False
             logger.info("Redis connection closed")
     
+    async def ping(self) -> bool:
+        """Check that Redis answers (False when not connected)"""
+        if not self._connected:
+            return False
+        return bool(await self.redis_client.ping())
+    
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         if not self._connected:
@@ -51,6 +59,7 @@ class CacheManager:
                 return json.loads(value)
             return None
         except Exception as e:
+            CACHE_ERRORS.labels("get").inc()
             logger.warning(f"Cache get error for key {key}: {e}")
             return None
     
@@ -70,6 +79,7 @@ class CacheManager:
             await self.redis_client.setex(key, ttl, serialized_value)
             return True
         except Exception as e:
+            CACHE_ERRORS.labels("set").inc()
             logger.warning(f"Cache set error for key {key}: {e}")
             return False
     
@@ -82,6 +92,7 @@ class CacheManager:
             await self.redis_client.delete(key)
             return True
         except Exception as e:
+            CACHE_ERRORS.labels("delete").inc()
             logger.warning(f"Cache delete error for key {key}: {e}")
             return False
     
@@ -93,14 +104,71 @@ class CacheManager:
         try:
             return await self.redis_client.exists(key) > 0
         except Exception as e:
+            CACHE_ERRORS.labels("exists").inc()
             logger.warning(f"Cache exists check error for key {key}: {e}")
             return False
+    
+    async def namespace_stats(
+        self,
+        key_prefixes: Dict[str, str],
+        max_keys: int = 10000,
+        sample_size: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Key counts and estimated sizes of cache namespaces
+        
+        Keys are counted with SCAN (stopping at max_keys per namespace) and
+        sizes extrapolated from MEMORY USAGE of a sample of keys.
+        
+        Args:
+            key_prefixes: Namespace to key prefix
+            max_keys: Keys counted per namespace before giving up
+            sample_size: Keys per namespace measured with MEMORY USAGE
+            
+        Returns:
+            Dictionary with Redis used_memory and per-namespace stats
+        """
+        if not self._connected:
+            return {"connected": False}
+        
+        try:
+            info = await self.redis_client.info("memory")
+            namespaces = {}
+            for namespace, prefix in key_prefixes.items():
+                keys = 0
+                sampled = []
+                async for key in self.redis_client.scan_iter(match=f"{prefix}*", count=1000):
+                    keys += 1
+                    if len(sampled) < sample_size:
+                        sampled.append(key)
+                    if keys >= max_keys:
+                        break
+                
+                sizes = [await self.redis_client.memory_usage(key) or 0 for key in sampled]
+                namespaces[namespace] = {
+                    "keys": keys,
+                    "truncated": keys >= max_keys,
+                    "estimated_bytes": int(sum(sizes) / len(sizes) * keys) if sizes else 0
+                }
+            return {
+                "connected": True,
+                "used_memory_bytes": info.get("used_memory"),
+                "namespaces": namespaces
+            }
+        except Exception as e:
+            CACHE_ERRORS.labels("stats").inc()
+            logger.warning(f"Cache namespace stats error: {e}")
+            return {"connected": True, "error": str(e)}
 
 
 # Global cache manager instance
 cache_manager = CacheManager()
 
 
+# Namespace of each @cached function to the prefix of its keys
+cache_namespaces: Dict[str, str] = {}
+
+
 def cached(ttl: Optional[int] = None, key_prefix: str = ""):
     """
     Decorator for caching function results
@@ -110,13 +178,29 @@ def cached(ttl: Optional[int] = None, key_prefix: str = ""):
         key_prefix: Prefix for cache key
     """
     def decorator(func):
+        namespace = key_prefix.rstrip(":") or func.__name__
+        cache_namespaces[namespace] = f"{key_prefix}{func.__name__}:"
+        hits = CACHE_REQUESTS.labels(namespace, "hit")
+        misses = CACHE_REQUESTS.labels(namespace, "miss")
+        bypasses = CACHE_REQUESTS.labels(namespace, "bypass")
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key from function name and arguments
             cache_key = f"{key_prefix}{func.__name__}:{str(args)}:{str(kwargs)}"
             
             # Try to get from cache
-            cached_value = await cache_manager.get(cache_key)
+            with span("cache.get", **{"cache.namespace": namespace}) as lookup:
+                cached_value = await cache_manager.get(cache_key)
+                if cached_value is not None:
+                    result, counter = "hit", hits
+                elif cache_manager._connected:
+                    result, counter = "miss", misses
+                else:
+                    result, counter = "bypass", bypasses
+                lookup.set_attribute("cache.result", result)
+            counter.inc()
+            
             if cached_value is not None:
                 logger.debug(f"Cache hit for {cache_key}")
                 return cached_value
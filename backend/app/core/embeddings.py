@@ -1,10 +1,14 @@
 """Embedding generation utilities"""
 
+import hashlib
 import logging
+from collections import OrderedDict
 from typing import List, Union
-from openai import AsyncOpenAI
 
 from app.config import settings
+from app.core.http import http_pool
+from app.core.metrics import CACHE_REQUESTS, record_tokens
+from app.core.timing import stage
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +17,23 @@ class EmbeddingService:
     """Service for generating text embeddings"""
     
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
         self.model = settings.embedding_model
+        self._client = None
+        # Query text to embedding, least recently used first
+        self.query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_hits = CACHE_REQUESTS.labels("query_embedding", "hit")
+        self._query_misses = CACHE_REQUESTS.labels("query_embedding", "miss")
+    
+    @property
+    def client(self):
+        """OpenAI client, created (and the SDK imported) on first use"""
+        if self._client is None:
+            from openai import AsyncOpenAI
+            self._client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                http_client=http_pool.sdk_client()
+            )
+        return self._client
     
     async def generate_embedding(self, text: str) -> List[float]:
         """
@@ -27,15 +46,62 @@ class EmbeddingService:
             List of floats representing the embedding
         """
         try:
-            response = await self.client.embeddings.create(
-                model=self.model,
-                input=text
-            )
+            with stage("embedding"):
+                response = await self.client.embeddings.create(
+                    model=self.model,
+                    input=text
+                )
+            record_tokens("openai", self.model, response.usage)
             return response.data[0].embedding
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             raise
     
+    async def embed_query(self, query: str) -> List[float]:
+        """
+        Embedding of a search query, served from an in-process LRU cache
+        
+        Args:
+            query: Query text (whitespace is normalized)
+            
+        Returns:
+            List of floats representing the embedding
+        """
+        key = " ".join(query.split())
+        embedding = self.query_cache.get(key)
+        if embedding is not None:
+            self.query_cache.move_to_end(key)
+            self._query_hits.inc()
+            return embedding
+        
+        self._query_misses.inc()
+        embedding = await self.generate_embedding(key)
+        self._cache_query(key, embedding)
+        return embedding
+    
+    async def preload_queries(self, queries: List[str]) -> int:
+        """
+        Embed queries missing from the query cache in one request
+        
+        Args:
+            queries: Query texts
+            
+        Returns:
+            Number of queries embedded
+        """
+        keys = list(dict.fromkeys(" ".join(query.split()) for query in queries))
+        missing = [key for key in keys if key and key not in self.query_cache]
+        if not missing:
+            return 0
+        for key, embedding in zip(missing, await self.generate_embeddings(missing)):
+            self._cache_query(key, embedding)
+        return len(missing)
+    
+    def _cache_query(self, key: str, embedding: List[float]):
+        self.query_cache[key] = embedding
+        while len(self.query_cache) > settings.query_embedding_cache_size:
+            self.query_cache.popitem(last=False)
+    
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for multiple texts
@@ -47,10 +113,12 @@ class EmbeddingService:
             List of embeddings
         """
         try:
-            response = await self.client.embeddings.create(
-                model=self.model,
-                input=texts
-            )
+            with stage("embedding"):
+                response = await self.client.embeddings.create(
+                    model=self.model,
+                    input=texts
+                )
+            record_tokens("openai", self.model, response.usage)
             return [item.embedding for item in response.data]
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
@@ -67,9 +135,13 @@ class EmbeddingService:
         Returns:
             Formatted text for embedding
         """
+        categories = [
+            cat.get("title", "") if isinstance(cat, dict) else str(cat)
+            for cat in restaurant.get("categories", [])
+        ]
         parts = [
             f"Name: {restaurant.get('name', '')}",
-            f"Categories: {', '.join(restaurant.get('categories', []))}",
+            f"Categories: {', '.join(categories)}",
             f"Price Range: {restaurant.get('price', '')}",
             f"Rating: {restaurant.get('rating', '')}",
             f"Location: {restaurant.get('location', {}).get('address1', '')}",
@@ -93,6 +165,25 @@ class EmbeddingService:
             f"Review: {review.get('text', '')}"
         ]
         return " | ".join(filter(None, parts))
+    
+    def fingerprint(self, text: str) -> str:
+        """
+        Compute a content fingerprint for embedding text
+        
+        The embedding model is part of the hash so that switching models
+        invalidates every stored vector.
+        
+        Args:
+            text: Exact text that is (or would be) sent to the embedding model
+            
+        Returns:
+            Hex digest identifying the text/model pair
+        """
+        digest = hashlib.sha256()
+        digest.update(self.model.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
 
 
 # Global embedding service instance
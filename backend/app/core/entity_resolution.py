@@ -0,0 +1,195 @@
+"""Cross-source entity resolution for restaurant records"""
+
+import math
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.core.geo import coordinates_of, haversine_distance
+from app.models.restaurant import RestaurantRecord
+
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_DROPPED_RE = re.compile(r"[']")
+
+# Words that carry no identity ("The Pizza Place Restaurant" ~ "Pizza Place")
+_NAME_STOPWORDS = frozenset({
+    "the", "a", "an", "and", "of", "restaurant", "inc", "llc", "co"
+})
+
+
+def normalize_name(name: str) -> str:
+    """
+    Canonical form of a business name
+    
+    Strips accents, apostrophes and punctuation, lowercases and drops
+    words that carry no identity ("Café Joe's & Co." -> "cafe joes").
+    """
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = _NON_WORD_RE.sub(" ", _DROPPED_RE.sub("", text.lower().replace("&", " and ")))
+    return " ".join(token for token in text.split() if token not in _NAME_STOPWORDS)
+
+
+def id_namespace(record_id: str) -> str:
+    """Namespace of a restaurant ID ("google" for "google:abc", "" for Yelp IDs)"""
+    return record_id.split(":", 1)[0] if ":" in record_id else ""
+
+
+def name_similarity(a: Set[str], b: Set[str]) -> float:
+    """Overlap coefficient of two name token sets (1.0 if one contains the other)"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+class EntityResolver:
+    """
+    Maps records from different sources onto shared restaurant IDs
+    
+    Known entities are indexed by (geo cell, name token). A new record is
+    only compared with entities sharing a name token in its own or an
+    adjacent cell, so resolution is roughly linear in the number of
+    records. A match needs similar names and nearby coordinates; records
+    without coordinates only match on an identical normalized name. IDs
+    from the same namespace are distinct by definition and never merged.
+    """
+    
+    def __init__(
+        self,
+        cell_size: Optional[float] = None,
+        max_distance: Optional[float] = None,
+        min_similarity: Optional[float] = None
+    ):
+        self.cell_size = cell_size or settings.entity_cell_size
+        self.max_distance = (
+            max_distance if max_distance is not None else settings.entity_match_distance
+        )
+        self.min_similarity = (
+            min_similarity if min_similarity is not None else settings.entity_name_similarity
+        )
+        
+        self.entities: List[Tuple[str, Set[str], float, float]] = []
+        self.blocks: Dict[Tuple[int, int, str], List[int]] = {}
+        self.names: Dict[str, int] = {}
+    
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (
+            math.floor(latitude / self.cell_size),
+            math.floor(longitude / self.cell_size)
+        )
+    
+    def add(self, entity_id: str, record: RestaurantRecord):
+        """
+        Register a record as a known entity
+        
+        Args:
+            entity_id: ID other records resolve to
+            record: Restaurant record (name and coordinates are used)
+        """
+        normalized = normalize_name(record.name)
+        if not normalized:
+            return
+        
+        tokens = set(normalized.split())
+        latitude, longitude = coordinates_of(record)
+        idx = len(self.entities)
+        self.entities.append((entity_id, tokens, latitude, longitude))
+        self.names.setdefault(normalized, idx)
+        
+        if not math.isnan(latitude):
+            row, col = self._cell(latitude, longitude)
+            for token in tokens:
+                self.blocks.setdefault((row, col, token), []).append(idx)
+    
+    def match(self, record: RestaurantRecord) -> Optional[str]:
+        """
+        Find the known entity a record refers to
+        
+        Args:
+            record: Restaurant record
+            
+        Returns:
+            Entity ID of the best match, or None
+        """
+        normalized = normalize_name(record.name)
+        if not normalized:
+            return None
+        namespace = id_namespace(record.id)
+        
+        tokens = set(normalized.split())
+        latitude, longitude = coordinates_of(record)
+        if math.isnan(latitude):
+            idx = self.names.get(normalized)
+            if idx is None or id_namespace(self.entities[idx][0]) == namespace:
+                return None
+            return self.entities[idx][0]
+        
+        row, col = self._cell(latitude, longitude)
+        candidates = set()
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                for token in tokens:
+                    candidates.update(self.blocks.get((row + d_row, col + d_col, token), ()))
+        
+        best_id, best_score = None, 0.0
+        for idx in candidates:
+            entity_id, entity_tokens, entity_lat, entity_lng = self.entities[idx]
+            if id_namespace(entity_id) == namespace:
+                continue
+            similarity = name_similarity(tokens, entity_tokens)
+            if similarity < self.min_similarity:
+                continue
+            distance = haversine_distance(latitude, longitude, entity_lat, entity_lng)
+            if distance > self.max_distance:
+                continue
+            # Prefer the closest name, then the closest location
+            score = similarity - distance / (self.max_distance * 10)
+            if score > best_score:
+                best_id, best_score = entity_id, score
+        return best_id
+
+
+def resolve_entities(
+    ranked_lists: Dict[str, List[RestaurantRecord]]
+) -> Dict[str, List[RestaurantRecord]]:
+    """
+    Give records of the same restaurant the same ID across sources
+    
+    Sources are processed in priority order. Each record that matches an
+    entity from an earlier source takes that entity's ID (its own is kept
+    as ``source_id``); unmatched records become new entities. The result
+    can be passed straight to reciprocal rank fusion, which merges by ID.
+    
+    Args:
+        ranked_lists: Source name to restaurants, in priority order
+        
+    Returns:
+        The same lists, with matched records' IDs rewritten in place
+    """
+    resolver = EntityResolver()
+    known_ids: Set[str] = set()
+    
+    for results in ranked_lists.values():
+        new_entities = []
+        for record in results:
+            record_id = record.id
+            if not record_id:
+                continue
+            if record_id in known_ids:
+                continue
+            
+            entity_id = resolver.match(record)
+            if entity_id is not None:
+                record.source_id = record_id
+                record.id = entity_id
+            else:
+                new_entities.append(record)
+        
+        # Register after the whole source is matched, so a source's own
+        # records never resolve onto each other
+        for record in new_entities:
+            resolver.add(record.id, record)
+            known_ids.add(record.id)
+    
+    return ranked_lists
@@ -0,0 +1,64 @@
+"""Rank fusion for combining results from several retrieval sources"""
+
+from typing import Dict, List, Optional
+
+from app.models.restaurant import RestaurantRecord
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Dict[str, List[RestaurantRecord]],
+    weights: Optional[Dict[str, float]] = None,
+    k: int = 60
+) -> List[RestaurantRecord]:
+    """
+    Combine ranked restaurant lists with weighted reciprocal rank fusion
+    
+    Each restaurant scores ``sum(weight / (k + rank))`` over the sources
+    that returned it. Only ranks are used, so sources with incomparable
+    scores (BM25, cosine similarity, Yelp's own ordering) can be mixed.
+    
+    Args:
+        ranked_lists: Source name to restaurants, best first. Sources are
+            given in priority order: the first source to return a restaurant
+            supplies its data.
+        weights: Optional per-source weights (default 1.0)
+        k: Rank offset that damps the influence of top ranks
+        
+    Returns:
+        Deduplicated restaurants sorted by fused score, each annotated with
+        ``retrieval_score`` and ``sources`` and carrying the best
+        ``semantic_score`` any source gave it
+    """
+    weights = weights or {}
+    merged: Dict[str, RestaurantRecord] = {}
+    scores: Dict[str, float] = {}
+    
+    for source, results in ranked_lists.items():
+        weight = weights.get(source, 1.0)
+        seen = set()
+        
+        for rank, business in enumerate(results, 1):
+            business_id = business.id
+            if not business_id or business_id in seen:
+                continue
+            seen.add(business_id)
+            
+            if business_id not in merged:
+                merged[business_id] = business
+                business.sources = [source]
+            else:
+                existing = merged[business_id]
+                if source not in existing.sources:
+                    existing.sources.append(source)
+                if business.reviews and not existing.reviews:
+                    # Keep the matching review snippets found by another source
+                    existing.reviews = business.reviews
+                # Only the vector source scores similarity; keep it for reranking
+                existing.semantic_score = max(existing.semantic_score, business.semantic_score)
+            
+            scores[business_id] = scores.get(business_id, 0.0) + weight / (k + rank)
+    
+    for business_id, business in merged.items():
+        business.retrieval_score = scores[business_id]
+    
+    return sorted(merged.values(), key=lambda b: b.retrieval_score, reverse=True)
@@ -0,0 +1,221 @@
+"""Offline gazetteer for resolving place names without a geocoding call"""
+
+import json
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "gazetteer.json"
+
+_ZIP_PLUS_FOUR_RE = re.compile(r"\b(\d{5})-\d{4}\b")
+_DROPPED_RE = re.compile(r"[.']")
+_SEPARATOR_RE = re.compile(r"[^\w]+")
+_POSTAL_CODE_RE = re.compile(r"^\d{5}$")
+
+_COUNTRY_SUFFIXES = (
+    ("united", "states", "of", "america"),
+    ("united", "states"),
+    ("usa",),
+    ("us",)
+)
+
+# Words that mark a street-level address, which the gazetteer cannot resolve
+_STREET_WORDS = frozenset({
+    "street", "st", "avenue", "ave", "av", "boulevard", "blvd", "road", "rd",
+    "drive", "dr", "lane", "ln", "way", "place", "pl", "court", "ct",
+    "highway", "hwy", "parkway", "pkwy", "terrace", "ter", "square", "sq",
+    "suite", "ste", "apt", "unit", "floor", "fl"
+})
+
+# Words that only position a search around a place ("downtown austin",
+# "near sf"). Other words in front of a place name may make it a different
+# place ("south san francisco"), which is left to the geocoder
+_POSITION_WORDS = frozenset({
+    "downtown", "central", "greater", "near", "nearby", "around", "close",
+    "to", "by", "in", "the"
+})
+
+
+def normalize_address(address: str) -> str:
+    """
+    Canonical form of a free-text location
+    
+    Lowercases, drops periods and apostrophes ("St. Louis" -> "st louis",
+    "D.C." -> "dc"), turns other punctuation into spaces, collapses
+    whitespace, strips ZIP+4 extensions and a trailing country name.
+    
+    Args:
+        address: Free-text location
+        
+    Returns:
+        Normalized address ("" if nothing is left)
+    """
+    text = _ZIP_PLUS_FOUR_RE.sub(r"\1", address.lower().replace("&", " and "))
+    text = _SEPARATOR_RE.sub(" ", _DROPPED_RE.sub("", text))
+    tokens = text.replace("_", " ").split()
+    
+    for suffix in _COUNTRY_SUFFIXES:
+        if len(tokens) > len(suffix) and tuple(tokens[-len(suffix):]) == suffix:
+            tokens = tokens[:-len(suffix)]
+            break
+    
+    return " ".join(tokens)
+
+
+class Gazetteer:
+    """
+    In-process lookup of cities, neighborhoods and postal codes
+    
+    Every place is indexed under its normalized name and aliases, alone and
+    qualified by city and state ("mission district san francisco ca"), in a
+    single hash table. A name shared by several places (e.g. "chinatown")
+    only resolves when qualified. Addresses with house numbers or street
+    words are left to the remote geocoder.
+    """
+    
+    def __init__(self, data: Dict[str, Any]):
+        self.states: Dict[str, str] = {
+            code.upper(): name for code, name in data.get("states", {}).items()
+        }
+        self.places: List[Dict[str, Any]] = list(data.get("places", []))
+        self.postal_codes: Dict[str, Dict[str, Any]] = dict(data.get("postal_codes", {}))
+        
+        # Neighborhoods may be qualified by any name of their city ("the mission sf")
+        self.city_names: Dict[str, List[str]] = {}
+        for place in self.places:
+            if place.get("type", "city") == "city":
+                self.city_names[normalize_address(place["name"])] = [
+                    normalize_address(alias) for alias in place.get("aliases", [])
+                ]
+        
+        candidates: Dict[str, set] = {}
+        for idx, place in enumerate(self.places):
+            for key in self._keys(place):
+                candidates.setdefault(key, set()).add(idx)
+        
+        self.index: Dict[str, int] = {
+            key: next(iter(matches))
+            for key, matches in candidates.items()
+            if len(matches) == 1
+        }
+        self.lookup = lru_cache(maxsize=4096)(self._lookup)
+    
+    def __len__(self) -> int:
+        return len(self.places) + len(self.postal_codes)
+    
+    @classmethod
+    def from_file(cls, path: str) -> "Gazetteer":
+        """Create a gazetteer from a JSON file"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+    
+    def _qualifiers(self, place: Dict[str, Any]) -> List[str]:
+        """Suffixes a place name may be followed by ("ca", "california", ...)"""
+        states = [""]
+        state = (place.get("state") or "").upper()
+        if state:
+            states.append(normalize_address(state))
+            if state in self.states:
+                states.append(normalize_address(self.states[state]))
+        
+        if place.get("type") == "neighborhood" and place.get("city"):
+            city = normalize_address(place["city"])
+            cities = [city] + self.city_names.get(city, [])
+            return states + [f"{name} {s}".strip() for name in cities for s in states]
+        return states
+    
+    def _keys(self, place: Dict[str, Any]) -> set:
+        """All normalized strings that resolve to a place"""
+        names = [place["name"]] + list(place.get("aliases", []))
+        keys = set()
+        for name in names:
+            normalized = normalize_address(name)
+            if not normalized:
+                continue
+            for qualifier in self._qualifiers(place):
+                keys.add(f"{normalized} {qualifier}".strip())
+        return keys
+    
+    def _lookup(self, address: str) -> Optional[Dict[str, Any]]:
+        normalized = normalize_address(address)
+        if not normalized:
+            return None
+        
+        idx = self.index.get(normalized)
+        if idx is not None:
+            return self._place_result(self.places[idx])
+        
+        tokens = normalized.split()
+        if _STREET_WORDS.intersection(tokens):
+            return None
+        
+        numeric = [token for token in tokens if any(char.isdigit() for char in token)]
+        if numeric:
+            if len(numeric) == 1 and _POSTAL_CODE_RE.match(numeric[0]):
+                return self._postal_result(numeric[0])
+            return None
+        
+        # Positioned around a place ("downtown austin"): resolve the place
+        start = 0
+        while start < len(tokens) - 1 and tokens[start] in _POSITION_WORDS:
+            start += 1
+        if start:
+            idx = self.index.get(" ".join(tokens[start:]))
+            if idx is not None:
+                return self._place_result(self.places[idx])
+        return None
+    
+    def _place_result(self, place: Dict[str, Any]) -> Dict[str, Any]:
+        parts = [place["name"]]
+        if place.get("type") == "neighborhood" and place.get("city"):
+            parts.append(place["city"])
+        if place.get("state"):
+            parts.append(place["state"])
+        parts.append("USA" if place.get("country", "US") == "US" else place["country"])
+        
+        return {
+            "latitude": place["latitude"],
+            "longitude": place["longitude"],
+            "formatted_address": ", ".join(parts),
+            "place_id": None,
+            "type": place.get("type", "city"),
+            "source": "gazetteer"
+        }
+    
+    def _postal_result(self, postal_code: str) -> Optional[Dict[str, Any]]:
+        entry = self.postal_codes.get(postal_code)
+        if entry is None:
+            return None
+        
+        country = entry.get("country", "US")
+        return {
+            "latitude": entry["latitude"],
+            "longitude": entry["longitude"],
+            "formatted_address": (
+                f"{entry.get('city', '')}, {entry.get('state', '')} {postal_code}, "
+                f"{'USA' if country == 'US' else country}"
+            ),
+            "place_id": None,
+            "type": "postal_code",
+            "source": "gazetteer"
+        }
+
+
+def load_gazetteer() -> Gazetteer:
+    """Create the gazetteer from the configured (or bundled) file"""
+    path = settings.gazetteer_path or str(DEFAULT_GAZETTEER_PATH)
+    try:
+        return Gazetteer.from_file(path)
+    except Exception as e:
+        logger.error(f"Failed to load gazetteer from {path}: {e}")
+        return Gazetteer({})
+
+
+# Global gazetteer instance
+gazetteer = load_gazetteer()
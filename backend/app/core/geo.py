@@ -0,0 +1,188 @@
+"""Vectorized geographic distance utilities"""
+
+from math import asin, cos, radians, sin, sqrt
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.models.restaurant import RestaurantRecord
+
+# Earth radius in meters
+EARTH_RADIUS_M = 6371000.0
+
+
+def haversine_distance(
+    origin_lat: float,
+    origin_lng: float,
+    dest_lat: float,
+    dest_lng: float
+) -> float:
+    """
+    Distance in meters between two points (scalar fast path)
+    
+    Args:
+        origin_lat: Origin latitude
+        origin_lng: Origin longitude
+        dest_lat: Destination latitude
+        dest_lng: Destination longitude
+        
+    Returns:
+        Distance in meters
+    """
+    origin_lat, origin_lng, dest_lat, dest_lng = map(
+        radians, [origin_lat, origin_lng, dest_lat, dest_lng]
+    )
+    dlng = dest_lng - origin_lng
+    dlat = dest_lat - origin_lat
+    a = sin(dlat / 2) ** 2 + cos(origin_lat) * cos(dest_lat) * sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * asin(sqrt(a))
+
+
+def haversine(
+    origin_lat: float,
+    origin_lng: float,
+    lats: np.ndarray,
+    lngs: np.ndarray
+) -> np.ndarray:
+    """
+    Distances in meters from one origin to N points
+    
+    Args:
+        origin_lat: Origin latitude
+        origin_lng: Origin longitude
+        lats: Array of N latitudes (NaN for unknown)
+        lngs: Array of N longitudes (NaN for unknown)
+        
+    Returns:
+        Array of N distances (NaN where coordinates are unknown)
+    """
+    lat1 = np.radians(origin_lat)
+    lat2 = np.radians(np.asarray(lats, dtype=float))
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(lngs, dtype=float)) - np.radians(origin_lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_matrix(
+    origin_lats: np.ndarray,
+    origin_lngs: np.ndarray,
+    lats: np.ndarray,
+    lngs: np.ndarray
+) -> np.ndarray:
+    """
+    Pairwise distances in meters between M origins and N points
+    
+    Args:
+        origin_lats: Array of M origin latitudes
+        origin_lngs: Array of M origin longitudes
+        lats: Array of N latitudes
+        lngs: Array of N longitudes
+        
+    Returns:
+        (M x N) distance matrix
+    """
+    lat1 = np.radians(np.asarray(origin_lats, dtype=float))[:, None]
+    lng1 = np.radians(np.asarray(origin_lngs, dtype=float))[:, None]
+    lat2 = np.radians(np.asarray(lats, dtype=float))[None, :]
+    lng2 = np.radians(np.asarray(lngs, dtype=float))[None, :]
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def quantize(latitude: float, longitude: float, precision: int) -> Tuple[float, float]:
+    """
+    Snap a point to the center of its grid cell
+    
+    Cells are ``10 ** -precision`` degrees on a side (precision 3 is about
+    110 m of latitude), so nearby points, e.g. GPS jitter, share a key.
+    
+    Args:
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        precision: Number of decimal places kept
+        
+    Returns:
+        Quantized (latitude, longitude)
+    """
+    return round(latitude, precision) + 0.0, round(longitude, precision) + 0.0
+
+
+def coordinates_of(restaurant: Union[RestaurantRecord, Dict[str, Any]]) -> Tuple[float, float]:
+    """
+    Extract (latitude, longitude) from a restaurant record or dictionary
+    
+    Yelp businesses carry ``coordinates``; normalized restaurants may carry
+    them on ``location``. Unknown coordinates are returned as NaN.
+    """
+    if isinstance(restaurant, RestaurantRecord):
+        if restaurant.latitude is None or restaurant.longitude is None:
+            return float("nan"), float("nan")
+        return restaurant.latitude, restaurant.longitude
+    for key in ("coordinates", "location"):
+        point = restaurant.get(key) or {}
+        lat = point.get("latitude")
+        lng = point.get("longitude")
+        if lat is not None and lng is not None:
+            return float(lat), float(lng)
+    return float("nan"), float("nan")
+
+
+def coordinate_arrays(restaurants: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude and longitude arrays for a list of restaurants"""
+    if not restaurants:
+        return np.empty(0), np.empty(0)
+    coords = np.array([coordinates_of(r) for r in restaurants], dtype=float)
+    return coords[:, 0], coords[:, 1]
+
+
+def fill_distances(
+    restaurants: List[RestaurantRecord],
+    latitude: float,
+    longitude: float,
+    radius: Optional[float] = None
+) -> List[RestaurantRecord]:
+    """
+    Set ``distance`` (meters from the origin) on every restaurant
+    
+    Args:
+        restaurants: Restaurant records
+        latitude: Origin latitude
+        longitude: Origin longitude
+        radius: Optional cut-off; restaurants further away are dropped
+            (restaurants with unknown coordinates are kept)
+            
+    Returns:
+        Restaurants within the radius, in their original order
+    """
+    if not restaurants:
+        return []
+    
+    lats, lngs = coordinate_arrays(restaurants)
+    distances = haversine(latitude, longitude, lats, lngs)
+    
+    kept = []
+    for restaurant, distance in zip(restaurants, distances.tolist()):
+        if distance != distance:  # NaN: unknown coordinates
+            kept.append(restaurant)
+            continue
+        if radius is not None and distance > radius:
+            continue
+        restaurant.distance = distance
+        kept.append(restaurant)
+    return kept
+
+
+def sort_by_distance(restaurants: List[RestaurantRecord]) -> List[RestaurantRecord]:
+    """Sort restaurants nearest first; those without a distance go last"""
+    if not restaurants:
+        return []
+    
+    distances = np.array(
+        [r.distance if r.distance is not None else np.inf for r in restaurants],
+        dtype=float
+    )
+    return [restaurants[idx] for idx in np.argsort(distances, kind="stable")]
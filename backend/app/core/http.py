@@ -0,0 +1,194 @@
+"""Shared HTTP clients for upstream APIs"""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.core.metrics import (
+    UPSTREAM_IN_FLIGHT,
+    UPSTREAM_LATENCY,
+    pool_collector,
+    upstream_labels,
+    upstream_outcome,
+)
+from app.core.replay import upstream_transport
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Timeout the OpenAI/Anthropic SDKs use for their own clients
+SDK_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+
+
+class UpstreamHealth:
+    """
+    Passive health of each upstream from the outcomes of recent calls
+    
+    Calls within the last settings.upstream_health_window seconds are kept
+    per upstream; 5xx responses, 429s, timeouts and connection errors count
+    as failures. No probe traffic is sent, so reading the state is free.
+    """
+    
+    def __init__(self, max_calls: int = 200):
+        self.max_calls = max_calls
+        self.calls: Dict[str, Deque[Tuple[float, bool]]] = {}
+    
+    def record(self, upstream: str, status_code: Optional[int]):
+        """Record the outcome of one call (no status code: it failed or was cancelled)"""
+        failed = status_code is None or status_code >= 500 or status_code == 429
+        self.calls.setdefault(upstream, deque(maxlen=self.max_calls)).append(
+            (time.monotonic(), failed)
+        )
+    
+    def state(self, upstream: str) -> Dict[str, Any]:
+        """
+        Recent failure rate of an upstream
+        
+        Returns:
+            Dictionary with state ("healthy", "degraded", "failing" or
+            "idle" without recent calls), calls and failure_rate
+        """
+        cutoff = time.monotonic() - settings.upstream_health_window
+        recent = [failed for at, failed in self.calls.get(upstream, ()) if at >= cutoff]
+        if not recent:
+            return {"state": "idle", "calls": 0, "failure_rate": 0.0}
+        
+        failure_rate = sum(recent) / len(recent)
+        if failure_rate >= settings.upstream_failing_rate:
+            state = "failing"
+        elif failure_rate > 0:
+            state = "degraded"
+        else:
+            state = "healthy"
+        return {"state": state, "calls": len(recent), "failure_rate": round(failure_rate, 4)}
+    
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        """State of every upstream called so far"""
+        return {upstream: self.state(upstream) for upstream in sorted(self.calls)}
+
+
+# Global upstream health instance
+upstream_health = UpstreamHealth()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Records latency, outcome, in-flight requests and a client span per upstream call"""
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream, endpoint = upstream_labels(request.url)
+        in_flight = UPSTREAM_IN_FLIGHT.labels(upstream)
+        in_flight.inc()
+        started = time.perf_counter()
+        status_code = None
+        error = None
+        with span(
+            f"{upstream}.{endpoint}",
+            kind="client",
+            **{"http.method": request.method, "server.address": request.url.host}
+        ) as client_span:
+            try:
+                response = await self.transport.handle_async_request(request)
+                status_code = response.status_code
+                client_span.set_attribute("http.status_code", status_code)
+                return response
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                in_flight.dec()
+                upstream_health.record(upstream, status_code)
+                outcome = upstream_outcome(status_code, error)
+                UPSTREAM_LATENCY.labels(upstream, endpoint, outcome).observe(
+                    time.perf_counter() - started
+                )
+    
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class HTTPPool:
+    """
+    One pooled AsyncClient shared by all MCP tools
+    
+    Reusing connections avoids a TCP/TLS handshake per upstream call. The
+    transport follows settings.upstream_mode, so tools transparently run
+    against recorded or synthetic responses.
+    """
+    
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self.limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client (created on first use)"""
+        if self._client is None or self._client.is_closed:
+            self._transport = upstream_transport(self.limits)
+            self._client = httpx.AsyncClient(
+                transport=InstrumentedTransport(self._transport),
+                timeout=settings.mcp_timeout
+            )
+        return self._client
+    
+    def sdk_client(self) -> httpx.AsyncClient:
+        """
+        HTTP client for the OpenAI/Anthropic SDKs
+        
+        Uses the record/replay/synthetic transport of the current mode and
+        reports upstream metrics; timeouts match the SDKs' defaults.
+        """
+        return httpx.AsyncClient(
+            transport=InstrumentedTransport(upstream_transport(self.limits)),
+            timeout=SDK_TIMEOUT
+        )
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Occupancy of the shared client's connection pool
+        
+        Returns:
+            Active, idle and maximum connections and requests queued for a
+            connection (all zero in replay/synthetic mode, which has no pool)
+        """
+        stats = {"active": 0, "idle": 0, "queued": 0, "max": self.limits.max_connections or 0}
+        
+        # RecordingTransport wraps the network transport
+        transport = getattr(self._transport, "transport", self._transport)
+        pool = getattr(transport, "_pool", None)
+        if pool is None:
+            return stats
+        
+        for connection in pool.connections:
+            if connection.is_idle():
+                stats["idle"] += 1
+            else:
+                stats["active"] += 1
+        stats["queued"] = sum(
+            1 for pool_request in getattr(pool, "_requests", [])
+            if getattr(pool_request, "connection", None) is None
+        )
+        return stats
+    
+    async def close(self):
+        """Close the shared client"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("HTTP pool closed")
+        self._client = None
+        self._transport = None
+
+
+# Global HTTP pool instance
+http_pool = HTTPPool()
+pool_collector.sources["upstream"] = http_pool.stats
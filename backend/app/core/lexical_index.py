@@ -0,0 +1,198 @@
+"""In-process BM25 lexical index for exact-term retrieval"""
+
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from",
+    "has", "have", "i", "in", "is", "it", "its", "me", "my", "of", "on",
+    "or", "so", "that", "the", "their", "there", "they", "this", "to",
+    "was", "we", "were", "with", "you", "your"
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text and split into index terms"""
+    return [
+        token for token in _TOKEN_RE.findall(text.lower())
+        if token not in _STOPWORDS
+    ]
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over restaurant and review documents
+    
+    Documents are keyed like vector DB points (business ID for restaurants,
+    review key for reviews) and carry the same payload, so a lexical hit can
+    be turned into a restaurant without a vector DB round trip. The index is
+    updated incrementally by ingestion and persisted as JSON; the API
+    process reloads it when the file changes.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        k1: Optional[float] = None,
+        b: Optional[float] = None
+    ):
+        self.path = Path(path or settings.lexical_index_path)
+        self.k1 = k1 if k1 is not None else settings.bm25_k1
+        self.b = b if b is not None else settings.bm25_b
+        
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.total_length = 0
+        self.version = 0
+        self._mtime: Optional[float] = None
+    
+    def __len__(self) -> int:
+        return len(self.docs)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.docs
+    
+    def upsert(self, doc_id: str, text: str, metadata: Dict[str, Any]):
+        """
+        Add or replace a document
+        
+        Args:
+            doc_id: Document key
+            text: Text to index
+            metadata: Payload returned with search hits
+        """
+        self.remove(doc_id)
+        self.version += 1
+        
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+        self.docs[doc_id] = {"terms": dict(terms), "length": length, "metadata": metadata}
+        self.total_length += length
+        
+        for term, freq in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = freq
+    
+    def remove(self, doc_id: str):
+        """Remove a document if present"""
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self.version += 1
+        
+        self.total_length -= doc["length"]
+        for term in doc["terms"]:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+    
+    def restaurants(self) -> Dict[str, Dict[str, Any]]:
+        """Payloads of all restaurant (non-review) documents, keyed by business ID"""
+        return {
+            doc_id: doc["metadata"]
+            for doc_id, doc in self.docs.items()
+            if doc["metadata"].get("type") != "review"
+        }
+    
+    def get_metadata(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Get a document's payload"""
+        doc = self.docs.get(doc_id)
+        return doc["metadata"] if doc else None
+    
+    def search(self, query: str, top_k: int = 20) -> List[Tuple[str, float]]:
+        """
+        Score documents against a query with BM25
+        
+        Args:
+            query: Free-text query
+            top_k: Number of results to return
+            
+        Returns:
+            List of (doc_id, score) tuples, best first
+        """
+        if not self.docs:
+            return []
+        
+        n_docs = len(self.docs)
+        avg_length = self.total_length / n_docs if n_docs else 0.0
+        scores: Dict[str, float] = {}
+        
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            
+            df = len(posting)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            
+            for doc_id, freq in posting.items():
+                length = self.docs[doc_id]["length"]
+                norm = self.k1
+                if avg_length:
+                    norm *= 1 - self.b + self.b * length / avg_length
+                score = idf * freq * (self.k1 + 1) / (freq + norm)
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
+    
+    def load(self) -> "LexicalIndex":
+        """Load index from disk (a missing file yields an empty index)"""
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+        except Exception as e:
+            logger.warning(f"Could not read lexical index {self.path}: {e}")
+            return self
+        
+        self.docs = {}
+        self.postings = {}
+        self.total_length = 0
+        for doc_id, doc in data.get("docs", {}).items():
+            self.docs[doc_id] = doc
+            self.total_length += doc["length"]
+            for term, freq in doc["terms"].items():
+                self.postings.setdefault(term, {})[doc_id] = freq
+        
+        self._mtime = mtime
+        self.version += 1
+        logger.info(f"Loaded lexical index with {len(self.docs)} documents")
+        return self
+    
+    def reload_if_changed(self):
+        """Reload the index if the file on disk was rewritten (e.g. by ingestion)"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.load()
+    
+    def save(self):
+        """Atomically write index to disk"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"docs": self.docs}, f)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+
+# Global lexical index instance
+lexical_index = LexicalIndex()
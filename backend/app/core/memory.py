@@ -0,0 +1,240 @@
+"""Memory accounting and tracemalloc allocation tracking for a live worker"""
+
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict, deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared by the whole process rather than owned by a data structure
+_SKIP_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+]
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Estimate the bytes held by an object and everything it references
+    
+    Containers, instance __dict__s and __slots__ are followed; classes,
+    modules and functions are not. Passing the same ``seen`` set to several
+    calls counts shared objects once, against the first structure that
+    reaches them.
+    
+    Args:
+        obj: Object to measure
+        seen: IDs of objects already counted
+        
+    Returns:
+        Estimated size in bytes
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    pending = [obj]
+    
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, _SKIP_TYPES):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item, 0)
+        
+        if isinstance(item, dict):
+            for key, value in list(item.items()):
+                pending.append(key)
+                pending.append(value)
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            pending.extend(list(item))
+        elif isinstance(item, (str, bytes, bytearray, int, float, bool)):
+            continue
+        else:
+            if hasattr(item, "__dict__"):
+                pending.append(item.__dict__)
+            for cls in type(item).__mro__:
+                for name in cls.__dict__.get("__slots__", ()):
+                    if hasattr(item, name):
+                        pending.append(getattr(item, name))
+    return total
+
+
+def process_memory() -> Dict[str, Any]:
+    """
+    Resident memory and garbage collector state of this process
+    
+    Returns:
+        Dictionary with rss_bytes, peak_rss_bytes and gc counters
+    """
+    stats: Dict[str, Any] = {"rss_bytes": None, "peak_rss_bytes": None}
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    stats["rss_bytes"] = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    stats["peak_rss_bytes"] = int(line.split()[1]) * 1024
+    except OSError:
+        import resource
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        stats["peak_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    
+    stats["gc"] = {
+        "counts": list(gc.get_count()),
+        "collections": [generation["collections"] for generation in gc.get_stats()],
+        "uncollectable": len(gc.garbage)
+    }
+    return stats
+
+
+def lru_stats(func: Any) -> Dict[str, Any]:
+    """Entries, capacity and hit ratio of a functools.lru_cache"""
+    info = func.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_ratio": round(info.hits / lookups, 4) if lookups else None
+    }
+
+
+class AllocationTracker:
+    """
+    tracemalloc snapshots kept in memory for comparison
+    
+    Tracing is off until started since it slows allocation-heavy code and
+    costs memory per traced block; snapshots are dropped oldest first past
+    settings.memory_snapshot_keep.
+    """
+    
+    def __init__(self):
+        self.snapshots: "OrderedDict[str, Tuple[float, tracemalloc.Snapshot]]" = OrderedDict()
+    
+    def status(self) -> Dict[str, Any]:
+        """Whether tracing is on and how much it has recorded"""
+        if not tracemalloc.is_tracing():
+            return {"tracing": False, "snapshots": list(self.snapshots)}
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True,
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "snapshots": list(self.snapshots)
+        }
+    
+    def start(self, frames: int = 1):
+        """
+        Start tracing allocations
+        
+        Args:
+            frames: Stack frames recorded per allocation
+        """
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+        logger.info(f"tracemalloc started ({frames} frames)")
+    
+    def stop(self):
+        """Stop tracing and drop all snapshots"""
+        tracemalloc.stop()
+        self.snapshots.clear()
+        logger.info("tracemalloc stopped")
+    
+    def take_snapshot(self) -> str:
+        """
+        Snapshot the allocations traced so far
+        
+        Returns:
+            Snapshot ID
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        snapshot_id = uuid.uuid4().hex[:16]
+        self.snapshots[snapshot_id] = (time.time(), snapshot)
+        while len(self.snapshots) > settings.memory_snapshot_keep:
+            self.snapshots.popitem(last=False)
+        return snapshot_id
+    
+    def top(
+        self,
+        snapshot_id: str,
+        compare_to: Optional[str] = None,
+        group_by: str = "lineno",
+        limit: int = 25
+    ) -> Dict[str, Any]:
+        """
+        Largest allocation sites of a snapshot, or the largest growth since another
+        
+        Args:
+            snapshot_id: Snapshot to report
+            compare_to: Earlier snapshot to diff against
+            group_by: "lineno", "filename" or "traceback"
+            limit: Number of entries
+            
+        Returns:
+            Dictionary with totals and the top entries
+            
+        Raises:
+            KeyError: If a snapshot is unknown
+        """
+        taken_at, snapshot = self.snapshots[snapshot_id]
+        report: Dict[str, Any] = {"id": snapshot_id, "taken_at": taken_at, "group_by": group_by}
+        
+        if compare_to is not None:
+            base_taken_at, base = self.snapshots[compare_to]
+            diffs = snapshot.compare_to(base, group_by)
+            report.update({
+                "compare_to": compare_to,
+                "interval_s": round(taken_at - base_taken_at, 3),
+                "size_diff_bytes": sum(diff.size_diff for diff in diffs),
+                "top": [
+                    {
+                        "location": self._location(diff.traceback),
+                        "size_bytes": diff.size,
+                        "size_diff_bytes": diff.size_diff,
+                        "count": diff.count,
+                        "count_diff": diff.count_diff
+                    }
+                    for diff in diffs[:limit]
+                ]
+            })
+            return report
+        
+        statistics = snapshot.statistics(group_by)
+        report.update({
+            "size_bytes": sum(stat.size for stat in statistics),
+            "top": [
+                {
+                    "location": self._location(stat.traceback),
+                    "size_bytes": stat.size,
+                    "count": stat.count
+                }
+                for stat in statistics[:limit]
+            ]
+        })
+        return report
+    
+    @staticmethod
+    def _location(traceback: tracemalloc.Traceback) -> List[str]:
+        return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+
+
+# Global allocation tracker instance
+allocation_tracker = AllocationTracker()
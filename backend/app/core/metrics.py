@@ -0,0 +1,208 @@
+"""Prometheus metrics"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Latency buckets in seconds, from sub-millisecond cache work to slow LLM calls
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "API request latency",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "API requests being handled"
+)
+
+STAGE_LATENCY = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Duration of request pipeline stages",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+STAGES_IN_FLIGHT = Gauge(
+    "pipeline_stages_in_flight",
+    "Pipeline stages currently running",
+    ["stage"]
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of requests to upstream APIs",
+    ["upstream", "endpoint", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "upstream_requests_in_flight",
+    "Requests to upstream APIs awaiting a response",
+    ["upstream"]
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cached function lookups by result (hit, miss or bypass when Redis is unavailable)",
+    ["namespace", "result"]
+)
+CACHE_ERRORS = Counter(
+    "cache_errors_total",
+    "Redis errors by cache operation",
+    ["operation"]
+)
+
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens used by LLM and embedding calls",
+    ["provider", "model", "kind"]
+)
+
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections",
+    "Open chat WebSocket connections"
+)
+WEBSOCKET_TURNS = Counter(
+    "websocket_turns_total",
+    "Chat turns over WebSocket by outcome (completed, cancelled or error)",
+    ["outcome"]
+)
+
+# (host, path pattern, upstream, endpoint); paths carrying IDs are collapsed
+# so label cardinality stays bounded
+_ENDPOINTS: List[Tuple[str, re.Pattern, str, str]] = [
+    ("api.yelp.com", re.compile(r"^/v3/businesses/search$"), "yelp", "search"),
+    ("api.yelp.com", re.compile(r"^/v3/businesses/[^/]+/reviews$"), "yelp", "reviews"),
+    ("api.yelp.com", re.compile(r"^/v3/autocomplete$"), "yelp", "autocomplete"),
+    ("api.yelp.com", re.compile(r"^/v3/businesses/[^/]+$"), "yelp", "business"),
+    ("maps.googleapis.com", re.compile(r"^/maps/api/geocode/json$"), "google", "geocode"),
+    ("maps.googleapis.com", re.compile(r"^/maps/api/place/(\w+)/json$"), "google", "place_{0}"),
+    ("api.openai.com", re.compile(r"/embeddings$"), "openai", "embeddings"),
+    ("api.openai.com", re.compile(r"/chat/completions$"), "openai", "chat"),
+    ("api.anthropic.com", re.compile(r"/messages$"), "anthropic", "messages")
+]
+
+
+def upstream_labels(url: httpx.URL) -> Tuple[str, str]:
+    """
+    Upstream and endpoint labels of a request URL
+    
+    Args:
+        url: Request URL
+        
+    Returns:
+        (upstream, endpoint) such as ("yelp", "reviews"); unknown hosts are
+        labelled by host name with endpoint "other"
+    """
+    for host, pattern, upstream, endpoint in _ENDPOINTS:
+        if url.host == host:
+            match = pattern.search(url.path)
+            if match:
+                return upstream, endpoint.format(*match.groups())
+    return url.host, "other"
+
+
+def upstream_outcome(status_code: Optional[int], error: Optional[BaseException] = None) -> str:
+    """Outcome label: status class (2xx, 4xx, ...), timeout or error"""
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if status_code is None:
+        return "error"
+    return f"{status_code // 100}xx"
+
+
+_route_paths: Dict[Any, str] = {}
+
+
+def route_label(scope: Dict[str, Any]) -> str:
+    """
+    Route template of a handled request (e.g. /api/v1/restaurants/{restaurant_id})
+    
+    Raw paths are never used as labels; requests that matched no route are
+    labelled "unmatched".
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if endpoint not in _route_paths:
+        for route in scope["app"].routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                _route_paths[endpoint] = route.path
+                break
+        else:
+            _route_paths[endpoint] = getattr(endpoint, "__name__", "unknown")
+    return _route_paths[endpoint]
+
+
+def record_tokens(provider: str, model: str, usage: Any):
+    """
+    Count tokens reported in an SDK response's ``usage``
+    
+    Works with OpenAI (prompt/completion tokens) and Anthropic
+    (input/output tokens) usage objects; missing fields are ignored.
+    """
+    if usage is None:
+        return
+    for attribute, kind in (
+        ("prompt_tokens", "prompt"),
+        ("completion_tokens", "completion"),
+        ("input_tokens", "prompt"),
+        ("output_tokens", "completion")
+    ):
+        count = getattr(usage, attribute, None)
+        if count:
+            LLM_TOKENS.labels(provider, model, kind).inc(count)
+
+
+class PoolCollector:
+    """
+    Connection pool occupancy, read from the pools when scraped
+    
+    Sources are callables returning ``active``, ``idle``, ``queued`` and
+    ``max`` counts, registered by name.
+    """
+    
+    def __init__(self):
+        self.sources: Dict[str, Callable[[], Dict[str, int]]] = {}
+    
+    def collect(self):
+        connections = GaugeMetricFamily(
+            "http_pool_connections", "Pooled upstream connections", labels=["pool", "state"]
+        )
+        queued = GaugeMetricFamily(
+            "http_pool_queued_requests", "Requests waiting for a pooled connection", labels=["pool"]
+        )
+        capacity = GaugeMetricFamily(
+            "http_pool_max_connections", "Connection limit of the pool", labels=["pool"]
+        )
+        for name, source in self.sources.items():
+            stats = source()
+            connections.add_metric([name, "active"], stats["active"])
+            connections.add_metric([name, "idle"], stats["idle"])
+            queued.add_metric([name], stats["queued"])
+            capacity.add_metric([name], stats["max"])
+        yield connections
+        yield queued
+        yield capacity
+
+
+pool_collector = PoolCollector()
+REGISTRY.register(pool_collector)
+
+
+def render() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with its content type"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,249 @@
+"""Sampling CPU profiler for the event loop thread of a live worker"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.config import settings
+
+# Innermost frames of an event loop waiting for I/O (selector loops and uvloop)
+_IDLE_FRAMES = {("selectors.py", "select"), ("runners.py", "run")}
+
+
+class ProfileSession:
+    """
+    Stack samples collected for one profile
+    
+    ``tasks`` restricts sampling to the given asyncio tasks (a per-request
+    profile); None samples whatever the loop thread is running.
+    """
+    
+    def __init__(
+        self,
+        interval: float,
+        include_idle: bool = False,
+        tasks: Optional[weakref.WeakSet] = None
+    ):
+        self.id = uuid.uuid4().hex[:16]
+        self.interval = interval
+        self.include_idle = include_idle
+        self.tasks = tasks
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.started = time.monotonic()
+        self.duration = 0.0
+        self._next_sample = 0.0
+    
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope"""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+    
+    def summary(self, top: int = 30) -> Dict[str, Any]:
+        """
+        Sample counts and the functions most often on top of the stack
+        
+        Args:
+            top: Number of functions to report
+            
+        Returns:
+            JSON-serializable profile summary
+        """
+        self_time: Counter = Counter()
+        for stack, count in self.stacks.items():
+            self_time[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "id": self.id,
+            "duration_s": round(self.duration, 3),
+            "interval_s": self.interval,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "top_functions": [
+                {
+                    "function": function,
+                    "samples": count,
+                    "share": round(count / self.samples, 4) if self.samples else 0.0
+                }
+                for function, count in self_time.most_common(top)
+            ]
+        }
+
+
+_request_session: ContextVar[Optional[ProfileSession]] = ContextVar("profile_session", default=None)
+
+
+class SamplingProfiler:
+    """
+    Samples the event loop thread from a background thread
+    
+    The sampler thread only runs while a profile is active, reading the
+    loop thread's Python stack with sys._current_frames at each session's
+    interval, so an idle profiler costs nothing and an active one a few
+    percent of one core at most. Per-request profiles keep only samples
+    taken while one of the request's tasks was running; tasks are tagged
+    at creation by a task factory, so work the request fans out with
+    asyncio.gather is included.
+    """
+    
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.recent: "OrderedDict[str, ProfileSession]" = OrderedDict()
+        self._sessions: List[ProfileSession] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[Any, str] = {}
+    
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Profile the given (or running) event loop"""
+        self.loop = loop or asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+    
+    # ===== Sampling =====
+    
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            roots = [root for root in sys.path if root and filename.startswith(root + os.sep)]
+            if roots:
+                filename = os.path.relpath(filename, max(roots, key=len))
+            label = self._labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+        return label
+    
+    def _is_idle(self, frame) -> bool:
+        return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES
+    
+    def _sample(self, now: float):
+        # Called with the lock held, so sessions can't be read while updated
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return
+        
+        idle = self._is_idle(frame)
+        task = asyncio.current_task(self.loop) if self.loop else None
+        stack = None
+        
+        for session in self._sessions:
+            if now < session._next_sample:
+                continue
+            session._next_sample = now + session.interval
+            
+            if session.tasks is not None and (task is None or task not in session.tasks):
+                continue
+            if idle:
+                session.idle_samples += 1
+                if not session.include_idle:
+                    continue
+            
+            if stack is None:
+                names = []
+                while frame is not None:
+                    names.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack = ";".join(reversed(names))
+            session.stacks[stack] += 1
+            session.samples += 1
+    
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                interval = min(session.interval for session in self._sessions)
+                self._sample(time.monotonic())
+            time.sleep(interval)
+    
+    def _start(self, session: ProfileSession):
+        if self.loop_thread_id is None:
+            self.attach()
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+    
+    def _stop(self, session: ProfileSession):
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        session.duration = time.monotonic() - session.started
+        self.recent[session.id] = session
+        while len(self.recent) > settings.profile_keep:
+            self.recent.popitem(last=False)
+    
+    # ===== Profiles =====
+    
+    async def profile(
+        self,
+        seconds: float,
+        interval: float,
+        include_idle: bool = False
+    ) -> ProfileSession:
+        """
+        Sample the event loop thread for a number of seconds
+        
+        Args:
+            seconds: Profile duration
+            interval: Seconds between samples
+            include_idle: Keep samples of the loop waiting for I/O
+            
+        Returns:
+            Finished session
+        """
+        session = ProfileSession(interval, include_idle)
+        self._start(session)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self._stop(session)
+        return session
+    
+    @contextmanager
+    def profile_request(self, interval: Optional[float] = None) -> Iterator[ProfileSession]:
+        """
+        Profile the current request and every task it creates
+        
+        Args:
+            interval: Seconds between samples (default settings.profile_interval)
+        """
+        loop = asyncio.get_running_loop()
+        if loop.get_task_factory() is not _task_factory:
+            loop.set_task_factory(_task_factory)
+        
+        session = ProfileSession(interval or settings.profile_interval, tasks=weakref.WeakSet())
+        current = asyncio.current_task()
+        if current is not None:
+            session.tasks.add(current)
+        
+        token = _request_session.set(session)
+        self._start(session)
+        try:
+            yield session
+        finally:
+            self._stop(session)
+            _request_session.reset(token)
+
+
+def _task_factory(loop, coro, context=None):
+    """Create tasks as usual, tagging those started inside a profiled request"""
+    task = asyncio.Task(coro, loop=loop, context=context)
+    session = context.get(_request_session) if context is not None else _request_session.get()
+    if session is not None:
+        session.tasks.add(task)
+    return task
+
+
+# Global profiler instance
+profiler = SamplingProfiler()
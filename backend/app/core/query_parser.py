@@ -0,0 +1,150 @@
+"""Query understanding with a single compiled multi-pattern matcher"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent.parent / "data" / "taxonomy.json"
+
+
+@dataclass(frozen=True)
+class TermMatch:
+    """A taxonomy term found in a query"""
+    kind: str
+    value: str
+    text: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    """All taxonomy matches of a query, in order of appearance"""
+    text: str
+    matches: Tuple[TermMatch, ...]
+    
+    def values(self, kind: str) -> List[str]:
+        """Distinct matched values of one kind, in order of appearance"""
+        seen: List[str] = []
+        for match in self.matches:
+            if match.kind == kind and match.value not in seen:
+                seen.append(match.value)
+        return seen
+    
+    def first(self, kind: str) -> str:
+        """First matched value of one kind ("" if none)"""
+        values = self.values(kind)
+        return values[0] if values else ""
+
+
+def _trie_pattern(terms: List[str]) -> str:
+    """
+    Build a regex matching any of the terms, structured as a prefix trie
+    
+    Alternatives share prefixes, so the regex engine does work proportional
+    to the match length rather than the vocabulary size. Optional suffixes
+    are greedy, so the longest term wins ("fine dining" over "fine").
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def build(node: Dict[str, dict]) -> str:
+        is_end = "" in node
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if is_end:
+            return "(?:" + body + ")?"
+        return body
+    
+    return build(trie)
+
+
+class QueryParser:
+    """
+    Extracts cuisines, dishes, dietary needs, price and ambience from text
+    
+    The whole taxonomy is compiled into one regex with word boundaries, so
+    "thai" does not match inside "thailand" and every term is found in a
+    single scan regardless of vocabulary size.
+    """
+    
+    def __init__(self, taxonomy: Dict[str, Dict[str, List[str]]]):
+        self.lookup: Dict[str, List[Tuple[str, str]]] = {}
+        for kind, entries in taxonomy.items():
+            for value, terms in entries.items():
+                for term in terms:
+                    normalized = " ".join(term.lower().split())
+                    if normalized:
+                        self.lookup.setdefault(normalized, []).append((kind, value))
+        
+        self.pattern = re.compile(
+            r"(?<!\w)" + _trie_pattern(list(self.lookup)) + r"(?!\w)"
+        ) if self.lookup else None
+        self.parse = lru_cache(maxsize=4096)(self._parse)
+    
+    @classmethod
+    def from_file(cls, path: str) -> "QueryParser":
+        """Create a parser from a JSON taxonomy file"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+    
+    def find(self, text: str) -> List[TermMatch]:
+        """
+        Find all taxonomy terms in a text
+        
+        Args:
+            text: Free text (matched case-insensitively)
+            
+        Returns:
+            Non-overlapping matches, leftmost-longest, with spans into text
+        """
+        if self.pattern is None:
+            return []
+        
+        normalized = text.lower()
+        matches = []
+        for found in self.pattern.finditer(normalized):
+            for kind, value in self.lookup.get(found.group(0), []):
+                matches.append(TermMatch(
+                    kind=kind,
+                    value=value,
+                    text=text[found.start():found.end()],
+                    start=found.start(),
+                    end=found.end()
+                ))
+        return matches
+    
+    def _parse(self, text: str) -> ParsedQuery:
+        return ParsedQuery(text=text, matches=tuple(self.find(text)))
+
+
+def load_query_parser() -> QueryParser:
+    """Create the query parser from the configured (or bundled) taxonomy"""
+    path = settings.taxonomy_path or str(DEFAULT_TAXONOMY_PATH)
+    try:
+        return QueryParser.from_file(path)
+    except Exception as e:
+        logger.error(f"Failed to load taxonomy from {path}: {e}")
+        return QueryParser({})
+
+
+# Global query parser instance
+query_parser = load_query_parser()
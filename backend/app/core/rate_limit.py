@@ -0,0 +1,73 @@
+"""Async rate limiting for upstream APIs"""
+
+import asyncio
+import time
+from typing import Optional
+
+from app.config import settings
+
+
+class RateLimiter:
+    """
+    Token bucket with an optional cap on in-flight requests
+    
+    ``async with limiter:`` waits for a token (``rate`` per second, bursts
+    of up to ``burst``) and a concurrency slot, so many concurrent callers
+    share one upstream budget. A rate of 0 disables the bucket.
+    """
+    
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ):
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+    
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        if self.rate <= 0:
+            return
+        
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    async def __aenter__(self) -> "RateLimiter":
+        if self._semaphore is not None:
+            await self._semaphore.acquire()
+        try:
+            await self.acquire()
+        except BaseException:
+            if self._semaphore is not None:
+                self._semaphore.release()
+            raise
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+
+# Global Yelp rate limiter instance
+yelp_limiter = RateLimiter(
+    settings.yelp_requests_per_second,
+    concurrency=settings.yelp_max_concurrency
+)
+
+# Global Google Maps Platform rate limiter instance
+google_limiter = RateLimiter(
+    settings.google_requests_per_second,
+    concurrency=settings.google_max_concurrency
+)
@@ -0,0 +1,273 @@
+"""Record/replay transports for upstream HTTP APIs"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+from app.config import settings
+from app.core import synthetic
+
+logger = logging.getLogger(__name__)
+
+# Query parameters and headers that carry credentials and never reach cassettes
+_SECRET_PARAMS = frozenset({"key", "api_key", "apikey"})
+
+# Responses kept per request, for upstreams that answer differently each time
+MAX_VARIANTS = 5
+
+
+def _canonical_body(content: bytes) -> str:
+    if not content:
+        return ""
+    try:
+        return json.dumps(json.loads(content), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return content.decode("utf-8", errors="replace")
+
+
+def _public_url(url: httpx.URL) -> str:
+    """URL with credentials removed and query parameters sorted"""
+    params = sorted(
+        (name, value) for name, value in parse_qsl(url.query.decode(), keep_blank_values=True)
+        if name.lower() not in _SECRET_PARAMS
+    )
+    query = f"?{urlencode(params)}" if params else ""
+    return f"{url.scheme}://{url.host}{url.path}{query}"
+
+
+class CassetteStore:
+    """
+    Recorded responses on disk, one JSON file per distinct request
+    
+    Requests are identified by method, credential-free URL and canonical
+    JSON body, so the same call with a different API key or header order
+    replays the same cassette.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or settings.cassette_dir)
+        self._memory: Dict[str, Optional[Dict[str, Any]]] = {}
+    
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        """Stable identifier of a request"""
+        identity = "\n".join([
+            request.method,
+            _public_url(request.url),
+            _canonical_body(request.content)
+        ])
+        return hashlib.sha256(identity.encode()).hexdigest()
+    
+    def _path(self, request: httpx.Request, key: str) -> Path:
+        return self.directory / request.url.host / f"{key}.json"
+    
+    def load(self, request: httpx.Request) -> Optional[Dict[str, Any]]:
+        """Cassette for a request (None if never recorded)"""
+        key = self.key(request)
+        if key not in self._memory:
+            try:
+                with open(self._path(request, key), "r", encoding="utf-8") as f:
+                    self._memory[key] = json.load(f)
+            except FileNotFoundError:
+                return None
+        return self._memory[key]
+    
+    def save(self, request: httpx.Request, response: httpx.Response, body: bytes):
+        """Add a response to a request's cassette"""
+        key = self.key(request)
+        cassette = self.load(request) or {
+            "request": {
+                "method": request.method,
+                "url": _public_url(request.url),
+                "body": _canonical_body(request.content)
+            },
+            "responses": []
+        }
+        
+        recorded = {
+            "status_code": response.status_code,
+            "content_type": response.headers.get("content-type", "application/json"),
+            "body": body.decode("utf-8", errors="replace")
+        }
+        if recorded not in cassette["responses"]:
+            cassette["responses"] = (cassette["responses"] + [recorded])[-MAX_VARIANTS:]
+        
+        path = self._path(request, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cassette, f, indent=2)
+        os.replace(tmp_path, path)
+        self._memory[key] = cassette
+
+
+class LatencyModel:
+    """
+    Simulated upstream latency
+    
+    Each host has a median latency in milliseconds (``default`` applies to
+    the rest), spread by the configured distribution: ``fixed``,
+    ``uniform`` (median +/- spread), ``lognormal`` (sigma = spread) or
+    ``exponential``.
+    """
+    
+    def __init__(
+        self,
+        medians_ms: Optional[Dict[str, float]] = None,
+        distribution: Optional[str] = None,
+        spread: Optional[float] = None,
+        rng: Optional[random.Random] = None
+    ):
+        self.medians_ms = medians_ms if medians_ms is not None else settings.replay_latency_ms
+        self.distribution = distribution or settings.replay_latency_distribution
+        self.spread = spread if spread is not None else settings.replay_latency_spread
+        self.rng = rng or random.Random()
+    
+    def sample(self, host: str) -> float:
+        """Latency in seconds for one request to a host"""
+        median = self.medians_ms.get(host, self.medians_ms.get("default", 0.0)) / 1000.0
+        if median <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            return max(0.0, median * self.rng.uniform(1 - self.spread, 1 + self.spread))
+        if self.distribution == "lognormal":
+            return median * math.exp(self.rng.gauss(0.0, self.spread))
+        if self.distribution == "exponential":
+            return self.rng.expovariate(1.0 / median)
+        return median
+
+
+class SimulatedTransport(httpx.AsyncBaseTransport):
+    """
+    Answers requests from cassettes and/or templates without the network
+    
+    Adds sampled latency and injects 503 responses or timeouts at the
+    configured rates, so error handling and tail latency can be exercised.
+    """
+    
+    def __init__(
+        self,
+        cassettes: Optional[CassetteStore] = None,
+        latency: Optional[LatencyModel] = None,
+        error_rate: Optional[float] = None,
+        timeout_rate: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        self.cassettes = cassettes
+        self.rng = random.Random(seed if seed is not None else settings.replay_seed)
+        self.latency = latency or LatencyModel(rng=self.rng)
+        self.error_rate = error_rate if error_rate is not None else settings.replay_error_rate
+        self.timeout_rate = (
+            timeout_rate if timeout_rate is not None else settings.replay_timeout_rate
+        )
+    
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        if self.cassettes is not None:
+            cassette = self.cassettes.load(request)
+            if cassette and cassette["responses"]:
+                recorded = self.rng.choice(cassette["responses"])
+                return httpx.Response(
+                    recorded["status_code"],
+                    headers={"content-type": recorded["content_type"]},
+                    content=recorded["body"].encode("utf-8"),
+                    request=request
+                )
+            logger.debug(f"No cassette for {request.method} {_public_url(request.url)}")
+        
+        response = synthetic.generate(request)
+        if response is not None:
+            return response
+        return httpx.Response(
+            404,
+            json={"error": f"No recorded or synthetic response for {request.url.path}"},
+            request=request
+        )
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        
+        delay = self.latency.sample(request.url.host)
+        roll = self.rng.random()
+        
+        if roll < self.timeout_rate:
+            await asyncio.sleep(delay)
+            raise httpx.ReadTimeout("Injected upstream timeout", request=request)
+        
+        if delay:
+            await asyncio.sleep(delay)
+        
+        if roll < self.timeout_rate + self.error_rate:
+            return httpx.Response(
+                503,
+                json={"error": "Injected upstream error"},
+                request=request
+            )
+        return self._respond(request)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forwards requests to the network and saves every response to cassettes"""
+    
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        cassettes: Optional[CassetteStore] = None
+    ):
+        self.transport = transport
+        self.cassettes = cassettes or CassetteStore()
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        response = await self.transport.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        
+        try:
+            self.cassettes.save(request, response, body)
+        except Exception as e:
+            logger.warning(f"Failed to record {request.url.host}{request.url.path}: {e}")
+        
+        # The body was decoded while reading; hand back plain content
+        return httpx.Response(
+            response.status_code,
+            headers={
+                name: value for name, value in response.headers.items()
+                if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+            },
+            content=body,
+            request=request,
+            extensions=response.extensions
+        )
+    
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def upstream_transport(limits: Optional[httpx.Limits] = None) -> httpx.AsyncBaseTransport:
+    """
+    Transport for upstream API clients according to settings.upstream_mode
+    
+    ``live`` uses the network, ``record`` uses the network and saves
+    cassettes, ``replay`` serves cassettes (falling back to templates for
+    requests that were never recorded) and ``synthetic`` serves templates
+    only. Replay and synthetic modes never open a connection.
+    """
+    mode = settings.upstream_mode
+    if mode == "replay":
+        return SimulatedTransport(cassettes=CassetteStore())
+    if mode == "synthetic":
+        return SimulatedTransport()
+    
+    transport = httpx.AsyncHTTPTransport(limits=limits or httpx.Limits())
+    if mode == "record":
+        return RecordingTransport(transport)
+    return transport
@@ -0,0 +1,181 @@
+"""Feature-based reranking of merged restaurant candidates"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.core.query_parser import query_parser
+from app.models.restaurant import RestaurantRecord
+
+logger = logging.getLogger(__name__)
+
+FEATURES = (
+    "retrieval",
+    "semantic",
+    "proximity",
+    "rating",
+    "review_count",
+    "price_match",
+    "category_match",
+    "open",
+    "ambience_match"
+)
+
+
+class Reranker:
+    """
+    Linear reranker over a per-candidate feature matrix
+    
+    All candidates are scored with a single matrix-vector product; features
+    are scaled to roughly [0, 1] so weights are comparable.
+    """
+    
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.set_weights(weights or settings.rerank_weights)
+    
+    def set_weights(self, weights: Dict[str, float]):
+        """
+        Set feature weights (features that are not given get weight 0)
+        
+        Args:
+            weights: Feature name to weight
+        """
+        unknown = set(weights) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown rerank features: {', '.join(sorted(unknown))}")
+        self.weights = np.array([float(weights.get(name, 0.0)) for name in FEATURES])
+    
+    @classmethod
+    def from_file(cls, path: str) -> "Reranker":
+        """Create a reranker with weights loaded from a JSON file"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+    
+    def feature_matrix(
+        self,
+        candidates: List[RestaurantRecord],
+        search_params: Optional[Dict[str, Any]] = None
+    ) -> np.ndarray:
+        """
+        Build the (candidates x features) matrix
+        
+        Args:
+            candidates: Merged restaurant records (with ``distance``
+                filled in where the user location is known)
+            search_params: Extracted search parameters (term, price,
+                ambience)
+            
+        Returns:
+            Feature matrix with columns in FEATURES order
+        """
+        search_params = search_params or {}
+        n = len(candidates)
+        matrix = np.zeros((n, len(FEATURES)))
+        if n == 0:
+            return matrix
+        
+        retrieval = np.array([c.retrieval_score for c in candidates])
+        if retrieval.max() > 0:
+            matrix[:, 0] = retrieval / retrieval.max()
+        
+        matrix[:, 1] = [c.semantic_score for c in candidates]
+        
+        distances = np.array(
+            [c.distance if c.distance is not None else np.nan for c in candidates],
+            dtype=float
+        )
+        scale = float(settings.default_search_radius)
+        matrix[:, 2] = np.nan_to_num(1.0 / (1.0 + distances / scale), nan=0.0)
+        
+        matrix[:, 3] = [(c.rating or 0.0) / 5.0 for c in candidates]
+        
+        review_counts = np.log1p([c.review_count for c in candidates])
+        if review_counts.max() > 0:
+            matrix[:, 4] = review_counts / review_counts.max()
+        
+        price_levels = {
+            int(level) for level in str(search_params.get("price") or "").split(",")
+            if level.strip().isdigit()
+        }
+        if price_levels:
+            matrix[:, 5] = [len(c.price or "") in price_levels for c in candidates]
+        
+        terms = set(str(search_params.get("term") or "").lower().split())
+        if terms:
+            matrix[:, 6] = [bool(terms & self._category_terms(c)) for c in candidates]
+        
+        matrix[:, 7] = [not c.is_closed for c in candidates]
+        
+        ambience = set(search_params.get("ambience") or ())
+        if ambience:
+            matrix[:, 8] = [len(ambience & self._ambience(c)) / len(ambience) for c in candidates]
+        
+        return matrix
+    
+    def rerank(
+        self,
+        candidates: List[RestaurantRecord],
+        search_params: Optional[Dict[str, Any]] = None,
+        top_k: Optional[int] = None
+    ) -> List[RestaurantRecord]:
+        """
+        Sort candidates by weighted feature score
+        
+        Args:
+            candidates: Merged restaurant records
+            search_params: Extracted search parameters
+            top_k: Optional number of candidates to keep
+            
+        Returns:
+            Candidates best first, each annotated with ``rerank_score``
+        """
+        if not candidates:
+            return []
+        
+        scores = self.feature_matrix(candidates, search_params) @ self.weights
+        # Stable sort keeps the fused retrieval order for ties
+        order = np.argsort(-scores, kind="stable")
+        if top_k is not None:
+            order = order[:top_k]
+        
+        ranked = []
+        for idx in order:
+            candidate = candidates[idx]
+            candidate.rerank_score = float(scores[idx])
+            ranked.append(candidate)
+        return ranked
+    
+    @staticmethod
+    def _category_terms(candidate: RestaurantRecord) -> set:
+        """Lowercased words of a candidate's category titles and aliases"""
+        words = set()
+        for alias, title in candidate.categories:
+            words.update(f"{title} {alias}".lower().replace("_", " ").split())
+        return words
+    
+    @staticmethod
+    def _ambience(candidate: RestaurantRecord) -> set:
+        """Ambience values mentioned by a candidate's categories, menu or review snippets"""
+        text = " | ".join([
+            *(title for _, title in candidate.categories),
+            candidate.menu_summary or "",
+            *(review.get("text") or "" for review in candidate.reviews)
+        ])
+        return {match.value for match in query_parser.find(text) if match.kind == "ambience"}
+
+
+def load_reranker() -> Reranker:
+    """Create the reranker from settings, preferring a weights file if configured"""
+    if settings.rerank_weights_path:
+        try:
+            return Reranker.from_file(settings.rerank_weights_path)
+        except Exception as e:
+            logger.error(f"Failed to load rerank weights from {settings.rerank_weights_path}: {e}")
+    return Reranker()
+
+
+# Global reranker instance
+reranker = load_reranker()
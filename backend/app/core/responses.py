@@ -0,0 +1,38 @@
+"""Fast JSON responses"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes the way FastJSONResponse does"""
+    return orjson.dumps(
+        content,
+        default=_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    )
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    JSON response rendered with orjson
+    
+    Returned directly by routes whose content is already normalized (see
+    app.models.restaurant.RestaurantRecord), so FastAPI neither
+    validates it against the response model nor runs jsonable_encoder over
+    it. Numpy scalars (distances, scores) are serialized natively.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,98 @@
+"""Coalescing of identical upstream calls made by concurrent work"""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Hashable, Iterator, Optional, TypeVar
+
+from app.core.metrics import CACHE_REQUESTS
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs one call per key and hands its result to every caller
+    
+    Callers asking for a key while its call is running wait for that call
+    instead of starting their own. With ``keep`` the results also stay
+    for later callers (a memo for the lifetime of the group); failures are
+    never kept, so the next caller retries. A caller being cancelled
+    doesn't cancel the call others wait for.
+    """
+    
+    def __init__(self, keep: bool = False):
+        self.keep = keep
+        self.calls: Dict[Hashable, asyncio.Future] = {}
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Result of func(), shared with other callers of the same key
+        
+        Args:
+            key: Identity of the call (e.g. the tool name and its arguments)
+            func: Makes the call when no caller has
+            
+        Returns:
+            The call's result
+        """
+        call = self.calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self.calls[key] = call
+            call.add_done_callback(lambda _: self._finished(key, call))
+        return await asyncio.shield(call)
+    
+    def _finished(self, key: Hashable, call: asyncio.Future):
+        if self.calls.get(key) is not call:
+            return
+        if not self.keep or call.cancelled() or call.exception() is not None:
+            del self.calls[key]
+    
+    def __len__(self) -> int:
+        return len(self.calls)
+
+
+# Group the current task's calls go through (see shared_calls)
+_group: ContextVar[Optional[SingleFlight]] = ContextVar("singleflight", default=None)
+
+
+@contextmanager
+def shared_calls(group: SingleFlight) -> Iterator[SingleFlight]:
+    """
+    Route the calls made inside the block through a group
+    
+    Used by batch jobs, whose queries repeat the same geocodes, searches
+    and review lookups: each query runs its pipeline inside the batch's
+    group (created with ``keep``). Outside such a block share() just makes
+    the call.
+    
+    Args:
+        group: Group shared by the block (and the tasks it starts)
+    """
+    token = _group.set(group)
+    try:
+        yield group
+    finally:
+        _group.reset(token)
+
+
+async def share(namespace: str, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+    """
+    Make a call, or join the identical one of the current shared_calls() scope
+    
+    Args:
+        namespace: Kind of call (counted like a cache namespace)
+        key: Arguments identifying the call within the namespace
+        func: Makes the call
+        
+    Returns:
+        The call's result; callers must not mutate it
+    """
+    group = _group.get()
+    if group is None:
+        return await func()
+    
+    result = "hit" if (namespace, key) in group.calls else "miss"
+    CACHE_REQUESTS.labels(f"shared.{namespace}", result).inc()
+    return await group.do((namespace, key), func)
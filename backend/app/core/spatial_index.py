@@ -0,0 +1,232 @@
+"""In-memory spatial index over the ingested restaurant catalog"""
+
+import logging
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.core.geo import EARTH_RADIUS_M, coordinates_of, haversine
+from app.core.lexical_index import lexical_index
+
+logger = logging.getLogger(__name__)
+
+# Meters per degree of latitude
+_METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180.0
+
+Cell = Tuple[int, int]
+
+
+class SpatialIndex:
+    """
+    Uniform lat/lng grid answering radius and k-nearest queries in-process
+    
+    Restaurants are bucketed into square cells of ``cell_size`` degrees. A
+    query only visits the cells overlapping its bounding box and computes
+    exact haversine distances for their members in one vectorized call.
+    The index mirrors the restaurant documents of the lexical index, which
+    ingestion keeps up to date, and is synced incrementally.
+    """
+    
+    def __init__(self, cell_size: Optional[float] = None):
+        self.cell_size = cell_size or settings.spatial_cell_size
+        self.cells: Dict[Cell, Dict[str, Tuple[float, float]]] = {}
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.points: Dict[str, Tuple[float, float]] = {}
+        self._synced_version: Optional[int] = None
+    
+    def __len__(self) -> int:
+        return len(self.points)
+    
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        return (
+            math.floor(latitude / self.cell_size),
+            math.floor(longitude / self.cell_size)
+        )
+    
+    def upsert(self, restaurant_id: str, restaurant: Dict[str, Any]):
+        """
+        Add or move a restaurant (restaurants without coordinates are skipped)
+        
+        Args:
+            restaurant_id: Business ID
+            restaurant: Restaurant payload returned by queries
+        """
+        latitude, longitude = coordinates_of(restaurant)
+        if math.isnan(latitude) or math.isnan(longitude):
+            self.remove(restaurant_id)
+            return
+        
+        if self.points.get(restaurant_id) != (latitude, longitude):
+            self.remove(restaurant_id)
+            self.cells.setdefault(self._cell(latitude, longitude), {})[restaurant_id] = (
+                latitude, longitude
+            )
+            self.points[restaurant_id] = (latitude, longitude)
+        self.records[restaurant_id] = restaurant
+    
+    def remove(self, restaurant_id: str):
+        """Remove a restaurant if present"""
+        point = self.points.pop(restaurant_id, None)
+        self.records.pop(restaurant_id, None)
+        if point is None:
+            return
+        
+        cell = self._cell(*point)
+        members = self.cells.get(cell)
+        if members is not None:
+            members.pop(restaurant_id, None)
+            if not members:
+                del self.cells[cell]
+    
+    def sync(self, catalog: Dict[str, Dict[str, Any]]):
+        """
+        Incrementally bring the index in line with a catalog
+        
+        Args:
+            catalog: Business ID to restaurant payload
+        """
+        for restaurant_id in [rid for rid in self.records if rid not in catalog]:
+            self.remove(restaurant_id)
+        for restaurant_id, restaurant in catalog.items():
+            if self.records.get(restaurant_id) is not restaurant:
+                self.upsert(restaurant_id, restaurant)
+    
+    def refresh(self):
+        """Sync with the lexical index if ingestion changed it"""
+        lexical_index.reload_if_changed()
+        if lexical_index.version != self._synced_version:
+            self.sync(lexical_index.restaurants())
+            self._synced_version = lexical_index.version
+            logger.info(f"Spatial index synced with {len(self)} restaurants")
+    
+    def covers(self, latitude: float, longitude: float) -> bool:
+        """Whether the catalog has restaurants in the cell containing a point"""
+        return self._cell(latitude, longitude) in self.cells
+    
+    def within_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Restaurants within a radius, nearest first
+        
+        Args:
+            latitude: Center latitude
+            longitude: Center longitude
+            radius: Radius in meters
+            limit: Optional number of nearest restaurants to return; only
+                those payloads are copied
+            
+        Returns:
+            Copies of restaurant payloads with ``distance`` set, and the
+            number of restaurants within the radius (before the limit)
+        """
+        ids, distances, inside = self._inside(latitude, longitude, radius)
+        order = inside[np.argsort(distances[inside], kind="stable")]
+        if limit is not None:
+            order = order[:limit]
+        return [self._result(ids[idx], distances[idx]) for idx in order], len(inside)
+    
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        max_radius: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        The k restaurants nearest to a point
+        
+        The search radius starts at one cell and doubles until k restaurants
+        are found (or ``max_radius`` is reached); anything inside the final
+        radius is exact, so the answer is the true k nearest.
+        
+        Args:
+            latitude: Center latitude
+            longitude: Center longitude
+            k: Number of restaurants
+            max_radius: Optional cap on the distance in meters
+            
+        Returns:
+            Copies of restaurant payloads with ``distance`` set, nearest first
+        """
+        if not self.points or k <= 0:
+            return []
+        
+        radius = self.cell_size * _METERS_PER_DEGREE
+        limit = max_radius if max_radius is not None else math.pi * EARTH_RADIUS_M
+        
+        while True:
+            radius = min(radius, limit)
+            results, total = self.within_radius(latitude, longitude, radius, limit=k)
+            if total >= k or radius >= limit:
+                return results
+            radius *= 2
+    
+    def _inside(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Candidate IDs, their distances and the indices of those within a radius"""
+        ids, lats, lngs = self._candidates(latitude, longitude, radius)
+        if not ids:
+            return [], np.empty(0), np.empty(0, dtype=int)
+        
+        distances = haversine(latitude, longitude, lats, lngs)
+        return ids, distances, np.flatnonzero(distances <= radius)
+    
+    def _candidates(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Restaurants in the cells overlapping a radius' bounding box"""
+        lat_span = radius / _METERS_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+        lng_span = min(lat_span / cos_lat, 180.0)
+        
+        min_row, min_col = self._cell(latitude - lat_span, longitude - lng_span)
+        max_row, max_col = self._cell(latitude + lat_span, longitude + lng_span)
+        
+        ids: List[str] = []
+        coords: List[Tuple[float, float]] = []
+        
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self.cells):
+            # Huge radius: scanning occupied cells is cheaper than the box
+            cells = [
+                members for (row, col), members in self.cells.items()
+                if min_row <= row <= max_row and min_col <= col <= max_col
+            ]
+        else:
+            cells = [
+                self.cells[(row, col)]
+                for row in range(min_row, max_row + 1)
+                for col in range(min_col, max_col + 1)
+                if (row, col) in self.cells
+            ]
+        
+        for members in cells:
+            ids.extend(members.keys())
+            coords.extend(members.values())
+        
+        if not ids:
+            return [], np.empty(0), np.empty(0)
+        array = np.array(coords, dtype=float)
+        return ids, array[:, 0], array[:, 1]
+    
+    def _result(self, restaurant_id: str, distance: float) -> Dict[str, Any]:
+        result = dict(self.records[restaurant_id])
+        result["distance"] = float(distance)
+        return result
+
+
+# Global spatial index instance
+spatial_index = SpatialIndex()
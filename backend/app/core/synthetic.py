@@ -0,0 +1,482 @@
+"""Synthetic upstream API responses generated from templates"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+
+from app.config import settings
+
+# Default center for requests without coordinates (San Francisco)
+_DEFAULT_CENTER = (37.7749, -122.4194)
+
+_CUISINES = [
+    ("italian", "Italian"), ("japanese", "Japanese"), ("mexican", "Mexican"),
+    ("thai", "Thai"), ("indpak", "Indian"), ("chinese", "Chinese"),
+    ("french", "French"), ("korean", "Korean"), ("vegan", "Vegan"),
+    ("pizza", "Pizza"), ("sushi", "Sushi Bars"), ("burgers", "Burgers"),
+    ("mediterranean", "Mediterranean"), ("seafood", "Seafood"), ("ramen", "Ramen")
+]
+
+_NAME_WORDS = [
+    "Golden", "Little", "Blue", "Corner", "Garden", "Harbor", "Oak", "Lotus",
+    "Olive", "Saffron", "Ember", "Copper", "Willow", "Juniper", "Silver"
+]
+
+_NAME_SUFFIXES = ["Kitchen", "House", "Table", "Bistro", "Eatery", "Cantina", "Bar", "Cafe"]
+
+_STREETS = ["Mission St", "Valencia St", "Market St", "Broadway", "Main St", "2nd Ave", "Oak St"]
+
+_REVIEW_SENTENCES = [
+    "The food was fantastic and the service was quick.",
+    "Great spot for a date night, a bit loud on weekends.",
+    "Portions are generous and prices are fair.",
+    "Loved the signature dish, dessert was the highlight.",
+    "Long wait but worth it, staff were friendly.",
+    "Vegetarian options are clearly marked and delicious.",
+    "Cozy atmosphere with outdoor seating in summer.",
+    "A little pricey, but the quality shows."
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_LIST_ITEM_RE = re.compile(r"^\s*\d+\.\s+(.+)$", re.MULTILINE)
+
+
+def _rng(*parts: Any) -> random.Random:
+    """Random generator seeded from request content, so responses are repeatable"""
+    seed = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    return random.Random(int(seed[:16], 16))
+
+
+def _center(params: Dict[str, str]) -> Tuple[float, float]:
+    """Search center from latitude/longitude, "lat,lng" or a location string"""
+    if "latitude" in params and "longitude" in params:
+        return float(params["latitude"]), float(params["longitude"])
+    for key in ("location", "latlng"):
+        if "," in params.get(key, ""):
+            lat, _, lng = params[key].partition(",")
+            try:
+                return float(lat), float(lng)
+            except ValueError:
+                pass
+    address = params.get("location") or params.get("address")
+    if address:
+        from app.core.gazetteer import gazetteer
+        place = gazetteer.lookup(address)
+        if place:
+            return place["latitude"], place["longitude"]
+        rng = _rng("center", address.lower())
+        return rng.uniform(30.0, 45.0), rng.uniform(-120.0, -75.0)
+    return _DEFAULT_CENTER
+
+
+def _offset(center: Tuple[float, float], rng: random.Random, radius: float) -> Tuple[float, float]:
+    """A random point within ``radius`` meters of a center"""
+    distance = radius * math.sqrt(rng.random())
+    bearing = rng.uniform(0, 2 * math.pi)
+    d_lat = distance * math.cos(bearing) / 111_320.0
+    meters_per_degree_lng = 111_320.0 * max(math.cos(math.radians(center[0])), 1e-6)
+    d_lng = distance * math.sin(bearing) / meters_per_degree_lng
+    return center[0] + d_lat, center[1] + d_lng
+
+
+def _cuisine(term: str, rng: random.Random) -> Tuple[str, str]:
+    words = set(_TOKEN_RE.findall(term.lower()))
+    for alias, title in _CUISINES:
+        if alias in words or title.lower() in words:
+            return alias, title
+    return rng.choice(_CUISINES)
+
+
+def _business(business_id: str, center: Tuple[float, float], term: str = "", radius: float = 5000):
+    rng = _rng("business", business_id)
+    alias, title = _cuisine(term, rng)
+    latitude, longitude = _offset(center, rng, radius)
+    street = f"{rng.randint(1, 3000)} {rng.choice(_STREETS)}"
+    return {
+        "id": business_id,
+        "alias": business_id,
+        "name": f"{rng.choice(_NAME_WORDS)} {title} {rng.choice(_NAME_SUFFIXES)}",
+        "image_url": f"https://example.com/photos/{business_id}.jpg",
+        "is_closed": False,
+        "url": f"https://www.yelp.com/biz/{business_id}",
+        "review_count": rng.randint(5, 3000),
+        "categories": [{"alias": alias, "title": title}],
+        "rating": rng.choice([3.0, 3.5, 4.0, 4.0, 4.5, 4.5, 5.0]),
+        "coordinates": {"latitude": latitude, "longitude": longitude},
+        "transactions": ["pickup", "delivery"],
+        "price": "$" * rng.randint(1, 4),
+        "location": {
+            "address1": street,
+            "city": "Synthetic City",
+            "zip_code": f"{rng.randint(10000, 99999)}",
+            "country": "US",
+            "state": "CA",
+            "display_address": [street, "Synthetic City, CA"]
+        },
+        "phone": f"+1555{rng.randint(1000000, 9999999)}",
+        "distance": math.dist(center, (latitude, longitude)) * 111_320.0
+    }
+
+
+def _review(business_id: str, idx: int) -> Dict[str, Any]:
+    rng = _rng("review", business_id, idx)
+    return {
+        "id": f"{business_id}-review-{idx}",
+        "rating": rng.randint(2, 5),
+        "text": " ".join(rng.sample(_REVIEW_SENTENCES, 3)),
+        "time_created": f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)} 19:30:00",
+        "user": {"name": f"Diner {rng.randint(1, 9999)}"}
+    }
+
+
+# ===== Yelp =====
+
+def yelp_search(request: httpx.Request, params: Dict[str, str], body: Any) -> Dict[str, Any]:
+    center = _center(params)
+    term = " ".join(filter(None, [params.get("term"), params.get("categories")]))
+    radius = float(params.get("radius", 5000))
+    limit = int(params.get("limit", 20))
+    offset = int(params.get("offset", 0))
+    total = 240
+    key = (round(center[0], 3), round(center[1], 3), term.lower())
+    businesses = [
+        _business(f"synthetic-{hashlib.sha1(repr((key, idx)).encode()).hexdigest()[:12]}",
+                  center, term, radius)
+        for idx in range(offset, min(offset + limit, total))
+    ]
+    return {
+        "businesses": businesses,
+        "total": total,
+        "region": {"center": {"latitude": center[0], "longitude": center[1]}}
+    }
+
+
+def yelp_business(request: httpx.Request, params: Dict[str, str], body: Any) -> Dict[str, Any]:
+    business_id = request.url.path.rstrip("/").split("/")[-1]
+    return _business(business_id, _DEFAULT_CENTER)
+
+
+def yelp_reviews(request: httpx.Request, params: Dict[str, str], body: Any) -> Dict[str, Any]:
+    business_id = request.url.path.rstrip("/").split("/")[-2]
+    limit = int(params.get("limit", 3))
+    return {
+        "reviews": [_review(business_id, idx) for idx in range(limit)],
+        "total": 3 + _rng("total", business_id).randint(0, 500)
+    }
+
+
+def yelp_autocomplete(request: httpx.Request, params: Dict[str, str], body: Any) -> Dict[str, Any]:
+    text = params.get("text", "")
+    return {
+        "terms": [{"text": f"{text} {suffix}".strip()} for suffix in ("", "near me", "delivery")],
+        "businesses": [],
+        "categories": [{"alias": alias, "title": title} for alias, title in _CUISINES
+                       if title.lower().startswith(text.lower())][:3]
+    }
+
+
+# ===== Google =====
+
+def _component(long_name: str, short_name: str, kind: str) -> Dict[str, Any]:
+    return {"long_name": long_name, "short_name": short_name, "types": [kind]}
+
+
+def google_geocode(request: httpx.Request, params: Dict[str, str], body: Any) -> Dict[str, Any]:
+    if "latlng" in params:
+        latitude, longitude = _center(params)
+        rng = _rng("reverse", round(latitude, 3), round(longitude, 3))
+        zip_code = f"{rng.randint(10000, 99999)}"
+        return {
+            "status": "OK",
+            "results": [{
+                "formatted_address": (
+                    f"{rng.randint(1, 3000)} {rng.choice(_STREETS)}, "
+                    f"Synthetic City, CA {zip_code}, USA"
+                ),
+                "place_id": f"synthetic-place-{rng.getrandbits(48):012x}",
+                "address_components": [
+                    _component("Synthetic City", "Synthetic City", "locality"),
+                    _component("California", "CA", "administrative_area_level_1"),
+                    _component(zip_code, zip_code, "postal_code"),
+                    _component("United States", "US", "country")
+                ],
+                "geometry": {"location": {"lat": latitude, "lng": longitude}}
+            }]
+        }
+    
+    address = params.get("address", "")
+    latitude, longitude = _center({"address": address})
+    return {
+        "status": "OK",
+        "results": [{
+            "formatted_address": address.title(),
+            "place_id": f"synthetic-place-{_rng('geocode', address).getrandbits(48):012x}",
+            "geometry": {"location": {"lat": latitude, "lng": longitude}}
+        }]
+    }
+
+
+def _place(place_id: str, center: Tuple[float, float], term: str, radius: float) -> Dict[str, Any]:
+    business = _business(place_id, center, term, radius)
+    return {
+        "place_id": place_id,
+        "name": business["name"],
+        "rating": business["rating"],
+        "user_ratings_total": business["review_count"],
+        "price_level": len(business["price"]),
+        "types": ["restaurant", "food", "point_of_interest", "establishment"],
+        "geometry": {"location": {
+            "lat": business["coordinates"]["latitude"],
+            "lng": business["coordinates"]["longitude"]
+        }},
+        "formatted_address": ", ".join(business["location"]["display_address"]),
+        "vicinity": business["location"]["address1"],
+        "business_status": "OPERATIONAL"
+    }
+
+
+def google_places(request: httpx.Request, params: Dict[str, str], body: Any) -> Dict[str, Any]:
+    center = _center(params)
+    term = params.get("query") or params.get("type") or ""
+    radius = float(params.get("radius", 5000))
+    key = (round(center[0], 3), round(center[1], 3), term.lower())
+    return {
+        "status": "OK",
+        "results": [
+            _place(f"synthetic-{hashlib.sha1(repr((key, idx)).encode()).hexdigest()[:16]}",
+                   center, term, radius)
+            for idx in range(20)
+        ]
+    }
+
+
+def google_place_details(
+    request: httpx.Request,
+    params: Dict[str, str],
+    body: Any
+) -> Dict[str, Any]:
+    place = _place(params.get("place_id", "unknown"), _DEFAULT_CENTER, "", 5000)
+    place["formatted_phone_number"] = "(555) 010-0000"
+    place["opening_hours"] = {"open_now": True}
+    place["website"] = "https://example.com"
+    return {"status": "OK", "result": place}
+
+
+# ===== OpenAI / Anthropic =====
+
+def embedding_vector(text: str, dimension: Optional[int] = None) -> List[float]:
+    """
+    Feature-hashed bag-of-words embedding
+    
+    Texts sharing words get similar vectors, so semantic search over
+    synthetic embeddings still returns plausible neighbours.
+    """
+    dimension = dimension or settings.embedding_dimension
+    vector = [0.0] * dimension
+    for token in _TOKEN_RE.findall(text.lower()):
+        digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % dimension
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def openai_embeddings(request: httpx.Request, params: Dict[str, str], body: Any) -> Dict[str, Any]:
+    inputs = body.get("input", [])
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    dimension = body.get("dimensions") or settings.embedding_dimension
+    tokens = sum(len(text.split()) for text in inputs)
+    return {
+        "object": "list",
+        "data": [
+            {"object": "embedding", "index": idx, "embedding": embedding_vector(text, dimension)}
+            for idx, text in enumerate(inputs)
+        ],
+        "model": body.get("model", settings.embedding_model),
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+    }
+
+
+def _reply(messages: List[Dict[str, Any]]) -> str:
+    """A templated assistant answer naming restaurants found in the prompt"""
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    names = [
+        item.strip() for item in _LIST_ITEM_RE.findall(prompt)
+        if not item.strip().startswith(("Rating", "Price", "Cuisine", "Location"))
+    ][:3]
+    if not names:
+        return (
+            "I couldn't find restaurants matching that yet. "
+            "Could you tell me the area you're in?"
+        )
+    
+    lines = ["Here are a few places I'd recommend:"]
+    for name in names:
+        lines.append(f"- **{name}** - well reviewed and a good fit for what you asked.")
+    lines.append("Would you like more details on any of these?")
+    return "\n".join(lines)
+
+
+def openai_chat(request: httpx.Request, params: Dict[str, str], body: Any) -> Dict[str, Any]:
+    messages = body.get("messages", [])
+    content = _reply(messages)
+    prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+    completion_tokens = len(content.split())
+    return {
+        "id": f"chatcmpl-synthetic-{_rng('chat', messages).getrandbits(48):012x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", settings.llm_model),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+def anthropic_messages(request: httpx.Request, params: Dict[str, str], body: Any) -> Dict[str, Any]:
+    messages = body.get("messages", [])
+    content = _reply(messages)
+    return {
+        "id": f"msg_synthetic_{_rng('messages', messages).getrandbits(48):012x}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", settings.llm_model),
+        "content": [{"type": "text", "text": content}],
+        "stop_reason": "end_turn",
+        "usage": {
+            "input_tokens": sum(len(str(m.get("content", "")).split()) for m in messages),
+            "output_tokens": len(content.split())
+        }
+    }
+
+
+def _sse(events: List[Tuple[Optional[str], Any]]) -> bytes:
+    lines = []
+    for event, data in events:
+        if event:
+            lines.append(f"event: {event}")
+        lines.append(f"data: {data if isinstance(data, str) else json.dumps(data)}\n")
+    return "\n".join(lines).encode("utf-8") + b"\n"
+
+
+def _pieces(text: str) -> List[str]:
+    # Word-sized deltas, as streamed completions arrive
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def openai_chat_stream(completion: Dict[str, Any]) -> bytes:
+    """Server-sent events of a streamed chat completion"""
+    header = {key: completion[key] for key in ("id", "created", "model")}
+    
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+        choice = {"index": 0, "delta": delta, "finish_reason": finish_reason}
+        return {**header, "object": "chat.completion.chunk", "choices": [choice]}
+    
+    events = [(None, chunk({"role": "assistant", "content": ""}))]
+    for piece in _pieces(completion["choices"][0]["message"]["content"]):
+        events.append((None, chunk({"content": piece})))
+    events.append((None, chunk({}, "stop")))
+    events.append((None, "[DONE]"))
+    return _sse(events)
+
+
+def anthropic_messages_stream(message: Dict[str, Any]) -> bytes:
+    """Server-sent events of a streamed message"""
+    usage = message["usage"]
+    events = [
+        ("message_start", {
+            "type": "message_start",
+            "message": {**message, "content": [], "usage": {**usage, "output_tokens": 1}}
+        }),
+        ("content_block_start", {
+            "type": "content_block_start",
+            "index": 0,
+            "content_block": {"type": "text", "text": ""}
+        })
+    ]
+    for piece in _pieces(message["content"][0]["text"]):
+        events.append(("content_block_delta", {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": piece}
+        }))
+    events.extend([
+        ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+        ("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+            "usage": {"output_tokens": usage["output_tokens"]}
+        }),
+        ("message_stop", {"type": "message_stop"})
+    ])
+    return _sse(events)
+
+
+Generator = Callable[[httpx.Request, Dict[str, str], Any], Dict[str, Any]]
+
+ROUTES: List[Tuple[str, re.Pattern, Generator]] = [
+    ("api.yelp.com", re.compile(r"^/v3/businesses/search$"), yelp_search),
+    ("api.yelp.com", re.compile(r"^/v3/businesses/[^/]+/reviews$"), yelp_reviews),
+    ("api.yelp.com", re.compile(r"^/v3/autocomplete$"), yelp_autocomplete),
+    ("api.yelp.com", re.compile(r"^/v3/businesses/[^/]+$"), yelp_business),
+    ("maps.googleapis.com", re.compile(r"^/maps/api/geocode/json$"), google_geocode),
+    (
+        "maps.googleapis.com",
+        re.compile(r"^/maps/api/place/(textsearch|nearbysearch)/json$"),
+        google_places
+    ),
+    ("maps.googleapis.com", re.compile(r"^/maps/api/place/details/json$"), google_place_details),
+    ("api.openai.com", re.compile(r"/embeddings$"), openai_embeddings),
+    ("api.openai.com", re.compile(r"/chat/completions$"), openai_chat),
+    ("api.anthropic.com", re.compile(r"/messages$"), anthropic_messages)
+]
+
+# Server-sent event renderings of responses requested with "stream": true
+STREAMS: Dict[Generator, Callable[[Dict[str, Any]], bytes]] = {
+    openai_chat: openai_chat_stream,
+    anthropic_messages: anthropic_messages_stream
+}
+
+
+def generate(request: httpx.Request) -> Optional[httpx.Response]:
+    """
+    Build a synthetic response for a request to a known upstream API
+    
+    Args:
+        request: Outgoing request
+        
+    Returns:
+        JSON (or event stream) response, or None if no template matches
+        the endpoint
+    """
+    for host, path, generator in ROUTES:
+        if request.url.host == host and path.search(request.url.path):
+            params = dict(parse_qsl(request.url.query.decode()))
+            try:
+                body = json.loads(request.content) if request.content else {}
+            except ValueError:
+                body = {}
+            if isinstance(body, dict) and body.get("stream") and generator in STREAMS:
+                return httpx.Response(
+                    200,
+                    headers={"content-type": "text/event-stream"},
+                    content=STREAMS[generator](generator(request, params, body)),
+                    request=request
+                )
+            return httpx.Response(200, json=generator(request, params, body), request=request)
+    return None
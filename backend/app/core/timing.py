@@ -0,0 +1,96 @@
+"""Pipeline stage timings (Server-Timing header and Prometheus histograms)"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.core.metrics import STAGE_LATENCY, STAGES_IN_FLIGHT
+from app.core.tracing import span
+
+# Stage durations (milliseconds) of the request being handled. Tasks spawned
+# by asyncio.gather copy the context, so they record into the same dict.
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+# Labelled children of the stage metrics, resolved once per stage name
+_stage_metrics: Dict[str, Tuple[Any, Any]] = {}
+
+
+def start_request() -> Dict[str, float]:
+    """Begin collecting stage timings for the current request"""
+    stages: Dict[str, float] = {}
+    _stages.set(stages)
+    return stages
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as a named pipeline stage
+    
+    Every run is observed in the stage latency histogram. Within a request
+    the stage is also recorded as a tracing span and its duration added to
+    the request's Server-Timing entry (repeated stages accumulate).
+    
+    Args:
+        name: Stage name (token characters only, e.g. "source.yelp")
+    """
+    metrics = _stage_metrics.get(name)
+    if metrics is None:
+        metrics = _stage_metrics[name] = (STAGES_IN_FLIGHT.labels(name), STAGE_LATENCY.labels(name))
+    in_flight, latency = metrics
+    
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        with span(name):
+            yield
+    finally:
+        elapsed = time.perf_counter() - started
+        in_flight.dec()
+        latency.observe(elapsed)
+        
+        stages = _stages.get()
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + elapsed * 1000.0
+
+
+def server_timing(stages: Dict[str, float], total_ms: Optional[float] = None) -> str:
+    """
+    Format stage timings as a Server-Timing header value
+    
+    Args:
+        stages: Stage durations in milliseconds
+        total_ms: Optional whole-request duration, reported as ``total``
+        
+    Returns:
+        Header value such as ``retrieval;dur=120.4, llm;dur=850.2``
+    """
+    entries = [f"{name};dur={duration:.1f}" for name, duration in stages.items()]
+    if total_ms is not None:
+        entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+
+def parse_server_timing(value: str) -> Dict[str, float]:
+    """
+    Parse a Server-Timing header value into stage durations
+    
+    Args:
+        value: Header value
+        
+    Returns:
+        Durations in milliseconds keyed by stage name (entries without a
+        duration are skipped)
+    """
+    stages = {}
+    for entry in value.split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, duration = param.strip().partition("=")
+            if key == "dur" and name:
+                try:
+                    stages[name] = float(duration)
+                except ValueError:
+                    pass
+    return stages
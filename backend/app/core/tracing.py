@@ -0,0 +1,385 @@
+"""Request tracing with OpenTelemetry-compatible (OTLP/JSON) export"""
+
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def _trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class Span:
+    """A timed operation within a trace"""
+    
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "kind",
+        "start_ns", "end_ns", "attributes", "error"
+    )
+    
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _span_id()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+    
+    def set_attribute(self, key: str, value: Any):
+        """Attach an attribute (str, bool, int or float)"""
+        self.attributes[key] = value
+
+
+class _NoopSpan:
+    """Span handed out when no trace is active"""
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Finished spans of one request"""
+    
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+    
+    def waterfall(self) -> Dict[str, Any]:
+        """
+        Spans as offsets from the start of the request, for inline display
+        
+        Spans still open (such as the request itself) are reported up to now.
+        
+        Returns:
+            Dictionary with trace_id, total_ms and spans sorted by start time
+        """
+        origin = self.root.start_ns if self.root else min(span.start_ns for span in self.spans)
+        now = time.time_ns()
+        spans = self.spans + ([self.root] if self.root and not self.root.end_ns else [])
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": round(((self.root.end_ns or now) - origin) / 1e6, 3) if self.root else None,
+            "spans": [
+                {
+                    "name": span.name,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "start_ms": round((span.start_ns - origin) / 1e6, 3),
+                    "duration_ms": round(((span.end_ns or now) - span.start_ns) / 1e6, 3),
+                    "attributes": span.attributes,
+                    **({"error": span.error} if span.error else {})
+                }
+                for span in sorted(spans, key=lambda span: span.start_ns)
+            ]
+        }
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the request being handled (None outside a request)"""
+    return _trace.get()
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Any]:
+    """
+    Record a block as a child of the current span
+    
+    The new span becomes the current span inside the block, including in
+    tasks it starts (asyncio copies the context), so concurrent work nests
+    under the span that spawned it. Outside a trace this does nothing and
+    yields a span whose attributes are discarded.
+    
+    Args:
+        name: Span name
+        kind: "internal", "server" or "client"
+        **attributes: Initial attributes
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield NOOP_SPAN
+        return
+    
+    parent = _current_span.get()
+    new_span = Span(name, trace.trace_id, parent.span_id if parent else None, kind, attributes)
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        new_span.end_ns = time.time_ns()
+        _current_span.reset(token)
+        trace.spans.append(new_span)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator recording each call of a coroutine function as a span
+    
+    Args:
+        name: Span name (defaults to the function name)
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+        
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(span_name):
+                return await func(*args, **kwargs)
+        
+        return wrapper
+    return decorator
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a W3C traceparent header
+    
+    Returns:
+        (trace_id, parent_span_id, sampled), or None if absent or malformed
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if not match or match.group(1) == "0" * 32:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+@contextmanager
+def request_trace(
+    name: str,
+    traceparent: Optional[str] = None,
+    **attributes: Any
+) -> Iterator[Trace]:
+    """
+    Trace one request under a server span
+    
+    An incoming W3C traceparent continues the caller's trace and sampling
+    decision; otherwise settings.trace_sample_rate decides whether the
+    trace is exported. Spans are recorded either way so the request can
+    return its own waterfall.
+    
+    Args:
+        name: Root span name, e.g. "POST /api/v1/chat"
+        traceparent: Incoming traceparent header
+        **attributes: Root span attributes
+    """
+    parent = parse_traceparent(traceparent)
+    if parent:
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id = _trace_id(), None
+        sampled = random.random() < settings.trace_sample_rate
+    
+    trace = Trace(trace_id, sampled)
+    trace.root = Span(name, trace_id, parent_id, "server", attributes)
+    trace_token = _trace.set(trace)
+    span_token = _current_span.set(trace.root)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.root.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        trace.root.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        _trace.reset(trace_token)
+        trace.spans.append(trace.root)
+        if trace.sampled:
+            span_exporter.submit(trace)
+
+
+# ===== OTLP/JSON export =====
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": SPAN_KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 0}
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def to_otlp(traces: List[Trace]) -> Dict[str, Any]:
+    """
+    Encode traces as an OTLP ExportTraceServiceRequest (JSON mapping)
+    
+    Args:
+        traces: Finished traces
+        
+    Returns:
+        Body accepted by an OTLP/HTTP collector at /v1/traces
+    """
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": _otlp_attributes({
+                    "service.name": settings.app_name,
+                    "service.version": "1.0.0",
+                    "deployment.environment": settings.app_env
+                })
+            },
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [_otlp_span(span) for trace in traces for span in trace.spans]
+            }]
+        }]
+    }
+
+
+class SpanExporter:
+    """
+    Exports sampled traces in the background
+    
+    ``file`` appends one OTLP/JSON request per line (the format read by the
+    OpenTelemetry Collector's otlpjsonfile receiver); ``otlp`` posts to an
+    OTLP/HTTP collector. Traces are batched every
+    settings.trace_export_interval seconds; past settings.trace_max_queue
+    pending traces the oldest are dropped so export can never hold memory.
+    """
+    
+    def __init__(self):
+        self._queue: List[Trace] = []
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.dropped = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return settings.tracing_enabled and settings.trace_export != "none"
+    
+    def submit(self, trace: Trace):
+        """Queue a finished trace"""
+        if not self.enabled:
+            return
+        self._queue.append(trace)
+        overflow = len(self._queue) - settings.trace_max_queue
+        if overflow > 0:
+            del self._queue[:overflow]
+            self.dropped += overflow
+    
+    async def start(self):
+        """Start the periodic export task"""
+        if self.enabled and self._task is None:
+            if settings.trace_export == "otlp":
+                self._client = httpx.AsyncClient(timeout=10.0)
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Exporting traces ({settings.trace_export})")
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.trace_export_interval)
+            await self.flush()
+    
+    def _write_file(self, body: str):
+        path = Path(settings.trace_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(body + "\n")
+    
+    async def flush(self):
+        """Export every queued trace now"""
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+        
+        body = json.dumps(to_otlp(batch), separators=(",", ":"))
+        try:
+            if settings.trace_export == "file":
+                await asyncio.to_thread(self._write_file, body)
+            elif self._client is not None:
+                response = await self._client.post(
+                    settings.trace_otlp_endpoint,
+                    content=body,
+                    headers={"Content-Type": "application/json"}
+                )
+                response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Failed to export {len(batch)} traces: {e}")
+    
+    async def close(self):
+        """Stop the export task and export what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global span exporter instance
+span_exporter = SpanExporter()
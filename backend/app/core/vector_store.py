@@ -1,34 +1,50 @@
 """Vector database client for semantic search"""
 
 import logging
-from typing import List, Dict, Any, Optional
-from qdrant_client import AsyncQdrantClient
-from qdrant_client.models import (
-    Distance,
-    VectorParams,
-    PointStruct,
-    Filter,
-    FieldCondition,
-    MatchValue,
-    Range
-)
+import uuid
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, AsyncIterator
+
+if TYPE_CHECKING:
+    from qdrant_client import AsyncQdrantClient
+    from qdrant_client.models import Filter
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# qdrant_client.models, imported on first use (see _qdrant_models)
+_models = None
+
+
+def _qdrant_models():
+    """
+    The qdrant_client.models module
+    
+    qdrant_client takes about a second to import, so it is only imported
+    once the store is used (or warmed up at startup), and kept here so hot
+    helpers like _build_filter don't go through the import machinery.
+    """
+    global _models
+    if _models is None:
+        from qdrant_client import models
+        _models = models
+    return _models
+
 
 class VectorStore:
     """Vector database client for storing and searching embeddings"""
     
     def __init__(self):
-        self.client: Optional[AsyncQdrantClient] = None
+        self.client: Optional["AsyncQdrantClient"] = None
         self.collection_name = settings.qdrant_collection
         self.dimension = settings.embedding_dimension
         self._initialized = False
     
     async def initialize(self):
         """Initialize Qdrant client and create collection if needed"""
+        from qdrant_client import AsyncQdrantClient
+        models = _qdrant_models()
+        
         try:
             self.client = AsyncQdrantClient(
                 url=settings.qdrant_url,
@@ -43,18 +59,40 @@ class VectorStore:
                 logger.info(f"Creating collection: {self.collection_name}")
                 await self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(
+                    vectors_config=models.VectorParams(
                         size=self.dimension,
-                        distance=Distance.COSINE
+                        distance=models.Distance.COSINE
                     )
                 )
             
+            # Keyword indexes for parent/child grouping of review points.
+            # Created on every start (it is idempotent), so collections made
+            # before review indexing get them too
+            for field_name in ("type", "parent_id", "business_id"):
+                await self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=models.PayloadSchemaType.KEYWORD
+                )
+            
             self._initialized = True
             logger.info("Vector store initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize vector store: {e}")
             raise
     
+    @property
+    def searches_skipped(self) -> bool:
+        """
+        Whether searches return nothing instead of connecting on demand
+        
+        Replay and synthetic runs fake the HTTP upstreams but not Qdrant.
+        When the startup warm-up couldn't initialize the store, the vector
+        source is left out instead of retrying (and logging) the connection
+        on every request.
+        """
+        return not self._initialized and settings.upstream_mode in ("replay", "synthetic")
+    
     async def store_embeddings(
         self,
         ids: List[str],
@@ -72,13 +110,15 @@ class VectorStore:
         Returns:
             True if successful
         """
+        models = _qdrant_models()
+        
         if not self._initialized:
             await self.initialize()
         
         try:
             points = [
-                PointStruct(
-                    id=id_,
+                models.PointStruct(
+                    id=self.point_id(id_),
                     vector=embedding,
                     payload=meta
                 )
@@ -113,6 +153,8 @@ class VectorStore:
         Returns:
             List of search results with scores and metadata
         """
+        if self.searches_skipped:
+            return []
         if not self._initialized:
             await self.initialize()
         
@@ -141,6 +183,202 @@ class VectorStore:
             logger.error(f"Error searching vectors: {e}")
             return []
     
+    async def update_payloads(
+        self,
+        ids: List[str],
+        metadata: List[Dict[str, Any]]
+    ) -> bool:
+        """
+        Replace the payload of existing points without touching their vectors
+        
+        Args:
+            ids: List of point IDs to update
+            metadata: New metadata dictionaries (one per ID)
+            
+        Returns:
+            True if successful
+        """
+        models = _qdrant_models()
+        
+        if not self._initialized:
+            await self.initialize()
+        
+        if not ids:
+            return True
+        
+        try:
+            operations = [
+                models.OverwritePayloadOperation(
+                    overwrite_payload=models.SetPayload(
+                        payload=meta,
+                        points=[self.point_id(id_)]
+                    )
+                )
+                for id_, meta in zip(ids, metadata)
+            ]
+            
+            await self.client.batch_update_points(
+                collection_name=self.collection_name,
+                update_operations=operations
+            )
+            
+            logger.info(f"Updated payloads for {len(operations)} points")
+            return True
+        except Exception as e:
+            logger.error(f"Error updating payloads: {e}")
+            return False
+    
+    async def search_groups(
+        self,
+        query_embedding: List[float],
+        group_by: str = "parent_id",
+        limit: int = 10,
+        group_size: int = 3,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for similar vectors, grouped by a parent key
+        
+        Each group's parent point (whose point ID is the group key) is looked
+        up in the same collection, so a group carries both the parent payload
+        and its best-matching child hits.
+        
+        Args:
+            query_embedding: Query vector
+            group_by: Payload field holding the parent point ID
+            limit: Number of groups to return
+            group_size: Maximum hits per group
+            filters: Optional metadata filters
+            
+        Returns:
+            List of groups with parent metadata and scored hits
+        """
+        if self.searches_skipped:
+            return []
+        models = _qdrant_models()
+        
+        if not self._initialized:
+            await self.initialize()
+        
+        try:
+            search_filter = None
+            if filters:
+                search_filter = self._build_filter(filters)
+            
+            results = await self.client.search_groups(
+                collection_name=self.collection_name,
+                query_vector=query_embedding,
+                group_by=group_by,
+                limit=limit,
+                group_size=group_size,
+                query_filter=search_filter,
+                with_lookup=models.WithLookup(
+                    collection=self.collection_name,
+                    with_payload=True,
+                    with_vectors=False
+                )
+            )
+            
+            return [
+                {
+                    "id": group.id,
+                    "score": group.hits[0].score if group.hits else 0.0,
+                    "metadata": group.lookup.payload if group.lookup else None,
+                    "hits": [
+                        {
+                            "id": hit.id,
+                            "score": hit.score,
+                            "metadata": hit.payload
+                        }
+                        for hit in group.hits
+                    ]
+                }
+                for group in results.groups
+            ]
+        except Exception as e:
+            logger.error(f"Error searching vector groups: {e}")
+            return []
+    
+    async def scroll(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch points matching a metadata filter, without a query vector
+        
+        Args:
+            filters: Metadata filters
+            limit: Maximum number of points to return
+            
+        Returns:
+            List of points with metadata
+        """
+        if self.searches_skipped:
+            return []
+        if not self._initialized:
+            await self.initialize()
+        
+        try:
+            records, _ = await self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=self._build_filter(filters),
+                limit=limit,
+                with_payload=True,
+                with_vectors=False
+            )
+            
+            return [
+                {
+                    "id": record.id,
+                    "metadata": record.payload
+                }
+                for record in records
+            ]
+        except Exception as e:
+            logger.error(f"Error scrolling vectors: {e}")
+            return []
+    
+    async def iterate_points(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: int = 256
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over every point in the collection (optionally filtered)
+        
+        Args:
+            filters: Optional metadata filters
+            batch_size: Points fetched per scroll request
+            
+        Yields:
+            Points with metadata
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        scroll_filter = self._build_filter(filters) if filters else None
+        offset = None
+        
+        while True:
+            records, offset = await self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            
+            for record in records:
+                yield {
+                    "id": record.id,
+                    "metadata": record.payload
+                }
+            
+            if offset is None:
+                break
+    
     async def delete_embeddings(self, ids: List[str]) -> bool:
         """
         Delete embeddings by IDs
@@ -157,7 +395,7 @@ class VectorStore:
         try:
             await self.client.delete(
                 collection_name=self.collection_name,
-                points_selector=ids
+                points_selector=[self.point_id(id_) for id_ in ids]
             )
             logger.info(f"Deleted {len(ids)} embeddings")
             return True
@@ -165,6 +403,13 @@ class VectorStore:
             logger.error(f"Error deleting embeddings: {e}")
             return False
     
+    async def ping(self) -> bool:
+        """Check that Qdrant answers with a cheap collection listing"""
+        if not self._initialized:
+            return False
+        await self.client.get_collections()
+        return True
+    
     async def get_collection_stats(self) -> Dict[str, Any]:
         """Get collection statistics"""
         if not self._initialized:
@@ -182,8 +427,23 @@ class VectorStore:
             return {}
     
     @staticmethod
-    def _build_filter(filters: Dict[str, Any]) -> Filter:
+    def point_id(key: str) -> str:
+        """
+        Map an external ID (e.g. a Yelp business ID) to a Qdrant point ID
+        
+        Qdrant only accepts unsigned integers and UUIDs as point IDs, so
+        other keys are mapped to a deterministic UUIDv5.
+        """
+        try:
+            return str(uuid.UUID(str(key)))
+        except ValueError:
+            return str(uuid.uuid5(uuid.NAMESPACE_URL, str(key)))
+    
+    @staticmethod
+    def _build_filter(filters: Dict[str, Any]) -> Optional["Filter"]:
         """Build Qdrant filter from dictionary"""
+        models = _qdrant_models()
+        
         conditions = []
         
         for key, value in filters.items():
@@ -191,24 +451,32 @@ class VectorStore:
                 # Range filter (e.g., {"gte": 4.0})
                 if "gte" in value or "lte" in value:
                     conditions.append(
-                        FieldCondition(
+                        models.FieldCondition(
                             key=key,
-                            range=Range(
+                            range=models.Range(
                                 gte=value.get("gte"),
                                 lte=value.get("lte")
                             )
                         )
                     )
+            elif isinstance(value, (list, tuple, set)):
+                # Match any of several values
+                conditions.append(
+                    models.FieldCondition(
+                        key=key,
+                        match=models.MatchAny(any=list(value))
+                    )
+                )
             else:
                 # Exact match filter
                 conditions.append(
-                    FieldCondition(
+                    models.FieldCondition(
                         key=key,
-                        match=MatchValue(value=value)
+                        match=models.MatchValue(value=value)
                     )
                 )
         
-        return Filter(must=conditions) if conditions else None
+        return models.Filter(must=conditions) if conditions else None
 
 
 # Global vector store instance
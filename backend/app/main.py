@@ -1,15 +1,25 @@
 """FastAPI application entry point"""
 
 import logging
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager, nullcontext
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from app.config import settings
-from app.api.routes import chat, restaurants, health
+from app.api.routes import chat, restaurants, health, debug
 from app.mcp_server.client import mcp_client
 from app.core.cache import cache_manager
+from app.core.http import http_pool
+from app.core import metrics
+from app.core.lexical_index import lexical_index
+from app.core.profiler import profiler
+from app.core.responses import FastJSONResponse
+from app.core.spatial_index import spatial_index
+from app.core.timing import server_timing, start_request
+from app.core.tracing import request_trace, span_exporter
+from app.services.startup import startup_manager
 
 # Configure logging
 logging.basicConfig(
@@ -23,7 +33,7 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
-    logger.info(f"Starting {settings.app_name}...")
+    logger.info(f"Starting {settings.app_name} (upstream mode: {settings.upstream_mode})...")
     
     try:
         # Initialize MCP client
@@ -33,8 +43,24 @@ async def lifespan(app: FastAPI):
         
         # Initialize cache
         logger.info("Connecting to Redis cache...")
-        await cache_manager.connect()
-        logger.info("Redis cache connected successfully")
+        try:
+            await cache_manager.connect()
+            logger.info("Redis cache connected successfully")
+        except Exception:
+            if settings.upstream_mode == "live":
+                raise
+            # Offline (replay/synthetic) runs work without the cache
+            logger.warning("Redis unavailable, continuing without cache")
+        
+        # Load lexical and spatial indexes of the ingested catalog
+        lexical_index.load()
+        spatial_index.refresh()
+        
+        await span_exporter.start()
+        profiler.attach()
+        
+        # Import SDKs and build their clients once serving
+        startup_manager.start()
         
     except Exception as e:
         logger.error(f"Failed to initialize services: {e}")
@@ -46,8 +72,11 @@ async def lifespan(app: FastAPI):
     logger.info(f"Shutting down {settings.app_name}...")
     
     try:
+        await startup_manager.close()
         await mcp_client.close()
+        await http_pool.close()
         await cache_manager.close()
+        await span_exporter.close()
         logger.info("All services closed successfully")
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
@@ -59,7 +88,8 @@ app = FastAPI(
     description="Real-Time Restaurant Recommendation System using RAG and MCP",
     version="1.0.0",
     lifespan=lifespan,
-    debug=settings.debug
+    debug=settings.debug,
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -71,10 +101,56 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def observability_middleware(request: Request, call_next):
+    """
+    Trace each request, record request metrics, report per-stage durations
+    in a Server-Timing header and profile requests sent with X-Profile
+    """
+    started = time.perf_counter()
+    stages = start_request()
+    status_code = 500
+    trace_context = request_trace(
+        f"{request.method} {request.url.path}",
+        traceparent=request.headers.get("traceparent"),
+        **{"http.method": request.method}
+    ) if settings.tracing_enabled else nullcontext()
+    
+    # Admins can profile a single request; the profile is fetched by ID
+    profile_context = profiler.profile_request() if (
+        "x-profile" in request.headers and debug.is_admin(request.headers.get("x-admin-token"))
+    ) else nullcontext()
+    
+    with trace_context as trace, profile_context as profile:
+        metrics.REQUESTS_IN_FLIGHT.inc()
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            elapsed = time.perf_counter() - started
+            route = metrics.route_label(request.scope)
+            metrics.REQUESTS_IN_FLIGHT.dec()
+            metrics.REQUEST_LATENCY.labels(request.method, route, status_code).observe(elapsed)
+            if trace is not None:
+                trace.root.name = f"{request.method} {route}"
+                trace.root.set_attribute("http.route", route)
+                trace.root.set_attribute("http.status_code", status_code)
+    
+    if trace is not None:
+        response.headers["X-Trace-Id"] = trace.trace_id
+    if profile is not None:
+        response.headers["X-Profile-Id"] = profile.id
+    if settings.server_timing_enabled:
+        response.headers["Server-Timing"] = server_timing(stages, total_ms=elapsed * 1000.0)
+    return response
+
+
 # Include routers
 app.include_router(health.router, prefix="/api/v1", tags=["health"])
 app.include_router(chat.router, prefix="/api/v1", tags=["chat"])
 app.include_router(restaurants.router, prefix="/api/v1", tags=["restaurants"])
+app.include_router(debug.router, prefix="/debug", tags=["debug"], include_in_schema=False)
 
 
 @app.exception_handler(Exception)
@@ -98,6 +174,15 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics"""
+    if not settings.metrics_enabled:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    content, content_type = metrics.render()
+    return Response(content=content, headers={"Content-Type": content_type})
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -1,7 +1,11 @@
 """MCP Client for FastAPI application"""
 
 import logging
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
+
+from app.core.singleflight import share
+from app.core.tracing import traced
+from app.models.restaurant import RestaurantRecord
 
 logger = logging.getLogger(__name__)
 
@@ -47,14 +51,17 @@ class MCPClient:
     
     # ===== Google Location Tools =====
     
+    @traced("mcp.geocode")
     async def geocode(self, address: str) -> Dict[str, Any]:
         """Convert address to coordinates"""
-        return await self.google_location.geocode(address)
+        return dict(await share("geocode", address, lambda: self.google_location.geocode(address)))
     
+    @traced("mcp.reverse_geocode")
     async def reverse_geocode(self, latitude: float, longitude: float) -> Dict[str, Any]:
         """Convert coordinates to address"""
         return await self.google_location.reverse_geocode(latitude, longitude)
     
+    @traced("mcp.calculate_distance")
     async def calculate_distance(
         self,
         origin_lat: float,
@@ -67,8 +74,18 @@ class MCPClient:
             origin_lat, origin_lng, dest_lat, dest_lng
         )
     
+    def calculate_distances(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        destinations: List[Dict[str, Any]]
+    ) -> List[Optional[float]]:
+        """Calculate distances from one point to many (synchronous, vectorized)"""
+        return self.google_location.calculate_distances(origin_lat, origin_lng, destinations)
+    
     # ===== Google Search Tools =====
     
+    @traced("mcp.search_places")
     async def search_places(
         self,
         query: str,
@@ -78,6 +95,7 @@ class MCPClient:
         """Search for places"""
         return await self.google_search.search_places(query, location, radius)
     
+    @traced("mcp.search_nearby")
     async def search_nearby(
         self,
         latitude: float,
@@ -90,8 +108,40 @@ class MCPClient:
             latitude, longitude, radius, type_filter
         )
     
+    @traced("mcp.search_google_restaurants")
+    async def search_google_restaurants(
+        self,
+        latitude: float,
+        longitude: float,
+        query: Optional[str] = None,
+        radius: int = 5000
+    ) -> List[RestaurantRecord]:
+        """Search restaurants on Google Places, as restaurant records"""
+        if query:
+            places = await share(
+                "google_search",
+                (query, latitude, longitude, radius),
+                lambda: self.google_search.search_places(
+                    query, {"latitude": latitude, "longitude": longitude}, radius
+                )
+            )
+        else:
+            places = await share(
+                "google_search",
+                (None, latitude, longitude, radius),
+                lambda: self.google_search.search_nearby(
+                    latitude, longitude, radius, "restaurant"
+                )
+            )
+        # Records are built per call: the pipeline scores and annotates them
+        return [
+            RestaurantRecord.from_upstream(self.google_search.to_restaurant(place))
+            for place in places
+        ]
+    
     # ===== Yelp Business Tools =====
     
+    @traced("mcp.search_restaurants")
     async def search_restaurants(
         self,
         location: Optional[str] = None,
@@ -104,8 +154,45 @@ class MCPClient:
         limit: int = 20,
         sort_by: str = "best_match"
     ) -> Dict[str, Any]:
-        """Search restaurants on Yelp"""
-        return await self.yelp_business.search_businesses(
+        """Search restaurants on Yelp, with businesses projected onto RestaurantRecords"""
+        result = await share(
+            "yelp_search",
+            (location, latitude, longitude, term, categories, price, radius, limit, sort_by),
+            lambda: self.yelp_business.search_businesses(
+                location=location,
+                latitude=latitude,
+                longitude=longitude,
+                term=term,
+                categories=categories,
+                price=price,
+                radius=radius,
+                limit=limit,
+                sort_by=sort_by
+            )
+        )
+        # Records are built per call: the pipeline scores and annotates them
+        return {
+            **result,
+            "businesses": [
+                RestaurantRecord.from_upstream(business)
+                for business in result.get("businesses", [])
+            ]
+        }
+    
+    def iter_restaurants(
+        self,
+        location: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        term: Optional[str] = None,
+        categories: Optional[str] = None,
+        price: Optional[str] = None,
+        radius: int = 5000,
+        sort_by: str = "best_match",
+        max_results: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream restaurants on Yelp across concurrently fetched pages"""
+        return self.yelp_business.iter_businesses(
             location=location,
             latitude=latitude,
             longitude=longitude,
@@ -113,26 +200,33 @@ class MCPClient:
             categories=categories,
             price=price,
             radius=radius,
-            limit=limit,
-            sort_by=sort_by
+            sort_by=sort_by,
+            max_results=max_results
         )
     
+    @traced("mcp.get_business_details")
     async def get_business_details(self, business_id: str) -> Dict[str, Any]:
         """Get detailed business information"""
         return await self.yelp_business.get_business(business_id)
     
     # ===== Yelp Reviews Tools =====
     
+    @traced("mcp.get_business_reviews")
     async def get_business_reviews(
         self,
         business_id: str,
         limit: int = 3
     ) -> Dict[str, Any]:
         """Get business reviews"""
-        return await self.yelp_reviews.get_reviews(business_id, limit)
+        return await share(
+            "yelp_reviews",
+            (business_id, limit),
+            lambda: self.yelp_reviews.get_reviews(business_id, limit)
+        )
     
     # ===== Vector DB Tools =====
     
+    @traced("mcp.store_embeddings")
     async def store_embeddings(
         self,
         ids: List[str],
@@ -142,6 +236,7 @@ class MCPClient:
         """Store embeddings in vector database"""
         return await self.vectordb.store_embeddings(ids, embeddings, metadata)
     
+    @traced("mcp.search_similar")
     async def search_similar(
         self,
         query_embedding: List[float],
@@ -151,6 +246,7 @@ class MCPClient:
         """Search for similar vectors"""
         return await self.vectordb.search_similar(query_embedding, top_k, filters)
     
+    @traced("mcp.search_hybrid")
     async def search_hybrid(
         self,
         query: str,
@@ -160,6 +256,27 @@ class MCPClient:
         """Hybrid search: generate embedding and search"""
         return await self.vectordb.search_hybrid(query, filters, top_k)
     
+    @traced("mcp.search_grouped")
+    async def search_grouped(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 10,
+        group_size: int = 3
+    ) -> List[Dict[str, Any]]:
+        """Semantic search grouped by restaurant, with matching reviews"""
+        return await self.vectordb.search_grouped(query, filters, limit, group_size)
+    
+    @traced("mcp.get_stored_reviews")
+    async def get_stored_reviews(
+        self,
+        business_ids: List[str],
+        limit_per_business: int = 3
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get ingested review snippets for several businesses"""
+        return await self.vectordb.get_stored_reviews(business_ids, limit_per_business)
+    
+    @traced("mcp.update_embeddings")
     async def update_embeddings(
         self,
         ids: List[str],
@@ -169,10 +286,21 @@ class MCPClient:
         """Update existing embeddings"""
         return await self.vectordb.update_embeddings(ids, embeddings, metadata)
     
+    @traced("mcp.update_payloads")
+    async def update_payloads(
+        self,
+        ids: List[str],
+        metadata: List[Dict[str, Any]]
+    ) -> bool:
+        """Update metadata of existing embeddings"""
+        return await self.vectordb.update_payloads(ids, metadata)
+    
+    @traced("mcp.delete_embeddings")
     async def delete_embeddings(self, ids: List[str]) -> bool:
         """Delete embeddings"""
         return await self.vectordb.delete_embeddings(ids)
     
+    @traced("mcp.get_vector_stats")
     async def get_vector_stats(self) -> Dict[str, Any]:
         """Get vector database statistics"""
         return await self.vectordb.get_stats()
@@ -1,30 +1,49 @@
 """Google Location API tools"""
 
 import logging
-from typing import Dict, Any
-import httpx
-from math import radians, cos, sin, asin, sqrt
+from typing import List, Dict, Any, Optional
 
 from app.config import settings
 from app.core.cache import cached
+from app.core.http import http_pool
+from app.core.boundaries import boundaries
+from app.core.gazetteer import gazetteer, normalize_address
+from app.core.geo import haversine, haversine_distance, coordinate_arrays, quantize
+from app.core.rate_limit import google_limiter
 
 logger = logging.getLogger(__name__)
 
 
-@cached(ttl=86400, key_prefix="geo:")
 async def geocode(address: str) -> Dict[str, Any]:
     """
     Convert address to latitude/longitude coordinates
     
+    Cities, neighborhoods and postal codes are resolved by the local
+    gazetteer; only street-level addresses reach the Google API, cached
+    under their normalized form so spelling variants share an entry.
+    
     Args:
         address: Address string to geocode
         
     Returns:
         Dictionary with lat, lng, and formatted address
     """
+    local = gazetteer.lookup(address)
+    if local:
+        return dict(local)
+    
+    normalized = normalize_address(address)
+    if not normalized:
+        return {}
+    return await _geocode_remote(normalized)
+
+
+@cached(ttl=86400, key_prefix="geo:")
+async def _geocode_remote(address: str) -> Dict[str, Any]:
+    """Geocode a normalized address with the Google Geocoding API"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        async with google_limiter:
+            response = await http_pool.client.get(
                 "https://maps.googleapis.com/maps/api/geocode/json",
                 params={
                     "address": address,
@@ -53,11 +72,15 @@ async def geocode(address: str) -> Dict[str, Any]:
         return {}
 
 
-@cached(ttl=86400, key_prefix="reverse_geo:")
 async def reverse_geocode(latitude: float, longitude: float) -> Dict[str, Any]:
     """
     Convert latitude/longitude to address
     
+    Points inside a locally known boundary polygon are answered without a
+    network call. Otherwise the point is snapped to a grid cell of
+    ``reverse_geocode_precision`` decimal places and the cell is geocoded
+    and cached, so every point inside it shares one result.
+    
     Args:
         latitude: Latitude coordinate
         longitude: Longitude coordinate
@@ -65,9 +88,20 @@ async def reverse_geocode(latitude: float, longitude: float) -> Dict[str, Any]:
     Returns:
         Dictionary with address information
     """
+    local = boundaries.address(latitude, longitude)
+    if local:
+        return local
+    
+    cell_lat, cell_lng = quantize(latitude, longitude, settings.reverse_geocode_precision)
+    return await _reverse_geocode_cell(cell_lat, cell_lng)
+
+
+@cached(ttl=86400, key_prefix="reverse_geo:")
+async def _reverse_geocode_cell(latitude: float, longitude: float) -> Dict[str, Any]:
+    """Reverse geocode a quantized point with the Google Geocoding API"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        async with google_limiter:
+            response = await http_pool.client.get(
                 "https://maps.googleapis.com/maps/api/geocode/json",
                 params={
                     "latlng": f"{latitude},{longitude}",
@@ -125,19 +159,33 @@ async def calculate_distance(
     Returns:
         Distance in meters
     """
-    # Convert to radians
-    origin_lat, origin_lng, dest_lat, dest_lng = map(
-        radians, [origin_lat, origin_lng, dest_lat, dest_lng]
-    )
-    
-    # Haversine formula
-    dlng = dest_lng - origin_lng
-    dlat = dest_lat - origin_lat
-    a = sin(dlat / 2) ** 2 + cos(origin_lat) * cos(dest_lat) * sin(dlng / 2) ** 2
-    c = 2 * asin(sqrt(a))
+    return haversine_distance(origin_lat, origin_lng, dest_lat, dest_lng)
+
+
+def calculate_distances(
+    origin_lat: float,
+    origin_lng: float,
+    destinations: List[Dict[str, Any]]
+) -> List[Optional[float]]:
+    """
+    Calculate distances from one origin to many destinations in one call
     
-    # Earth radius in meters
-    r = 6371000
+    Synchronous and vectorized; prefer this over awaiting
+    calculate_distance per pair.
     
-    return c * r
+    Args:
+        origin_lat: Origin latitude
+        origin_lng: Origin longitude
+        destinations: Dicts with latitude/longitude (or Yelp businesses
+            with ``coordinates``)
+        
+    Returns:
+        Distances in meters (None where coordinates are unknown)
+    """
+    lats, lngs = coordinate_arrays([
+        {"coordinates": destination} if "latitude" in destination else destination
+        for destination in destinations
+    ])
+    distances = haversine(origin_lat, origin_lng, lats, lngs)
+    return [None if d != d else d for d in distances.tolist()]
 
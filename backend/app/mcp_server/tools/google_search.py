@@ -2,13 +2,20 @@
 
 import logging
 from typing import List, Dict, Any, Optional
-import httpx
 
 from app.config import settings
 from app.core.cache import cached
+from app.core.http import http_pool
+from app.core.rate_limit import google_limiter
 
 logger = logging.getLogger(__name__)
 
+# Restaurant IDs of places only known to Google
+GOOGLE_ID_PREFIX = "google:"
+
+# Place types too generic to be useful as categories
+_GENERIC_TYPES = frozenset({"point_of_interest", "establishment", "food", "store"})
+
 
 @cached(ttl=3600, key_prefix="places_search:")
 async def search_places(
@@ -37,8 +44,8 @@ async def search_places(
             params["location"] = f"{location['latitude']},{location['longitude']}"
             params["radius"] = radius
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        async with google_limiter:
+            response = await http_pool.client.get(
                 "https://maps.googleapis.com/maps/api/place/textsearch/json",
                 params=params
             )
@@ -85,8 +92,8 @@ async def search_nearby(
         if type_filter:
             params["type"] = type_filter
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        async with google_limiter:
+            response = await http_pool.client.get(
                 "https://maps.googleapis.com/maps/api/place/nearbysearch/json",
                 params=params
             )
@@ -116,8 +123,8 @@ async def get_place_details(place_id: str) -> Dict[str, Any]:
         Place details dictionary
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        async with google_limiter:
+            response = await http_pool.client.get(
                 "https://maps.googleapis.com/maps/api/place/details/json",
                 params={
                     "place_id": place_id,
@@ -138,3 +145,39 @@ async def get_place_details(place_id: str) -> Dict[str, Any]:
         logger.error(f"Error getting place details for {place_id}: {e}")
         return {}
 
+
+def to_restaurant(place: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a Google Places result into the restaurant shape used by Yelp
+    
+    Args:
+        place: Text search or nearby search result
+        
+    Returns:
+        Restaurant dictionary with a ``google:``-prefixed ID
+    """
+    location = (place.get("geometry") or {}).get("location") or {}
+    price_level = place.get("price_level")
+    address = place.get("formatted_address") or place.get("vicinity")
+    
+    return {
+        "id": f"{GOOGLE_ID_PREFIX}{place.get('place_id')}",
+        "google_place_id": place.get("place_id"),
+        "name": place.get("name", ""),
+        "rating": place.get("rating"),
+        "review_count": place.get("user_ratings_total", 0),
+        "price": "$" * price_level if price_level else None,
+        "categories": [
+            {"alias": place_type, "title": place_type.replace("_", " ").title()}
+            for place_type in place.get("types", [])
+            if place_type not in _GENERIC_TYPES
+        ],
+        "coordinates": {
+            "latitude": location.get("lat"),
+            "longitude": location.get("lng")
+        },
+        "location": {
+            "display_address": [address] if address else []
+        },
+        "is_closed": place.get("business_status") == "CLOSED_PERMANENTLY"
+    }
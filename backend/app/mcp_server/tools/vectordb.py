@@ -5,6 +5,7 @@ from typing import List, Dict, Any, Optional
 
 from app.core.vector_store import vector_store
 from app.core.embeddings import embedding_service
+from app.core.timing import stage
 
 logger = logging.getLogger(__name__)
 
@@ -73,7 +74,7 @@ async def search_hybrid(
     """
     try:
         # Generate embedding for the query
-        query_embedding = await embedding_service.generate_embedding(query)
+        query_embedding = await embedding_service.embed_query(query)
         
         # Search with the embedding
         return await vector_store.search_similar(query_embedding, top_k, filters)
@@ -82,6 +83,78 @@ async def search_hybrid(
         return []
 
 
+async def search_grouped(
+    query: str,
+    filters: Optional[Dict[str, Any]] = None,
+    limit: int = 10,
+    group_size: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    Semantic search over restaurants and their reviews, grouped by restaurant
+    
+    Args:
+        query: Text query
+        filters: Optional metadata filters
+        limit: Number of restaurants to return
+        group_size: Maximum matching points (restaurant + reviews) per restaurant
+        
+    Returns:
+        List of groups with restaurant metadata and scored hits
+    """
+    if vector_store.searches_skipped:
+        return []
+    
+    try:
+        query_embedding = await embedding_service.embed_query(query)
+        with stage("qdrant"):
+            return await vector_store.search_groups(
+                query_embedding,
+                group_by="parent_id",
+                limit=limit,
+                group_size=group_size,
+                filters=filters
+            )
+    except Exception as e:
+        logger.error(f"Error in grouped search: {e}")
+        return []
+
+
+async def get_stored_reviews(
+    business_ids: List[str],
+    limit_per_business: int = 3
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get ingested review snippets for several businesses in one lookup
+    
+    Args:
+        business_ids: Yelp business IDs
+        limit_per_business: Maximum reviews per business
+        
+    Returns:
+        Dictionary mapping business ID to review payloads
+    """
+    if not business_ids:
+        return {}
+    
+    try:
+        with stage("qdrant"):
+            points = await vector_store.scroll(
+                filters={"type": "review", "business_id": list(business_ids)},
+                limit=len(business_ids) * limit_per_business
+            )
+        
+        reviews: Dict[str, List[Dict[str, Any]]] = {}
+        for point in points:
+            payload = point.get("metadata") or {}
+            business_reviews = reviews.setdefault(payload.get("business_id"), [])
+            if len(business_reviews) < limit_per_business:
+                business_reviews.append(payload)
+        return reviews
+    except Exception as e:
+        logger.error(f"Error getting stored reviews: {e}")
+        return {}
+
+
 async def update_embeddings(
     ids: List[str],
     embeddings: List[List[float]],
@@ -106,6 +179,27 @@ async def update_embeddings(
         return False
 
 
+async def update_payloads(
+    ids: List[str],
+    metadata: List[Dict[str, Any]]
+) -> bool:
+    """
+    Update metadata of existing embeddings without re-embedding
+    
+    Args:
+        ids: List of IDs to update
+        metadata: New metadata
+        
+    Returns:
+        True if successful
+    """
+    try:
+        return await vector_store.update_payloads(ids, metadata)
+    except Exception as e:
+        logger.error(f"Error updating payloads: {e}")
+        return False
+
+
 async def delete_embeddings(ids: List[str]) -> bool:
     """
     Delete embeddings by IDs
@@ -1,15 +1,79 @@
 """Yelp Business API tools"""
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from contextlib import nullcontext
+from typing import AsyncIterator, List, Dict, Any, Optional
 import httpx
 
 from app.config import settings
 from app.core.cache import cached
+from app.core.http import http_pool
+from app.core.rate_limit import RateLimiter, yelp_limiter
 
 logger = logging.getLogger(__name__)
 
 
+class IncompleteResultsError(Exception):
+    """Raised by iter_businesses when some result pages could not be fetched"""
+
+
+def _search_params(
+    location: Optional[str],
+    latitude: Optional[float],
+    longitude: Optional[float],
+    term: Optional[str],
+    categories: Optional[str],
+    price: Optional[str],
+    radius: int,
+    sort_by: str
+) -> Dict[str, Any]:
+    """Build Yelp search query parameters (without limit/offset)"""
+    params = {
+        "radius": min(radius, 40000),
+        "sort_by": sort_by
+    }
+    
+    # Location parameters
+    if latitude and longitude:
+        params["latitude"] = latitude
+        params["longitude"] = longitude
+    elif location:
+        params["location"] = location
+    else:
+        raise ValueError("Either location or lat/lng must be provided")
+    
+    # Optional filters
+    if term:
+        params["term"] = term
+    if categories:
+        params["categories"] = categories
+    if price:
+        params["price"] = price
+    
+    return params
+
+
+async def _request_search(
+    params: Dict[str, Any],
+    limiter: Optional[RateLimiter] = None
+) -> Dict[str, Any]:
+    """Send one search request, under a rate limiter for bulk paging"""
+    headers = {
+        "Authorization": f"Bearer {settings.yelp_api_key}"
+    }
+    
+    async with limiter or nullcontext():
+        response = await http_pool.client.get(
+            "https://api.yelp.com/v3/businesses/search",
+            params=params,
+            headers=headers,
+            timeout=30.0
+        )
+        response.raise_for_status()
+        return response.json()
+
+
 async def search_businesses(
     location: Optional[str] = None,
     latitude: Optional[float] = None,
@@ -19,7 +83,8 @@ async def search_businesses(
     price: Optional[str] = None,
     radius: int = 5000,
     limit: int = 20,
-    sort_by: str = "best_match"
+    sort_by: str = "best_match",
+    offset: int = 0
 ) -> Dict[str, Any]:
     """
     Search for businesses on Yelp
@@ -34,50 +99,22 @@ async def search_businesses(
         radius: Search radius in meters (max 40000)
         limit: Number of results (max 50)
         sort_by: Sort order (best_match, rating, review_count, distance)
+        offset: Index of the first result (for pagination)
         
     Returns:
         Dictionary with businesses and total count
     """
     try:
-        params = {
-            "limit": min(limit, 50),
-            "radius": min(radius, 40000),
-            "sort_by": sort_by
-        }
-        
-        # Location parameters
-        if latitude and longitude:
-            params["latitude"] = latitude
-            params["longitude"] = longitude
-        elif location:
-            params["location"] = location
-        else:
-            raise ValueError("Either location or lat/lng must be provided")
-        
-        # Optional filters
-        if term:
-            params["term"] = term
-        if categories:
-            params["categories"] = categories
-        if price:
-            params["price"] = price
-        
-        headers = {
-            "Authorization": f"Bearer {settings.yelp_api_key}"
-        }
+        params = _search_params(
+            location, latitude, longitude, term, categories, price, radius, sort_by
+        )
+        params["limit"] = min(limit, 50)
+        if offset:
+            params["offset"] = offset
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.yelp.com/v3/businesses/search",
-                params=params,
-                headers=headers,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            logger.info(f"Found {data.get('total', 0)} businesses")
-            return data
+        data = await _request_search(params)
+        logger.info(f"Found {data.get('total', 0)} businesses")
+        return data
     
     except httpx.HTTPStatusError as e:
         logger.error(f"Yelp API error: {e.response.status_code} - {e.response.text}")
@@ -87,6 +124,104 @@ async def search_businesses(
         return {"businesses": [], "total": 0}
 
 
+async def iter_businesses(
+    location: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    term: Optional[str] = None,
+    categories: Optional[str] = None,
+    price: Optional[str] = None,
+    radius: int = 5000,
+    sort_by: str = "best_match",
+    max_results: Optional[int] = None,
+    page_size: int = 50
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream search results across as many pages as Yelp allows
+    
+    The first page's ``total`` determines the remaining offsets, which are
+    then fetched concurrently under the Yelp rate limiter (which single
+    requests made by chat turns don't wait for). Businesses are yielded as
+    soon as their page arrives, deduplicated by ID, so pages complete out
+    of order.
+    
+    Args:
+        location: Location string (e.g., "San Francisco, CA")
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        term: Search term
+        categories: Category filter
+        price: Price filter
+        radius: Search radius in meters (max 40000)
+        sort_by: Sort order
+        max_results: Optional cap on the number of results
+        page_size: Results per request (max 50)
+        
+    Yields:
+        Business dictionaries
+        
+    Raises:
+        IncompleteResultsError: After streaming, if any page failed
+    """
+    params = _search_params(
+        location, latitude, longitude, term, categories, price, radius, sort_by
+    )
+    page_size = max(1, min(page_size, 50))
+    cap = settings.yelp_max_results
+    if max_results is not None:
+        cap = min(cap, max_results)
+    
+    async def fetch(offset: int) -> Dict[str, Any]:
+        page_params = dict(params, limit=min(page_size, cap - offset))
+        if offset:
+            page_params["offset"] = offset
+        return await _request_search(page_params, yelp_limiter)
+    
+    try:
+        first = await fetch(0)
+    except Exception as e:
+        raise IncompleteResultsError(f"First Yelp search page failed: {e}") from e
+    
+    seen = set()
+    
+    def unseen(page: Dict[str, Any]) -> List[Dict[str, Any]]:
+        fresh = []
+        for business in page.get("businesses", []):
+            business_id = business.get("id")
+            if business_id and business_id not in seen:
+                seen.add(business_id)
+                fresh.append(business)
+        return fresh
+    
+    for business in unseen(first):
+        yield business
+    
+    total = min(first.get("total", 0), cap)
+    tasks = [
+        asyncio.create_task(fetch(offset))
+        for offset in range(page_size, total, page_size)
+    ]
+    failed = 0
+    
+    try:
+        for next_page in asyncio.as_completed(tasks):
+            try:
+                page = await next_page
+            except Exception as e:
+                failed += 1
+                logger.error(f"Error fetching Yelp search page: {e}")
+                continue
+            for business in unseen(page):
+                yield business
+    finally:
+        for task in tasks:
+            task.cancel()
+    
+    logger.info(f"Fetched {len(seen)} of {total} businesses in {len(tasks) + 1} pages")
+    if failed:
+        raise IncompleteResultsError(f"{failed} of {len(tasks) + 1} Yelp search pages failed")
+
+
 @cached(ttl=3600, key_prefix="yelp_business:")
 async def get_business(business_id: str) -> Dict[str, Any]:
     """
@@ -103,14 +238,13 @@ async def get_business(business_id: str) -> Dict[str, Any]:
             "Authorization": f"Bearer {settings.yelp_api_key}"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.yelp.com/v3/businesses/{business_id}",
-                headers=headers,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await http_pool.client.get(
+            f"https://api.yelp.com/v3/businesses/{business_id}",
+            headers=headers,
+            timeout=30.0
+        )
+        response.raise_for_status()
+        return response.json()
     
     except httpx.HTTPStatusError as e:
         logger.error(f"Yelp API error: {e.response.status_code}")
@@ -143,15 +277,14 @@ async def autocomplete(text: str, latitude: float, longitude: float) -> Dict[str
             "longitude": longitude
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.yelp.com/v3/autocomplete",
-                params=params,
-                headers=headers,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await http_pool.client.get(
+            "https://api.yelp.com/v3/autocomplete",
+            params=params,
+            headers=headers,
+            timeout=30.0
+        )
+        response.raise_for_status()
+        return response.json()
     
     except Exception as e:
         logger.error(f"Error getting autocomplete suggestions: {e}")
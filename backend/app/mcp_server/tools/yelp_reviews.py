@@ -6,6 +6,7 @@ import httpx
 
 from app.config import settings
 from app.core.cache import cached
+from app.core.http import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -31,15 +32,14 @@ async def get_reviews(business_id: str, limit: int = 3) -> Dict[str, Any]:
             "limit": min(limit, 3)  # Yelp API max is 3
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.yelp.com/v3/businesses/{business_id}/reviews",
-                params=params,
-                headers=headers,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await http_pool.client.get(
+            f"https://api.yelp.com/v3/businesses/{business_id}/reviews",
+            params=params,
+            headers=headers,
+            timeout=30.0
+        )
+        response.raise_for_status()
+        return response.json()
     
     except httpx.HTTPStatusError as e:
         logger.error(f"Yelp API error: {e.response.status_code}")
@@ -29,5 +29,5 @@ class ConversationContext(BaseModel):
     chat_history: List[Message] = Field(default_factory=list, description="Previous messages")
     location: Optional[Dict[str, Any]] = Field(default=None, description="User location")
     preferences: Optional[Dict[str, Any]] = Field(default=None, description="User preferences")
-    retrieved_context: Optional[List[Dict[str, Any]]] = Field(default=None, description="Retrieved documents")
+    retrieved_context: Optional[List[Any]] = Field(default=None, description="Retrieved restaurant records")
 
@@ -1,6 +1,7 @@
 """Restaurant data models"""
 
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 
 
@@ -48,6 +49,164 @@ class Restaurant(BaseModel):
     menu_summary: Optional[str] = None
 
 
+def normalize_review(review: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a Review dictionary from a Yelp review or a stored review payload
+    
+    Args:
+        review: Review with ``user.name`` (Yelp) or ``user_name``/``review_id`` (payload)
+        
+    Returns:
+        Review dictionary
+    """
+    user_name = review.get("user_name")
+    if user_name is None:
+        user_name = (review.get("user") or {}).get("name")
+    rating = review.get("rating")
+    return {
+        "id": str(review.get("id") or review.get("review_id") or ""),
+        "rating": float(rating) if rating is not None else 0.0,
+        "text": review.get("text") or "",
+        "time_created": review.get("time_created") or "",
+        "user_name": user_name
+    }
+
+
+def _category(category: Any) -> Tuple[str, str]:
+    # Yelp categories are {alias, title}; index payloads only keep titles
+    if isinstance(category, dict):
+        title = category.get("title") or category.get("alias") or ""
+        return category.get("alias") or title.lower().replace(" ", "_"), title
+    title = str(category)
+    return title.lower().replace(" ", "_"), title
+
+
+@dataclass(slots=True)
+class RestaurantRecord:
+    """
+    Compact restaurant record passed through retrieval, ranking and prompting
+    
+    Holds only what ranking, the LLM context and the API response use.
+    Upstream payloads (Yelp businesses with photos, hours, transactions and
+    URLs, Google places, index payloads) are projected into it once, where
+    they enter the app, and not kept; the details endpoint fetches the
+    full business when asked. Pipeline annotations are fields as well, so
+    records stay slotted.
+    """
+    id: str
+    name: str
+    rating: Optional[float] = None
+    review_count: int = 0
+    price: Optional[str] = None
+    categories: Tuple[Tuple[str, str], ...] = ()  # (alias, title)
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip_code: Optional[str] = None
+    country: Optional[str] = None
+    phone: Optional[str] = None
+    image_url: Optional[str] = None
+    url: Optional[str] = None
+    is_closed: bool = False
+    distance: Optional[float] = None
+    reviews: List[Dict[str, Any]] = field(default_factory=list)
+    menu_summary: Optional[str] = None
+    # Set by the pipeline
+    source_id: Optional[str] = None
+    sources: List[str] = field(default_factory=list)
+    semantic_score: float = 0.0
+    retrieval_score: float = 0.0
+    rerank_score: Optional[float] = None
+    
+    @classmethod
+    def from_upstream(cls, data: Dict[str, Any]) -> "RestaurantRecord":
+        """
+        Project an upstream restaurant onto a record
+        
+        Yelp keeps coordinates next to ``location`` and the street in
+        ``address1``/``display_address``; a location that already has
+        coordinates (a Location dictionary) is read as is.
+        
+        Args:
+            data: Yelp business, Google place (see to_restaurant) or
+                vector/lexical index payload
+            
+        Returns:
+            Restaurant record; reviews are normalized with normalize_review
+        """
+        location = data.get("location") or {}
+        coordinates = data.get("coordinates") or location
+        latitude = coordinates.get("latitude")
+        longitude = coordinates.get("longitude")
+        display_address = location.get("display_address") or [None]
+        rating = data.get("rating")
+        
+        return cls(
+            id=str(data.get("id") or ""),
+            name=data.get("name") or "",
+            rating=float(rating) if rating is not None else None,
+            review_count=data.get("review_count") or 0,
+            price=data.get("price") or None,
+            categories=tuple(_category(category) for category in data.get("categories") or ()),
+            latitude=float(latitude) if latitude is not None else None,
+            longitude=float(longitude) if longitude is not None else None,
+            address=location.get("address") or location.get("address1") or display_address[0],
+            city=location.get("city"),
+            state=location.get("state"),
+            zip_code=location.get("zip_code"),
+            country=location.get("country"),
+            phone=data.get("phone") or None,
+            image_url=data.get("image_url") or None,
+            url=data.get("url") or None,
+            is_closed=bool(data.get("is_closed", False)),
+            distance=data.get("distance"),
+            reviews=[normalize_review(review) for review in data.get("reviews") or ()],
+            menu_summary=data.get("menu_summary")
+        )
+    
+    @property
+    def category_titles(self) -> List[str]:
+        """Category titles, e.g. ["Italian", "Wine Bars"]"""
+        return [title for _, title in self.categories]
+    
+    def to_response(self) -> Dict[str, Any]:
+        """
+        The record as a Restaurant schema dictionary, without pipeline fields
+        
+        Returns:
+            Dictionary matching the Restaurant schema
+        """
+        location = None
+        if self.latitude is not None and self.longitude is not None:
+            location = {
+                "latitude": self.latitude,
+                "longitude": self.longitude,
+                "address": self.address,
+                "city": self.city,
+                "state": self.state,
+                "zip_code": self.zip_code,
+                "country": self.country
+            }
+        return {
+            "id": self.id,
+            "name": self.name,
+            "rating": self.rating,
+            "review_count": self.review_count,
+            "price": self.price,
+            "categories": [{"alias": alias, "title": title} for alias, title in self.categories],
+            "location": location,
+            "phone": self.phone,
+            "image_url": self.image_url,
+            "url": self.url,
+            "is_closed": self.is_closed,
+            "distance": self.distance,
+            "reviews": self.reviews,
+            "menu_summary": self.menu_summary
+        }
+
+
 class RestaurantSearchParams(BaseModel):
     """Search parameters for restaurants"""
     location: Optional[str] = None
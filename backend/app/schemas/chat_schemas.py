@@ -12,6 +12,19 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = Field(default=None, description="Chat session ID")
     location: Optional[Dict[str, Any]] = Field(default=None, description="User location")
     preferences: Optional[Dict[str, Any]] = Field(default=None, description="User preferences")
+    include_timings: bool = Field(
+        default=False,
+        description="Return the request's tracing waterfall in metadata.timings"
+    )
+
+
+class BatchChatRequest(BaseModel):
+    """Batch chat request schema"""
+    queries: List[ChatRequest] = Field(..., description="Independent chat requests", min_length=1)
+    keep_sessions: bool = Field(
+        default=False,
+        description="Keep the sessions started by queries without a session_id"
+    )
 
 
 class ChatResponse(BaseModel):
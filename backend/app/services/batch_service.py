@@ -0,0 +1,111 @@
+"""Batch chat: many independent queries sharing their upstream calls"""
+
+import asyncio
+import logging
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, List
+
+from app.config import settings
+from app.core.embeddings import embedding_service
+from app.core.singleflight import SingleFlight, shared_calls
+from app.core.tracing import request_trace
+from app.schemas.chat_schemas import ChatRequest
+from app.services.chat_service import chat_service
+
+logger = logging.getLogger(__name__)
+
+
+class BatchService:
+    """
+    Answers a batch of chat queries (evaluation runs, pre-generated guides)
+    
+    Queries of a batch share one SingleFlight group, so a geocode, Yelp or
+    Google search or review lookup repeated across queries is made once.
+    Query embeddings are requested settings.batch_chunk_size at a time,
+    settings.batch_concurrency queries are answered at once, and Google
+    calls stay within their shared rate limiter.
+    """
+    
+    async def run(
+        self,
+        queries: List[ChatRequest],
+        keep_sessions: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer queries, yielding each result as soon as it is ready
+        
+        Args:
+            queries: Independent chat requests; a query with a session_id
+                continues that session
+            keep_sessions: Keep the sessions started by queries without a
+                session_id (dropped by default)
+                
+        Yields:
+            The chat result of each query with its ``index`` in queries,
+            in completion order; a failed query yields ``index`` and
+            ``error``
+        """
+        group = SingleFlight(keep=True)
+        semaphore = asyncio.Semaphore(settings.batch_concurrency)
+        
+        for start in range(0, len(queries), settings.batch_chunk_size):
+            chunk = queries[start:start + settings.batch_chunk_size]
+            
+            # One embedding request per chunk instead of one per query; the
+            # vector search then finds them in the query embedding cache
+            try:
+                await embedding_service.preload_queries([query.message for query in chunk])
+            except Exception as e:
+                logger.warning(f"Failed to preload batch query embeddings: {e}")
+            
+            tasks = [
+                asyncio.create_task(self._answer(index, query, group, semaphore, keep_sessions))
+                for index, query in enumerate(chunk, start)
+            ]
+            try:
+                for next_result in asyncio.as_completed(tasks):
+                    yield await next_result
+            finally:
+                # The client went away: drop the rest of the chunk
+                for task in tasks:
+                    task.cancel()
+        
+        logger.info(
+            f"Answered a batch of {len(queries)} queries with {len(group)} shared upstream calls"
+        )
+    
+    async def _answer(
+        self,
+        index: int,
+        query: ChatRequest,
+        group: SingleFlight,
+        semaphore: asyncio.Semaphore,
+        keep_sessions: bool
+    ) -> Dict[str, Any]:
+        # Each query is traced on its own rather than adding its spans to
+        # the batch request's trace
+        trace_context = request_trace(
+            "chat.batch.query",
+            **{"batch.index": index}
+        ) if settings.tracing_enabled else nullcontext()
+        
+        async with semaphore:
+            with shared_calls(group), trace_context:
+                try:
+                    result = await chat_service.process_message(
+                        message=query.message,
+                        session_id=query.session_id,
+                        location=query.location,
+                        preferences=query.preferences
+                    )
+                except Exception as e:
+                    logger.error(f"Error processing batch query {index}: {e}")
+                    return {"index": index, "error": "Failed to process chat message"}
+        
+        if not keep_sessions and query.session_id != result["session_id"]:
+            chat_service.clear_session(result.pop("session_id"))
+        return {"index": index, **result}
+
+
+# Global batch service instance
+batch_service = BatchService()
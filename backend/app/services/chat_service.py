@@ -2,15 +2,30 @@
 
 import logging
 import uuid
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Dict, Any
 
+from app.config import settings
+from app.core.query_parser import query_parser
+from app.core.timing import stage
 from app.models.chat import Message, ChatSession, ConversationContext
+from app.models.restaurant import RestaurantRecord
 from app.services.llm_service import llm_service
 from app.services.rag_service import rag_service
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ChatTurn:
+    """A user message being answered"""
+    session: ChatSession
+    user_message: Message
+    context: ConversationContext
+    restaurants: List[RestaurantRecord]
+    llm_messages: List[Message]
+
+
 class ChatService:
     """Service for managing chat conversations and generating responses"""
     
@@ -55,93 +70,185 @@ Format your responses in a natural, conversational way. When listing restaurants
             Dictionary with response, session_id, and restaurants
         """
         try:
-            # Get or create session
-            if session_id and session_id in self.sessions:
-                session = self.sessions[session_id]
-            else:
-                session_id = str(uuid.uuid4())
-                session = ChatSession(
-                    session_id=session_id,
-                    user_preferences=preferences,
-                    location=location
-                )
-                self.sessions[session_id] = session
-            
-            # Add user message to session
+            session = self._open_session(session_id, location, preferences)
             user_message = Message(role="user", content=message)
-            session.messages.append(user_message)
-            
-            # Build conversation context
-            context = ConversationContext(
-                query=message,
-                chat_history=session.messages[:-1],  # Exclude current message
-                location=location or session.location,
-                preferences=preferences or session.user_preferences
-            )
-            
-            # Retrieve relevant restaurants using RAG
-            restaurants = await rag_service.retrieve_restaurants(context)
-            context.retrieved_context = restaurants
-            
-            # Build context for LLM
-            restaurant_context = llm_service.build_restaurant_context(restaurants, message)
-            
-            # Generate response
-            messages_for_llm = [
-                Message(role="user", content=restaurant_context + "\n\n" + message)
-            ]
-            
-            # Add chat history (last 4 messages for context)
-            if len(session.messages) > 1:
-                messages_for_llm = session.messages[-4:-1] + messages_for_llm
-            
-            response_text = await llm_service.generate_response(
-                messages=messages_for_llm,
-                system_prompt=self.system_prompt
-            )
-            
-            # Add assistant message to session
-            assistant_message = Message(role="assistant", content=response_text)
-            session.messages.append(assistant_message)
+            turn = await self._prepare_turn(session, user_message, location, preferences)
             
-            # Generate follow-up suggestions
-            suggestions = self._generate_suggestions(message, restaurants)
+            with stage("llm"):
+                response_text = await llm_service.generate_response(
+                    messages=turn.llm_messages,
+                    system_prompt=self.system_prompt
+                )
             
-            return {
-                "message": response_text,
-                "session_id": session_id,
-                "restaurants": restaurants[:10],  # Return top 10
-                "suggestions": suggestions,
-                "metadata": {
-                    "total_restaurants_found": len(restaurants),
-                    "location": context.location
-                }
-            }
+            return self._finish_turn(turn, response_text)
         
         except Exception as e:
             logger.error(f"Error processing message: {e}", exc_info=True)
             raise
     
+    async def stream_message(
+        self,
+        message: str,
+        session_id: Optional[str] = None,
+        location: Optional[Dict[str, Any]] = None,
+        preferences: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user message, yielding the answer as it is generated
+        
+        If the caller stops iterating (or is cancelled) before the end,
+        the LLM stream is closed and the user message is taken back out of
+        the session, so an abandoned turn leaves no trace in the history.
+        
+        Args:
+            message: User message
+            session_id: Optional session ID for conversation continuity
+            location: Optional user location
+            preferences: Optional user preferences
+            
+        Yields:
+            Events: ``session`` (session_id), ``restaurants``, one ``token``
+            per text delta, then ``done`` with the full message,
+            suggestions and metadata
+        """
+        session = self._open_session(session_id, location, preferences)
+        yield {"type": "session", "session_id": session.session_id}
+        
+        user_message = Message(role="user", content=message)
+        completed = False
+        try:
+            turn = await self._prepare_turn(session, user_message, location, preferences)
+            yield {
+                "type": "restaurants",
+                "restaurants": [
+                    restaurant.to_response()
+                    for restaurant in turn.restaurants[:settings.max_restaurants_return]
+                ]
+            }
+            
+            parts = []
+            with stage("llm.stream"):
+                async for text in llm_service.stream_response(
+                    messages=turn.llm_messages,
+                    system_prompt=self.system_prompt
+                ):
+                    parts.append(text)
+                    yield {"type": "token", "text": text}
+            
+            result = self._finish_turn(turn, "".join(parts))
+            completed = True
+            del result["restaurants"]
+            yield {"type": "done", **result}
+        finally:
+            if not completed and session.messages and session.messages[-1] is user_message:
+                session.messages.pop()
+    
+    def _open_session(
+        self,
+        session_id: Optional[str],
+        location: Optional[Dict[str, Any]],
+        preferences: Optional[Dict[str, Any]]
+    ) -> ChatSession:
+        """Get a session by ID, or create one"""
+        if session_id and session_id in self.sessions:
+            return self.sessions[session_id]
+        
+        session_id = str(uuid.uuid4())
+        session = ChatSession(
+            session_id=session_id,
+            user_preferences=preferences,
+            location=location
+        )
+        self.sessions[session_id] = session
+        return session
+    
+    async def _prepare_turn(
+        self,
+        session: ChatSession,
+        user_message: Message,
+        location: Optional[Dict[str, Any]],
+        preferences: Optional[Dict[str, Any]]
+    ) -> ChatTurn:
+        """Add the user message to the session, retrieve restaurants and build the LLM input"""
+        message = user_message.content
+        session.messages.append(user_message)
+        
+        # Build conversation context
+        context = ConversationContext(
+            query=message,
+            chat_history=session.messages[:-1],  # Exclude current message
+            location=location or session.location,
+            preferences=preferences or session.user_preferences
+        )
+        
+        # Retrieve relevant restaurants using RAG
+        with stage("retrieval"):
+            restaurants = await rag_service.retrieve_restaurants(context)
+        context.retrieved_context = restaurants
+        
+        # Build context for LLM
+        with stage("context"):
+            restaurant_context = llm_service.build_restaurant_context(restaurants, message)
+        
+        messages_for_llm = [
+            Message(role="user", content=restaurant_context + "\n\n" + message)
+        ]
+        
+        # Add chat history (last 4 messages for context)
+        if len(session.messages) > 1:
+            messages_for_llm = session.messages[-4:-1] + messages_for_llm
+        
+        return ChatTurn(
+            session=session,
+            user_message=user_message,
+            context=context,
+            restaurants=restaurants,
+            llm_messages=messages_for_llm
+        )
+    
+    def _finish_turn(self, turn: ChatTurn, response_text: str) -> Dict[str, Any]:
+        """Add the assistant message to the session and build the chat result"""
+        turn.session.messages.append(Message(role="assistant", content=response_text))
+        
+        # Generate follow-up suggestions
+        suggestions = self._generate_suggestions(turn.user_message.content, turn.restaurants)
+        
+        return {
+            "message": response_text,
+            "session_id": turn.session.session_id,
+            "restaurants": [
+                restaurant.to_response()
+                for restaurant in turn.restaurants[:settings.max_restaurants_return]
+            ],
+            "suggestions": suggestions,
+            "metadata": {
+                "total_restaurants_found": len(turn.restaurants),
+                "location": turn.context.location
+            }
+        }
+    
     def _generate_suggestions(
         self,
         query: str,
-        restaurants: List[Dict[str, Any]]
+        restaurants: List[RestaurantRecord]
     ) -> List[str]:
         """Generate follow-up suggestions for the user"""
         suggestions = []
         
-        query_lower = query.lower()
+        parsed = query_parser.parse(query)
+        foods = set(parsed.values("cuisine") + parsed.values("dish"))
+        price = parsed.first("price")
         
         # Suggest related cuisines
-        if "italian" in query_lower and restaurants:
+        if "italian" in foods and restaurants:
             suggestions.append("Show me Mediterranean restaurants nearby")
-        elif "sushi" in query_lower or "japanese" in query_lower:
+        elif foods & {"sushi", "japanese"}:
             suggestions.append("Any good Korean restaurants?")
         
         # Suggest price variations
-        if "cheap" in query_lower or "affordable" in query_lower:
+        if price in ("1", "1,2"):
             suggestions.append("What about mid-range options?")
-        elif "expensive" in query_lower or "fine dining" in query_lower:
+        elif price in ("3,4", "4"):
             suggestions.append("Show me more affordable alternatives")
         
         # General suggestions
@@ -0,0 +1,198 @@
+"""Chat over a WebSocket: several concurrent turns per connection"""
+
+import asyncio
+import logging
+from contextlib import nullcontext
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import WebSocket, status
+from pydantic import ValidationError
+
+from app.config import settings
+from app.core.metrics import WEBSOCKET_CONNECTIONS, WEBSOCKET_TURNS
+from app.core.responses import dumps
+from app.schemas.chat_schemas import ChatRequest
+from app.services.chat_service import chat_service
+
+logger = logging.getLogger(__name__)
+
+
+class ChatSocket:
+    """
+    Serves one chat WebSocket connection
+    
+    Client frames are JSON objects:
+    
+    - ``{"type": "message", "id": ..., "message": ..., "session_id": ...,
+      "location": ..., "preferences": ...}`` starts a turn; ``id`` is
+      chosen by the client and tags every frame of the turn
+    - ``{"type": "cancel", "id": ...}`` cancels a turn in flight, closing
+      its LLM stream
+    - ``{"type": "ping"}`` is answered with ``{"type": "pong"}``
+    
+    Each turn runs as its own task, so turns of different sessions are
+    answered concurrently (up to settings.ws_max_turns); turns of the same
+    session wait for each other. A turn sends ``session``,
+    ``restaurants``, ``token`` frames and ``done``, or ``cancelled`` /
+    ``error``.
+    
+    Outgoing frames go through a bounded queue. When the client reads
+    slowly the queue fills and turns stop pulling tokens from the LLM
+    until it drains; queued tokens of a turn are merged into one frame.
+    A client that doesn't read for settings.ws_send_timeout is dropped.
+    """
+    
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=settings.ws_send_queue_size)
+        self.turns: Dict[str, asyncio.Task] = {}
+        self.session_locks: Dict[str, asyncio.Lock] = {}
+        self.closed = False
+    
+    async def run(self):
+        """Serve the (accepted) connection until either side closes it"""
+        WEBSOCKET_CONNECTIONS.inc()
+        receiver = asyncio.create_task(self._receive_loop())
+        sender = asyncio.create_task(self._send_loop())
+        try:
+            done, _ = await asyncio.wait({receiver, sender}, return_when=asyncio.FIRST_COMPLETED)
+            if sender in done and isinstance(sender.exception(), asyncio.TimeoutError):
+                logger.warning("Closing chat WebSocket: client stopped reading")
+                try:
+                    await self.websocket.close(
+                        code=status.WS_1008_POLICY_VIOLATION,
+                        reason="Client is not reading"
+                    )
+                except Exception:
+                    pass
+        finally:
+            self.closed = True
+            tasks = [receiver, sender, *self.turns.values()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            WEBSOCKET_CONNECTIONS.dec()
+    
+    async def _receive_loop(self):
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            
+            try:
+                frame = orjson.loads(message.get("text") or message.get("bytes") or b"")
+            except orjson.JSONDecodeError:
+                await self._send({"type": "error", "detail": "Frames must be JSON objects"})
+                continue
+            if not isinstance(frame, dict):
+                await self._send({"type": "error", "detail": "Frames must be JSON objects"})
+                continue
+            
+            kind = frame.get("type")
+            if kind == "message":
+                await self._start_turn(frame)
+            elif kind == "cancel":
+                await self._cancel_turn(str(frame.get("id")))
+            elif kind == "ping":
+                await self._send({"type": "pong"})
+            else:
+                await self._send({"type": "error", "detail": f"Unknown frame type: {kind}"})
+    
+    async def _start_turn(self, frame: Dict[str, Any]):
+        turn_id = frame.get("id")
+        if not isinstance(turn_id, str) or not turn_id:
+            await self._send({"type": "error", "detail": "A message needs a string id"})
+            return
+        if turn_id in self.turns:
+            await self._send(
+                {"type": "error", "id": turn_id, "detail": "Turn id already in flight"}
+            )
+            return
+        if len(self.turns) >= settings.ws_max_turns:
+            await self._send({"type": "error", "id": turn_id, "detail": "Too many turns in flight"})
+            return
+        
+        try:
+            request = ChatRequest.model_validate(frame)
+        except ValidationError as e:
+            detail = e.errors(include_url=False, include_context=False)
+            await self._send({"type": "error", "id": turn_id, "detail": detail})
+            return
+        
+        task = asyncio.create_task(self._turn(turn_id, request))
+        self.turns[turn_id] = task
+        task.add_done_callback(lambda _: self._forget(turn_id, task))
+    
+    async def _cancel_turn(self, turn_id: str):
+        task = self.turns.get(turn_id)
+        if task is None:
+            return
+        task.cancel()
+        await asyncio.wait({task})
+        # A turn cancelled before it started never reached its handler
+        if task.cancelled():
+            WEBSOCKET_TURNS.labels("cancelled").inc()
+            await self._send({"type": "cancelled", "id": turn_id})
+    
+    def _forget(self, turn_id: str, task: asyncio.Task):
+        # The id may already belong to a newer turn
+        if self.turns.get(turn_id) is task:
+            del self.turns[turn_id]
+    
+    async def _turn(self, turn_id: str, request: ChatRequest):
+        outcome = "completed"
+        lock: Optional[asyncio.Lock] = None
+        if request.session_id:
+            lock = self.session_locks.setdefault(request.session_id, asyncio.Lock())
+        
+        try:
+            async with lock or nullcontext():
+                events = chat_service.stream_message(
+                    message=request.message,
+                    session_id=request.session_id,
+                    location=request.location,
+                    preferences=request.preferences
+                )
+                try:
+                    async for event in events:
+                        await self._send({"id": turn_id, **event})
+                finally:
+                    # Close the LLM stream and roll back the session now,
+                    # not when the generator is garbage collected
+                    await events.aclose()
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            await self._send({"type": "cancelled", "id": turn_id})
+        except Exception as e:
+            outcome = "error"
+            logger.error(f"Error processing WebSocket chat turn: {e}", exc_info=True)
+            await self._send(
+                {"type": "error", "id": turn_id, "detail": "Failed to process chat message"}
+            )
+        finally:
+            WEBSOCKET_TURNS.labels(outcome).inc()
+    
+    async def _send(self, frame: Dict[str, Any]):
+        """Queue a frame, waiting while the outbox is full"""
+        if not self.closed:
+            await self.outbox.put(frame)
+    
+    async def _send_loop(self):
+        pending: Optional[Dict[str, Any]] = None
+        while True:
+            frame = pending if pending is not None else await self.outbox.get()
+            pending = None
+            
+            # Merge the tokens a slow reader let pile up into one frame
+            while frame["type"] == "token" and not self.outbox.empty():
+                following = self.outbox.get_nowait()
+                if following["type"] != "token" or following["id"] != frame["id"]:
+                    pending = following
+                    break
+                frame = {**frame, "text": frame["text"] + following["text"]}
+            
+            # asyncio.timeout rather than wait_for, which can swallow a
+            # cancellation arriving as the send completes
+            async with asyncio.timeout(settings.ws_send_timeout):
+                await self.websocket.send_text(dumps(frame).decode("utf-8"))
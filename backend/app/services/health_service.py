@@ -0,0 +1,124 @@
+"""Dependency health checks shared by the health and readiness probes"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+from app.config import settings
+from app.core.cache import cache_manager
+from app.core.http import upstream_health
+from app.core.vector_store import vector_store
+from app.mcp_server.client import mcp_client
+from app.services.startup import startup_manager
+
+logger = logging.getLogger(__name__)
+
+
+class HealthService:
+    """
+    Checks Redis, Qdrant, the MCP client and upstream state concurrently
+    
+    Each active check has its own timeout (settings.health_check_timeout)
+    and the aggregate is reused for settings.health_cache_ttl seconds;
+    concurrent probes while a check runs wait for that check instead of
+    starting their own, so Kubernetes probing many pods costs Redis and
+    Qdrant one cheap call each per interval.
+    """
+    
+    def __init__(self):
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._running: Optional[asyncio.Task] = None
+    
+    async def check(self) -> Dict[str, Any]:
+        """
+        Current health, from the cache when recent enough
+        
+        Returns:
+            Dictionary with services (name to status), latency_ms,
+            upstreams (passive state per upstream) and checked_at
+        """
+        age = time.monotonic() - self._checked_at
+        if self._result is not None and age < settings.health_cache_ttl:
+            return self._result
+        
+        if self._running is None:
+            self._running = asyncio.create_task(self._check())
+        running = self._running
+        try:
+            # Shielded so a probe that disconnects doesn't cancel the others' check
+            return await asyncio.shield(running)
+        finally:
+            if running.done() and self._running is running:
+                self._running = None
+    
+    async def _probe(self, name: str, probe: Awaitable[bool], latency: Dict[str, float]) -> str:
+        started = time.perf_counter()
+        try:
+            healthy = await asyncio.wait_for(probe, timeout=settings.health_check_timeout)
+            return "healthy" if healthy else "unhealthy"
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} health check timed out")
+            return "timeout"
+        except Exception as e:
+            logger.error(f"{name} health check failed: {e}")
+            return "unhealthy"
+        finally:
+            latency[name] = round((time.perf_counter() - started) * 1000.0, 1)
+    
+    async def _check(self) -> Dict[str, Any]:
+        latency: Dict[str, float] = {}
+        services = {
+            "mcp_server": "healthy" if mcp_client._connected else "disconnected",
+            "cache": "disconnected",
+            "vector_db": "not_initialized"
+        }
+        
+        probes = {}
+        if cache_manager._connected:
+            probes["cache"] = self._probe("cache", cache_manager.ping(), latency)
+        if vector_store._initialized:
+            probes["vector_db"] = self._probe("vector_db", vector_store.ping(), latency)
+        for name, result in zip(probes, await asyncio.gather(*probes.values())):
+            services[name] = result
+        
+        self._result = {
+            "services": services,
+            "latency_ms": latency,
+            "upstreams": upstream_health.states(),
+            "checked_at": time.time()
+        }
+        self._checked_at = time.monotonic()
+        return self._result
+    
+    def readiness(self, health: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Whether this worker should receive traffic
+        
+        Requires a finished startup warm-up and a connected MCP client, and
+        a Redis connection in live mode (replay/synthetic runs go without).
+        A slow or failing Redis ping is only reported: every pod probes the
+        same Redis, so gating on it would take the whole fleet out of
+        rotation at once, while the cache layer serves without Redis. Qdrant
+        and upstreams are not required either: retrieval degrades without
+        them rather than failing.
+        
+        Args:
+            health: Result of check()
+            
+        Returns:
+            Dictionary with ready and the failing reasons
+        """
+        reasons = []
+        if not startup_manager.ready:
+            reasons.append("warming_up")
+        if health["services"]["mcp_server"] != "healthy":
+            reasons.append("mcp_server")
+        if settings.upstream_mode == "live" and not cache_manager._connected:
+            reasons.append("cache")
+        return {"ready": not reasons, "reasons": reasons}
+
+
+# Global health service instance
+health_service = HealthService()
@@ -0,0 +1,436 @@
+"""Incremental ingestion of restaurant data into the vector database"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.core.embeddings import embedding_service
+from app.core.lexical_index import lexical_index
+from app.core.rate_limit import yelp_limiter
+from app.core.vector_store import VectorStore, vector_store
+from app.mcp_server.client import mcp_client
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionManifest:
+    """
+    Local record of what has been ingested, keyed by business ID
+    
+    Each entry holds the content hash (fingerprint of the embedding text)
+    and the payload hash of the point that is currently stored, plus the
+    content hashes of the business's indexed reviews.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.ingest_manifest_path)
+        self.entries: Dict[str, Dict[str, str]] = {}
+    
+    def load(self) -> "IngestionManifest":
+        """Load manifest from disk (missing or unreadable files yield an empty manifest)"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+        except FileNotFoundError:
+            self.entries = {}
+        except Exception as e:
+            logger.warning(f"Could not read ingestion manifest {self.path}: {e}")
+            self.entries = {}
+        return self
+    
+    def save(self):
+        """Atomically write manifest to disk"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class IngestionPlan:
+    """Delta between fetched restaurants and the manifest"""
+    embed: List[Dict[str, Any]] = field(default_factory=list)
+    patch: List[Dict[str, Any]] = field(default_factory=list)
+    delete: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+
+class IngestionService:
+    """Service for (re-)ingesting restaurants with minimal embedding work"""
+    
+    @staticmethod
+    def build_payload(restaurant: Dict[str, Any], content_hash: str) -> Dict[str, Any]:
+        """
+        Build the vector DB payload for a restaurant
+        
+        Args:
+            restaurant: Raw Yelp business dictionary
+            content_hash: Fingerprint of the restaurant's embedding text
+            
+        Returns:
+            Payload dictionary
+        """
+        return {
+            "id": restaurant.get("id"),
+            "name": restaurant.get("name"),
+            "rating": restaurant.get("rating"),
+            "review_count": restaurant.get("review_count"),
+            "price": restaurant.get("price"),
+            "categories": [cat.get("title") for cat in restaurant.get("categories", [])],
+            "location": restaurant.get("location", {}),
+            "coordinates": restaurant.get("coordinates", {}),
+            "source": "yelp",
+            "type": "restaurant",
+            "parent_id": VectorStore.point_id(restaurant.get("id")),
+            "content_hash": content_hash
+        }
+    
+    @staticmethod
+    def build_review_payload(
+        business_id: str,
+        review: Dict[str, Any],
+        content_hash: str
+    ) -> Dict[str, Any]:
+        """
+        Build the vector DB payload for a review (child of a restaurant point)
+        
+        Args:
+            business_id: Yelp business ID the review belongs to
+            review: Raw Yelp review dictionary
+            content_hash: Fingerprint of the review's embedding text
+            
+        Returns:
+            Payload dictionary
+        """
+        return {
+            "review_id": review.get("id"),
+            "business_id": business_id,
+            "rating": review.get("rating"),
+            "text": review.get("text", ""),
+            "time_created": review.get("time_created"),
+            "user_name": (review.get("user") or {}).get("name"),
+            "source": "yelp",
+            "type": "review",
+            "parent_id": VectorStore.point_id(business_id),
+            "content_hash": content_hash
+        }
+    
+    @staticmethod
+    def review_key(business_id: str, review_id: str) -> str:
+        """Vector DB key of a review point"""
+        return f"{business_id}:review:{review_id}"
+    
+    @staticmethod
+    def payload_hash(payload: Dict[str, Any]) -> str:
+        """Stable hash of a payload dictionary"""
+        serialized = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+    
+    def plan(
+        self,
+        restaurants: List[Dict[str, Any]],
+        manifest: IngestionManifest,
+        prune: bool = True
+    ) -> IngestionPlan:
+        """
+        Work out which restaurants need embedding, patching or deleting
+        
+        Args:
+            restaurants: Raw Yelp business dictionaries
+            manifest: Manifest of previously ingested restaurants
+            prune: Whether businesses missing from this batch are deleted
+            
+        Returns:
+            Ingestion plan; each planned restaurant carries its prepared
+            ``text``, ``payload`` and hashes
+        """
+        plan = IngestionPlan()
+        seen = set()
+        
+        for restaurant in restaurants:
+            business_id = restaurant.get("id")
+            if not business_id or business_id in seen:
+                continue
+            seen.add(business_id)
+            
+            text = embedding_service.prepare_restaurant_text(restaurant)
+            content_hash = embedding_service.fingerprint(text)
+            payload = self.build_payload(restaurant, content_hash)
+            item = {
+                "id": business_id,
+                "text": text,
+                "payload": payload,
+                "content_hash": content_hash,
+                "payload_hash": self.payload_hash(payload)
+            }
+            
+            entry = manifest.entries.get(business_id)
+            if entry is None or entry.get("content_hash") != content_hash:
+                plan.embed.append(item)
+            elif entry.get("payload_hash") != item["payload_hash"]:
+                plan.patch.append(item)
+            else:
+                plan.unchanged += 1
+        
+        if prune:
+            plan.delete = [
+                business_id for business_id in manifest.entries
+                if business_id not in seen
+            ]
+        
+        return plan
+    
+    async def ingest(
+        self,
+        restaurants: List[Dict[str, Any]],
+        manifest: Optional[IngestionManifest] = None,
+        full: bool = False,
+        prune: bool = True,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Ingest restaurants, embedding only new or changed businesses
+        
+        Args:
+            restaurants: Raw Yelp business dictionaries
+            manifest: Manifest to diff against (loaded from settings if omitted)
+            full: Ignore the manifest and re-embed everything
+            prune: Delete businesses that are no longer present
+            batch_size: Number of texts per embedding request
+            
+        Returns:
+            Counts of embedded, patched, deleted and unchanged restaurants,
+            of restaurants whose store, patch or delete failed (left for the
+            next run), and the same counts for reviews
+        """
+        manifest = manifest or IngestionManifest().load()
+        if full:
+            # Forget stored hashes but keep the IDs so pruning still works
+            manifest.entries = {
+                business_id: {
+                    "reviews": {review_id: "" for review_id in entry.get("reviews", {})}
+                }
+                for business_id, entry in manifest.entries.items()
+            }
+        batch_size = batch_size or settings.ingest_batch_size
+        
+        # The lexical index mirrors the vector DB; backfill it if it was lost
+        lexical_index.reload_if_changed()
+        if not len(lexical_index) and manifest.entries and not full:
+            await self.rebuild_lexical_index()
+        
+        plan = self.plan(restaurants, manifest, prune=prune)
+        logger.info(
+            f"Ingestion plan: {len(plan.embed)} to embed, {len(plan.patch)} to patch, "
+            f"{len(plan.delete)} to delete, {plan.unchanged} unchanged"
+        )
+        stats = {
+            "embedded": 0,
+            "patched": 0,
+            "deleted": 0,
+            "unchanged": plan.unchanged,
+            "failed": 0,
+            "reviews_embedded": 0,
+            "reviews_deleted": 0,
+            "reviews_failed": 0
+        }
+        
+        # New or changed content: embed and upsert
+        for start in range(0, len(plan.embed), batch_size):
+            batch = plan.embed[start:start + batch_size]
+            embeddings = await embedding_service.generate_embeddings(
+                [item["text"] for item in batch]
+            )
+            success = await mcp_client.store_embeddings(
+                [item["id"] for item in batch],
+                embeddings,
+                [item["payload"] for item in batch]
+            )
+            if success:
+                self._record(manifest, batch)
+                for item in batch:
+                    lexical_index.upsert(item["id"], item["text"], item["payload"])
+                stats["embedded"] += len(batch)
+            else:
+                stats["failed"] += len(batch)
+        
+        # Payload-only changes: overwrite payload, keep vector
+        if plan.patch:
+            success = await mcp_client.update_payloads(
+                [item["id"] for item in plan.patch],
+                [item["payload"] for item in plan.patch]
+            )
+            if success:
+                self._record(manifest, plan.patch)
+                for item in plan.patch:
+                    lexical_index.upsert(item["id"], item["text"], item["payload"])
+                stats["patched"] = len(plan.patch)
+            else:
+                stats["failed"] += len(plan.patch)
+        
+        # Reviews of new or changed businesses
+        if settings.index_reviews and (plan.embed or plan.patch):
+            await self._ingest_reviews(
+                [item["id"] for item in plan.embed + plan.patch],
+                manifest,
+                stats,
+                batch_size
+            )
+        
+        # Businesses that disappeared, along with their review points
+        if plan.delete:
+            keys = list(plan.delete)
+            for business_id in plan.delete:
+                keys.extend(
+                    self.review_key(business_id, review_id)
+                    for review_id in manifest.entries.get(business_id, {}).get("reviews", {})
+                )
+            success = await mcp_client.delete_embeddings(keys)
+            if success:
+                for business_id in plan.delete:
+                    manifest.entries.pop(business_id, None)
+                for key in keys:
+                    lexical_index.remove(key)
+                stats["deleted"] = len(plan.delete)
+            else:
+                stats["failed"] += len(plan.delete)
+        
+        manifest.save()
+        lexical_index.save()
+        return stats
+    
+    async def rebuild_lexical_index(self) -> int:
+        """
+        Rebuild the lexical index from every point in the vector DB
+        
+        Returns:
+            Number of indexed documents
+        """
+        logger.info("Rebuilding lexical index from vector DB...")
+        
+        async for point in vector_store.iterate_points():
+            payload = point.get("metadata") or {}
+            if payload.get("type") == "review":
+                lexical_index.upsert(
+                    self.review_key(payload["business_id"], payload["review_id"]),
+                    payload.get("text", ""),
+                    payload
+                )
+            elif payload.get("id"):
+                lexical_index.upsert(
+                    payload["id"],
+                    embedding_service.prepare_restaurant_text(payload),
+                    payload
+                )
+        
+        lexical_index.save()
+        logger.info(f"Lexical index rebuilt with {len(lexical_index)} documents")
+        return len(lexical_index)
+    
+    async def _ingest_reviews(
+        self,
+        business_ids: List[str],
+        manifest: IngestionManifest,
+        stats: Dict[str, int],
+        batch_size: int
+    ):
+        """Embed new or changed reviews as child points and drop stale ones"""
+        semaphore = asyncio.Semaphore(settings.ingest_concurrency)
+        
+        # Bulk traffic: share the Yelp budget that search paging uses
+        async def fetch(business_id: str):
+            async with semaphore, yelp_limiter:
+                data = await mcp_client.get_business_reviews(
+                    business_id,
+                    limit=settings.review_snippets_per_restaurant
+                )
+                return business_id, data.get("reviews", [])
+        
+        fetched = await asyncio.gather(*(fetch(business_id) for business_id in business_ids))
+        
+        to_embed = []
+        to_delete = []
+        current_reviews: Dict[str, Dict[str, str]] = {}
+        
+        for business_id, reviews in fetched:
+            # An empty list may just be an upstream error; keep what we have
+            if not reviews:
+                continue
+            
+            known = manifest.entries.get(business_id, {}).get("reviews", {})
+            current = {}
+            
+            for review in reviews:
+                review_id = review.get("id")
+                if not review_id:
+                    continue
+                
+                text = embedding_service.prepare_review_text(review)
+                content_hash = embedding_service.fingerprint(text)
+                current[review_id] = content_hash
+                
+                if known.get(review_id) != content_hash:
+                    to_embed.append({
+                        "id": self.review_key(business_id, review_id),
+                        "business_id": business_id,
+                        "text": text,
+                        "payload": self.build_review_payload(business_id, review, content_hash)
+                    })
+            
+            to_delete.extend(
+                (business_id, self.review_key(business_id, review_id))
+                for review_id in known
+                if review_id not in current
+            )
+            current_reviews[business_id] = current
+        
+        failed = set()
+        for start in range(0, len(to_embed), batch_size):
+            batch = to_embed[start:start + batch_size]
+            embeddings = await embedding_service.generate_embeddings(
+                [item["text"] for item in batch]
+            )
+            success = await mcp_client.store_embeddings(
+                [item["id"] for item in batch],
+                embeddings,
+                [item["payload"] for item in batch]
+            )
+            if success:
+                for item in batch:
+                    lexical_index.upsert(item["id"], item["payload"]["text"], item["payload"])
+                stats["reviews_embedded"] += len(batch)
+            else:
+                stats["reviews_failed"] += len(batch)
+                failed.update(item["business_id"] for item in batch)
+        
+        if to_delete:
+            if await mcp_client.delete_embeddings([key for _, key in to_delete]):
+                for _, key in to_delete:
+                    lexical_index.remove(key)
+                stats["reviews_deleted"] += len(to_delete)
+            else:
+                stats["reviews_failed"] += len(to_delete)
+                failed.update(business_id for business_id, _ in to_delete)
+        
+        for business_id, current in current_reviews.items():
+            if business_id not in failed and business_id in manifest.entries:
+                manifest.entries[business_id]["reviews"] = current
+    
+    @staticmethod
+    def _record(manifest: IngestionManifest, items: List[Dict[str, Any]]):
+        """Record successfully written items in the manifest"""
+        for item in items:
+            entry = manifest.entries.setdefault(item["id"], {})
+            entry["content_hash"] = item["content_hash"]
+            entry["payload_hash"] = item["payload_hash"]
+
+
+# Global ingestion service instance
+ingestion_service = IngestionService()
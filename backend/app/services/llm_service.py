@@ -1,12 +1,15 @@
 """LLM service for chat and text generation"""
 
 import logging
-from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
-from anthropic import AsyncAnthropic
+from types import SimpleNamespace
+from typing import AsyncIterator, List, Optional
 
 from app.config import settings
+from app.core.http import http_pool
+from app.core.metrics import record_tokens
+from app.core.tracing import span
 from app.models.chat import Message
+from app.models.restaurant import RestaurantRecord
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +19,31 @@ class LLMService:
     
     def __init__(self):
         self.provider = settings.llm_provider
-        
-        if self.provider == "openai":
-            self.client = AsyncOpenAI(api_key=settings.openai_api_key)
-        elif self.provider == "anthropic":
-            self.client = AsyncAnthropic(api_key=settings.anthropic_api_key)
-        else:
+        if self.provider not in ("openai", "anthropic"):
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
         
         self.model = settings.llm_model
         self.temperature = settings.llm_temperature
         self.max_tokens = settings.llm_max_tokens
+        self._client = None
+    
+    @property
+    def client(self):
+        """Provider SDK client, created (and the SDK imported) on first use"""
+        if self._client is None:
+            if self.provider == "openai":
+                from openai import AsyncOpenAI
+                self._client = AsyncOpenAI(
+                    api_key=settings.openai_api_key,
+                    http_client=http_pool.sdk_client()
+                )
+            else:
+                from anthropic import AsyncAnthropic
+                self._client = AsyncAnthropic(
+                    api_key=settings.anthropic_api_key,
+                    http_client=http_pool.sdk_client()
+                )
+        return self._client
     
     async def generate_response(
         self,
@@ -48,18 +65,116 @@ class LLMService:
             Generated response text
         """
         try:
-            if self.provider == "openai":
-                return await self._generate_openai(
-                    messages, system_prompt, temperature, max_tokens
-                )
-            elif self.provider == "anthropic":
-                return await self._generate_anthropic(
-                    messages, system_prompt, temperature, max_tokens
-                )
+            with span("llm.generate", **{"llm.provider": self.provider, "llm.model": self.model}):
+                if self.provider == "openai":
+                    return await self._generate_openai(
+                        messages, system_prompt, temperature, max_tokens
+                    )
+                elif self.provider == "anthropic":
+                    return await self._generate_anthropic(
+                        messages, system_prompt, temperature, max_tokens
+                    )
         except Exception as e:
             logger.error(f"Error generating LLM response: {e}")
             raise
     
+    async def stream_response(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response from the LLM, yielding text as it is produced
+        
+        Closing the generator early (or cancelling the task iterating it)
+        closes the upstream HTTP stream, which stops the provider from
+        generating, and billing, the rest of the answer.
+        
+        Args:
+            messages: List of conversation messages
+            system_prompt: Optional system prompt
+            temperature: Optional temperature override
+            max_tokens: Optional max tokens override
+            
+        Yields:
+            Text deltas
+        """
+        with span("llm.stream", **{"llm.provider": self.provider, "llm.model": self.model}):
+            if self.provider == "openai":
+                stream = self._stream_openai(messages, system_prompt, temperature, max_tokens)
+            else:
+                stream = self._stream_anthropic(messages, system_prompt, temperature, max_tokens)
+            try:
+                async for text in stream:
+                    yield text
+            finally:
+                await stream.aclose()
+    
+    async def _stream_openai(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int]
+    ) -> AsyncIterator[str]:
+        """Stream a response from the OpenAI API"""
+        formatted_messages = []
+        if system_prompt:
+            formatted_messages.append({"role": "system", "content": system_prompt})
+        formatted_messages.extend({"role": msg.role, "content": msg.content} for msg in messages)
+        
+        # Streamed completions carry no usage in this SDK version, so
+        # streamed turns are not counted in llm_tokens_total
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=formatted_messages,
+            temperature=temperature or self.temperature,
+            max_tokens=max_tokens or self.max_tokens,
+            stream=True
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.response.aclose()
+    
+    async def _stream_anthropic(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int]
+    ) -> AsyncIterator[str]:
+        """Stream a response from the Anthropic API"""
+        stream = await self.client.messages.create(
+            model=self.model,
+            system=system_prompt or "",
+            messages=[
+                {"role": msg.role, "content": msg.content}
+                for msg in messages if msg.role != "system"
+            ],
+            temperature=temperature or self.temperature,
+            max_tokens=max_tokens or self.max_tokens,
+            stream=True
+        )
+        try:
+            async for event in stream:
+                if event.type == "content_block_delta":
+                    yield event.delta.text
+                elif event.type == "message_start":
+                    # Its output count is a placeholder; message_delta has the total
+                    record_tokens(
+                        "anthropic", self.model,
+                        SimpleNamespace(input_tokens=event.message.usage.input_tokens)
+                    )
+                elif event.type == "message_delta":
+                    record_tokens("anthropic", self.model, event.usage)
+        finally:
+            await stream.response.aclose()
+    
     async def _generate_openai(
         self,
         messages: List[Message],
@@ -88,6 +203,7 @@ class LLMService:
             temperature=temperature or self.temperature,
             max_tokens=max_tokens or self.max_tokens
         )
+        record_tokens("openai", self.model, response.usage)
         
         return response.choices[0].message.content
     
@@ -115,19 +231,20 @@ class LLMService:
             temperature=temperature or self.temperature,
             max_tokens=max_tokens or self.max_tokens
         )
+        record_tokens("anthropic", self.model, response.usage)
         
         return response.content[0].text
     
     def build_restaurant_context(
         self,
-        restaurants: List[Dict[str, Any]],
+        restaurants: List[RestaurantRecord],
         query: str
     ) -> str:
         """
         Build context string from restaurant data
         
         Args:
-            restaurants: List of restaurant dictionaries
+            restaurants: Restaurant records
             query: User query
             
         Returns:
@@ -138,15 +255,14 @@ class LLMService:
             "\nTop Restaurant Recommendations:\n"
         ]
         
-        for idx, restaurant in enumerate(restaurants[:10], 1):
-            name = restaurant.get("name", "Unknown")
-            rating = restaurant.get("rating", "N/A")
-            price = restaurant.get("price", "N/A")
-            categories = ", ".join([cat.get("title", "") for cat in restaurant.get("categories", [])])
-            location = restaurant.get("location", {})
-            address = location.get("address1", "")
-            city = location.get("city", "")
-            review_count = restaurant.get("review_count", 0)
+        for idx, restaurant in enumerate(restaurants[:settings.max_restaurants_return], 1):
+            name = restaurant.name or "Unknown"
+            rating = restaurant.rating if restaurant.rating is not None else "N/A"
+            price = restaurant.price or "N/A"
+            categories = ", ".join(restaurant.category_titles)
+            address = restaurant.address or ""
+            city = restaurant.city or ""
+            review_count = restaurant.review_count
             
             context_parts.append(
                 f"{idx}. {name}\n"
@@ -157,9 +273,9 @@ class LLMService:
             )
             
             # Add reviews if available
-            if "reviews" in restaurant and restaurant["reviews"]:
+            if restaurant.reviews:
                 context_parts.append("   Recent Reviews:\n")
-                for review in restaurant["reviews"][:2]:
+                for review in restaurant.reviews[:2]:
                     text = review.get("text", "")[:150]
                     context_parts.append(f"   - {text}...\n")
             
@@ -1,36 +1,36 @@
 """RAG (Retrieval-Augmented Generation) service"""
 
+import asyncio
 import logging
 import re
 from typing import List, Dict, Any, Optional
 
+from app.config import settings
+from app.core.entity_resolution import resolve_entities
+from app.core.fusion import reciprocal_rank_fusion
+from app.core.geo import fill_distances, sort_by_distance
+from app.core.lexical_index import lexical_index
+from app.core.query_parser import query_parser
+from app.core.reranker import reranker
+from app.core.timing import stage
 from app.mcp_server.client import mcp_client
+from app.mcp_server.tools.google_search import GOOGLE_ID_PREFIX
 from app.models.chat import ConversationContext
+from app.models.restaurant import RestaurantRecord, normalize_review
 
 logger = logging.getLogger(__name__)
 
+# Search parameters understood by the Yelp business search tool
+YELP_SEARCH_PARAMS = ("term", "categories", "price", "sort_by")
+
 
 class RAGService:
     """Service for RAG pipeline operations"""
     
-    def __init__(self):
-        self.cuisine_keywords = [
-            "italian", "chinese", "japanese", "mexican", "thai", "indian",
-            "french", "korean", "vietnamese", "mediterranean", "american",
-            "pizza", "sushi", "burgers", "tacos", "pasta", "seafood"
-        ]
-        self.price_keywords = {
-            "cheap": "1",
-            "affordable": "1,2",
-            "moderate": "2",
-            "expensive": "3,4",
-            "fine dining": "4"
-        }
-    
     async def retrieve_restaurants(
         self,
         context: ConversationContext
-    ) -> List[Dict[str, Any]]:
+    ) -> List[RestaurantRecord]:
         """
         Retrieve relevant restaurants using hybrid approach
         
@@ -38,7 +38,7 @@ class RAGService:
             context: Conversation context with query and preferences
             
         Returns:
-            List of relevant restaurants
+            List of relevant restaurant records
         """
         query = context.query
         location = context.location
@@ -50,21 +50,52 @@ class RAGService:
         # Get location coordinates if address is provided
         location_data = None
         if location and "address" in location:
-            location_data = await mcp_client.geocode(location["address"])
+            with stage("geocode"):
+                location_data = await mcp_client.geocode(location["address"])
         elif location and "latitude" in location:
             location_data = location
         
-        # Search using Yelp API
-        yelp_results = await self._search_yelp(search_params, location_data)
+        # Search Yelp, Google Places and the vector DB concurrently; a slow
+        # or failing source contributes nothing instead of delaying the rest
+        yelp_results, vector_results, google_results = await asyncio.gather(
+            self._with_timeout("yelp", self._search_yelp(search_params, location_data)),
+            self._with_timeout("vector", self._search_vector_db(query, location_data)),
+            self._with_timeout("google", self._search_google(search_params, location_data))
+        )
+        
+        with stage("merge"):
+            # Search the in-process lexical index for exact terms
+            lexical_results = self._search_lexical(query)
+            
+            # Merge and deduplicate results
+            merged_results = self._merge_results(
+                yelp_results, vector_results, lexical_results, google_results
+            )
         
-        # Search using vector DB for semantic similarity
-        vector_results = await self._search_vector_db(query, location_data)
+        # Compute distances locally (vector and lexical results have none)
+        # and drop candidates too far from the user
+        if location_data and location_data.get("latitude") is not None:
+            merged_results = fill_distances(
+                merged_results,
+                location_data["latitude"],
+                location_data["longitude"],
+                radius=settings.candidate_max_distance
+            )
         
-        # Merge and deduplicate results
-        merged_results = self._merge_results(yelp_results, vector_results)
+        with stage("rerank"):
+            if search_params.get("sort_by") == "distance":
+                ranked_results = sort_by_distance(merged_results)[:settings.max_restaurants_return]
+            else:
+                # Rerank on relevance, distance, rating, price and category features
+                ranked_results = reranker.rerank(
+                    merged_results,
+                    search_params=search_params,
+                    top_k=settings.max_restaurants_return
+                )
         
         # Enrich with reviews
-        enriched_results = await self._enrich_with_reviews(merged_results[:10])
+        with stage("reviews"):
+            enriched_results = await self._enrich_with_reviews(ranked_results)
         
         return enriched_results
     
@@ -75,20 +106,38 @@ class RAGService:
     ) -> Dict[str, Any]:
         """Extract search parameters from query and preferences"""
         query_lower = query.lower()
+        parsed = query_parser.parse(query)
         params = {}
         
-        # Extract cuisine type
-        for cuisine in self.cuisine_keywords:
-            if cuisine in query_lower:
-                params["term"] = cuisine
-                params["categories"] = "restaurants"
-                break
+        # Extract cuisines and dishes
+        food_terms = [
+            value.replace("_", " ")
+            for value in parsed.values("cuisine") + parsed.values("dish")
+        ]
+        if food_terms:
+            params["term"] = " ".join(food_terms)
+            params["categories"] = "restaurants"
+        
+        # Extract dietary needs
+        dietary_terms = [value.replace("_", " ") for value in parsed.values("dietary")]
+        if dietary_terms:
+            params["term"] = " ".join(filter(None, [params.get("term"), *dietary_terms]))
         
         # Extract price range
-        for price_term, price_value in self.price_keywords.items():
-            if price_term in query_lower:
-                params["price"] = price_value
-                break
+        price = parsed.first("price")
+        if price:
+            params["price"] = price
+        
+        # Extract ordering (e.g. "nearest", "top rated")
+        sort_by = parsed.first("sort")
+        if sort_by:
+            params["sort_by"] = sort_by
+        
+        # Ambience is matched semantically/lexically, and by the reranker
+        # against categories and review snippets
+        ambience = parsed.values("ambience")
+        if ambience:
+            params["ambience"] = ambience
         
         # Extract rating requirement
         rating_match = re.search(r'(\d\.?\d*)\s*star', query_lower)
@@ -100,6 +149,8 @@ class RAGService:
             params["term"] = preferences["cuisine"]
         if "price_range" in preferences:
             params["price"] = preferences["price_range"]
+        if "sort_by" in preferences:
+            params["sort_by"] = preferences["sort_by"]
         if "dietary" in preferences:
             # Add dietary restrictions to search term
             dietary = preferences["dietary"]
@@ -114,13 +165,16 @@ class RAGService:
         self,
         search_params: Dict[str, Any],
         location_data: Optional[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
+    ) -> List[RestaurantRecord]:
         """Search restaurants using Yelp API"""
         try:
             kwargs = {
                 "limit": 20,
                 "sort_by": "best_match",
-                **search_params
+                **{
+                    key: value for key, value in search_params.items()
+                    if key in YELP_SEARCH_PARAMS
+                }
             }
             
             if location_data:
@@ -137,7 +191,7 @@ class RAGService:
             # Filter by rating if specified
             min_rating = search_params.get("min_rating")
             if min_rating:
-                businesses = [b for b in businesses if b.get("rating", 0) >= min_rating]
+                businesses = [b for b in businesses if (b.rating or 0) >= min_rating]
             
             return businesses
         
@@ -145,12 +199,56 @@ class RAGService:
             logger.error(f"Error searching Yelp: {e}")
             return []
     
+    async def _search_google(
+        self,
+        search_params: Dict[str, Any],
+        location_data: Optional[Dict[str, Any]]
+    ) -> List[RestaurantRecord]:
+        """Search restaurants using Google Places (needs coordinates)"""
+        if not settings.google_places_enabled:
+            return []
+        if not location_data or location_data.get("latitude") is None:
+            return []
+        
+        try:
+            term = search_params.get("term")
+            restaurants = await mcp_client.search_google_restaurants(
+                latitude=location_data["latitude"],
+                longitude=location_data["longitude"],
+                query=f"{term} restaurant" if term else None,
+                radius=settings.default_search_radius
+            )
+            
+            min_rating = search_params.get("min_rating")
+            if min_rating:
+                restaurants = [r for r in restaurants if (r.rating or 0) >= min_rating]
+            
+            return restaurants
+        
+        except Exception as e:
+            logger.error(f"Error searching Google Places: {e}")
+            return []
+    
+    async def _with_timeout(self, source: str, search) -> List[RestaurantRecord]:
+        """Await a source search, giving up after settings.source_timeout"""
+        try:
+            with stage(f"source.{source}"):
+                return await asyncio.wait_for(search, timeout=settings.source_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Retrieval source {source} timed out")
+            return []
+    
     async def _search_vector_db(
         self,
         query: str,
         location_data: Optional[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """Search restaurants using vector database"""
+    ) -> List[RestaurantRecord]:
+        """
+        Search restaurants using vector database
+        
+        Restaurant and review points are searched together and grouped by
+        restaurant, so each result carries its best-matching review snippets.
+        """
         try:
             filters = {}
             
@@ -158,65 +256,154 @@ class RAGService:
                 # Could add location-based filtering if vector DB supports it
                 pass
             
-            results = await mcp_client.search_hybrid(
+            groups = await mcp_client.search_grouped(
                 query=query,
                 filters=filters,
-                top_k=20
+                limit=20,
+                group_size=settings.review_snippets_per_restaurant + 1
             )
             
-            return [r["metadata"] for r in results if "metadata" in r]
+            results = []
+            for group in groups:
+                if not group.get("metadata"):
+                    continue
+                restaurant = RestaurantRecord.from_upstream(group["metadata"])
+                restaurant.semantic_score = group.get("score", 0.0)
+                restaurant.reviews = [
+                    normalize_review(hit["metadata"])
+                    for hit in group.get("hits", [])
+                    if (hit.get("metadata") or {}).get("type") == "review"
+                ]
+                results.append(restaurant)
+            
+            return results
         
         except Exception as e:
             logger.error(f"Error searching vector DB: {e}")
             return []
     
+    def _search_lexical(
+        self,
+        query: str,
+        top_k: int = 20
+    ) -> List[RestaurantRecord]:
+        """
+        Search restaurants using the in-process BM25 index
+        
+        Review hits are attributed to their restaurant, whose best-matching
+        reviews are attached as snippets.
+        """
+        try:
+            lexical_index.reload_if_changed()
+            hits = lexical_index.search(query, top_k=top_k * 3)
+        except Exception as e:
+            logger.error(f"Error searching lexical index: {e}")
+            return []
+        
+        results: Dict[str, RestaurantRecord] = {}
+        
+        for doc_id, _ in hits:
+            payload = lexical_index.get_metadata(doc_id) or {}
+            is_review = payload.get("type") == "review"
+            business_id = payload.get("business_id") if is_review else doc_id
+            
+            restaurant = results.get(business_id)
+            if restaurant is None:
+                restaurant_payload = payload
+                if is_review:
+                    restaurant_payload = lexical_index.get_metadata(business_id)
+                if not restaurant_payload or len(results) >= top_k:
+                    continue
+                restaurant = RestaurantRecord.from_upstream(restaurant_payload)
+                results[business_id] = restaurant
+            
+            if is_review and len(restaurant.reviews) < settings.review_snippets_per_restaurant:
+                restaurant.reviews.append(normalize_review(payload))
+        
+        return list(results.values())
+    
     def _merge_results(
         self,
-        yelp_results: List[Dict[str, Any]],
-        vector_results: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """Merge and deduplicate results from different sources"""
-        # Use dict to deduplicate by business ID
-        merged = {}
-        
-        # Add Yelp results (prioritize these)
-        for business in yelp_results:
-            business_id = business.get("id")
-            if business_id:
-                merged[business_id] = business
-        
-        # Add vector DB results if not already present
-        for business in vector_results:
-            business_id = business.get("id") or business.get("yelp_id")
-            if business_id and business_id not in merged:
-                merged[business_id] = business
-        
-        # Convert back to list and sort by rating
-        results = list(merged.values())
-        results.sort(key=lambda x: (x.get("rating", 0), x.get("review_count", 0)), reverse=True)
-        
-        return results
+        yelp_results: List[RestaurantRecord],
+        vector_results: List[RestaurantRecord],
+        lexical_results: Optional[List[RestaurantRecord]] = None,
+        google_results: Optional[List[RestaurantRecord]] = None
+    ) -> List[RestaurantRecord]:
+        """
+        Merge and deduplicate results from different sources
+        
+        Google places are first resolved onto the Yelp businesses they refer
+        to, then results are combined with weighted reciprocal rank fusion,
+        so each source's own relevance ordering is kept. Yelp data takes
+        precedence when a restaurant is found by several sources.
+        """
+        ranked_lists = resolve_entities({
+            "yelp": yelp_results,
+            "vector": vector_results,
+            "lexical": lexical_results or [],
+            "google": google_results or []
+        })
+        return reciprocal_rank_fusion(
+            ranked_lists,
+            weights={
+                "yelp": settings.fusion_weight_yelp,
+                "vector": settings.fusion_weight_vector,
+                "lexical": settings.fusion_weight_lexical,
+                "google": settings.fusion_weight_google
+            },
+            k=settings.rrf_k
+        )
     
     async def _enrich_with_reviews(
         self,
-        restaurants: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """Enrich restaurant data with reviews"""
-        enriched = []
-        
-        for restaurant in restaurants:
-            business_id = restaurant.get("id")
-            if business_id:
-                try:
-                    reviews_data = await mcp_client.get_business_reviews(business_id, limit=3)
-                    restaurant["reviews"] = reviews_data.get("reviews", [])
-                except Exception as e:
-                    logger.warning(f"Failed to get reviews for {business_id}: {e}")
-                    restaurant["reviews"] = []
-            
-            enriched.append(restaurant)
-        
-        return enriched
+        restaurants: List[RestaurantRecord]
+    ) -> List[RestaurantRecord]:
+        """
+        Enrich restaurant data with reviews
+        
+        Review snippets found by semantic search are kept. Remaining
+        restaurants are filled from ingested reviews in a single vector DB
+        lookup, and only businesses that were never ingested fall back to
+        live Yelp review calls.
+        """
+        # Places only Google knows have no Yelp reviews
+        missing = [
+            restaurant for restaurant in restaurants
+            if restaurant.id and not restaurant.reviews
+            and not restaurant.id.startswith(GOOGLE_ID_PREFIX)
+        ]
+        
+        if missing and settings.index_reviews:
+            try:
+                stored = await mcp_client.get_stored_reviews(
+                    [restaurant.id for restaurant in missing],
+                    limit_per_business=settings.review_snippets_per_restaurant
+                )
+            except Exception as e:
+                logger.warning(f"Failed to get stored reviews: {e}")
+                stored = {}
+            
+            for restaurant in missing:
+                if restaurant.id in stored:
+                    restaurant.reviews = [
+                        normalize_review(payload) for payload in stored[restaurant.id]
+                    ]
+            missing = [restaurant for restaurant in missing if not restaurant.reviews]
+        
+        async def fetch_live(restaurant: RestaurantRecord):
+            business_id = restaurant.id
+            try:
+                reviews_data = await mcp_client.get_business_reviews(business_id, limit=3)
+                restaurant.reviews = [
+                    normalize_review(review) for review in reviews_data.get("reviews", [])
+                ]
+            except Exception as e:
+                logger.warning(f"Failed to get reviews for {business_id}: {e}")
+                restaurant.reviews = []
+        
+        await asyncio.gather(*(fetch_live(restaurant) for restaurant in missing))
+        
+        return restaurants
 
 
 # Global RAG service instance
@@ -0,0 +1,124 @@
+"""Background startup work: deferred client construction and warm-up"""
+
+import asyncio
+import importlib
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.core.embeddings import embedding_service
+from app.core.http import http_pool
+from app.core.vector_store import vector_store
+from app.mcp_server.client import mcp_client
+from app.services.llm_service import llm_service
+
+logger = logging.getLogger(__name__)
+
+# SDKs the services import on first use; together they take over a second
+_DEFERRED_IMPORTS = ("qdrant_client", "openai")
+
+
+def _import_sdks():
+    for module in (*_DEFERRED_IMPORTS, settings.llm_provider):
+        importlib.import_module(module)
+
+
+class StartupManager:
+    """
+    Runs deferred service construction and the warm-up in the background
+    
+    The lifespan handler starts it and returns at once, so the worker
+    answers /liveness while the SDKs import (in a thread, off the event
+    loop) and their clients are built. The warm-up then pays the costs the
+    first requests after a deploy would otherwise pay: Qdrant client setup,
+    connection pools, query embeddings and geocodes of popular searches.
+    ``ready`` flips once it finishes, fails or times out (a failed step
+    only means a cold cache, not a broken worker); a request that arrives
+    earlier builds what it needs on demand.
+    """
+    
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start background startup work"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        started = time.perf_counter()
+        try:
+            await self._step("clients", self._build_clients)
+            if settings.warmup_enabled:
+                try:
+                    await asyncio.wait_for(
+                        asyncio.gather(
+                            self._step("vector_store", self._warm_vector_store),
+                            self._step("query_embeddings", self._warm_query_embeddings),
+                            self._step("locations", self._warm_locations)
+                        ),
+                        timeout=settings.warmup_timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Warm-up timed out after {settings.warmup_timeout:.0f}s")
+        finally:
+            self.ready = True
+            logger.info(f"Startup finished in {time.perf_counter() - started:.2f}s, ready to serve")
+    
+    async def _step(self, name: str, func: Callable[[], Awaitable[Any]]):
+        self.steps[name] = {"status": "running"}
+        started = time.perf_counter()
+        try:
+            detail = await func()
+            self.steps[name] = {"status": "done", **(detail or {})}
+        except asyncio.CancelledError:
+            self.steps[name] = {"status": "timed_out"}
+            raise
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+            self.steps[name] = {"status": "failed", "error": str(e)}
+        self.steps[name]["duration_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+    
+    async def _build_clients(self):
+        await asyncio.to_thread(_import_sdks)
+        llm_service.client
+        embedding_service.client
+        http_pool.client
+    
+    async def _warm_vector_store(self):
+        if not vector_store._initialized:
+            await vector_store.initialize()
+    
+    async def _warm_query_embeddings(self) -> Dict[str, Any]:
+        return {"embedded": await embedding_service.preload_queries(settings.warmup_queries)}
+    
+    async def _warm_locations(self) -> Dict[str, Any]:
+        # Geocodes land in the Redis cache; Yelp searches aren't cached, so
+        # they only open pooled (TLS) connections to Yelp
+        async def warm(location: str) -> bool:
+            geocoded = await mcp_client.geocode(location)
+            await mcp_client.search_restaurants(location=location)
+            return bool(geocoded)
+        
+        warmed = await asyncio.gather(
+            *(warm(location) for location in settings.warmup_locations),
+            return_exceptions=True
+        )
+        return {"geocoded": sum(result is True for result in warmed), "locations": len(warmed)}
+    
+    async def close(self):
+        """Cancel startup work still running"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global startup manager instance
+startup_manager = StartupManager()
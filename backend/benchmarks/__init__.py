@@ -0,0 +1 @@
+"""Micro-benchmarks for the backend hot paths (run with ``python -m benchmarks``)"""
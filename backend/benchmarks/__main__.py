@@ -0,0 +1,156 @@
+"""
+Run the component benchmarks or compare two result files
+
+Usage:
+    python -m benchmarks run --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks startup --output results/startup-$(git rev-parse --short HEAD).json
+    python -m benchmarks compare results/base.json results/head.json --threshold 0.1
+"""
+
+import argparse
+import fnmatch
+import sys
+
+from benchmarks.runner import (
+    METRICS,
+    REGISTRY,
+    compare_reports,
+    load_report,
+    report_meta,
+    run_all,
+    save_report,
+)
+
+
+def _format_ns(value: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.2f} {unit}"
+    return f"{value:.0f} ns"
+
+
+def run(args: argparse.Namespace) -> int:
+    from benchmarks import suite
+    suite.prepare()
+    
+    names = sorted(
+        name for name in REGISTRY
+        if not args.filter or any(fnmatch.fnmatch(name, pattern) for pattern in args.filter)
+    )
+    if not names:
+        print("No benchmarks match the filter")
+        return 1
+    
+    def progress(name, result):
+        print(
+            f"{name:<36} median {_format_ns(result['median_ns']):>10}"
+            f"  min {_format_ns(result['min_ns']):>10}"
+            f"  ({result['iterations']} ops x {result['rounds']} rounds)"
+        )
+    
+    report = run_all(names, rounds=args.rounds, min_round_time=args.min_time, progress=progress)
+    if args.output:
+        save_report(report, args.output)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+def startup(args: argparse.Namespace) -> int:
+    from benchmarks.startup import heaviest_imports, run_startup
+    
+    def progress(name, result):
+        print(
+            f"{name:<36} median {_format_ns(result['median_ns']):>10}"
+            f"  min {_format_ns(result['min_ns']):>10}  ({result['rounds']} cold starts)"
+        )
+    
+    report = {
+        "meta": report_meta(args.rounds),
+        "results": run_startup(rounds=args.rounds, liveness=not args.import_only, progress=progress)
+    }
+    if args.top:
+        print("\nSlowest imports of app.main (cumulative):")
+        for entry in heaviest_imports(args.top):
+            print(f"  {entry['module']:<40} {entry['cumulative_us'] / 1000:8.1f} ms")
+    if args.output:
+        save_report(report, args.output)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    rows = compare_reports(
+        load_report(args.baseline),
+        load_report(args.current),
+        metric=args.metric,
+        threshold=args.threshold
+    )
+    
+    for row in rows:
+        flag = "REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['name']:<36} {_format_ns(row['baseline']):>10} -> "
+            f"{_format_ns(row['current']):>10}  {row['change']:+7.1%}  {flag}"
+        )
+    
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        print(
+            f"\n{len(regressions)} benchmark(s) regressed by more than "
+            f"{args.threshold:.0%} ({args.metric})"
+        )
+        return 1
+    print(f"\nNo regressions above {args.threshold:.0%} ({args.metric})")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = commands.add_parser("run", help="Run benchmarks")
+    run_parser.add_argument("--output", "-o", help="Write results to this JSON file")
+    run_parser.add_argument(
+        "--filter", "-k", action="append",
+        help="Only run benchmarks matching this glob (repeatable), e.g. 'cache.*'"
+    )
+    run_parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per benchmark")
+    run_parser.add_argument(
+        "--min-time", type=float, default=0.05,
+        help="Minimum seconds per round (operations per round are calibrated)"
+    )
+    run_parser.set_defaults(handler=run)
+    
+    startup_parser = commands.add_parser(
+        "startup", help="Time cold starts (app import and first /liveness response)"
+    )
+    startup_parser.add_argument("--output", "-o", help="Write results to this JSON file")
+    startup_parser.add_argument("--rounds", type=int, default=5, help="Cold starts timed")
+    startup_parser.add_argument(
+        "--import-only", action="store_true", help="Skip the lifespan startup and /liveness request"
+    )
+    startup_parser.add_argument(
+        "--top", type=int, default=10, help="Also list the N slowest imports (0 to skip)"
+    )
+    startup_parser.set_defaults(handler=startup)
+    
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline", help="Earlier results JSON")
+    compare_parser.add_argument("current", help="Later results JSON")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="Relative slowdown that fails the comparison (default 0.10 = 10%%)"
+    )
+    compare_parser.add_argument(
+        "--metric", choices=METRICS, default="median_ns",
+        help="Statistic to compare (default median_ns)"
+    )
+    compare_parser.set_defaults(handler=compare)
+    
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Deterministic synthetic payloads shaped like real upstream data"""
+
+import random
+from typing import Any, Dict, List
+
+from app.models.restaurant import RestaurantRecord
+
+CUISINES = [
+    ("italian", "Italian"), ("japanese", "Japanese"), ("mexican", "Mexican"),
+    ("thai", "Thai"), ("indpak", "Indian"), ("chinese", "Chinese"),
+    ("french", "French"), ("korean", "Korean"), ("vegan", "Vegan"),
+    ("pizza", "Pizza"), ("sushi", "Sushi Bars"), ("burgers", "Burgers")
+]
+
+NAME_WORDS = [
+    "Golden", "Little", "Blue", "Corner", "House", "Garden", "Kitchen",
+    "Table", "Harbor", "Oak", "Lotus", "Olive", "Saffron", "Ember", "Noodle"
+]
+
+REVIEW_SENTENCES = [
+    "The food was fantastic and the service was quick.",
+    "Great spot for a date night, a bit loud on weekends.",
+    "Portions are generous and prices are fair.",
+    "Loved the pasta, the tiramisu was the highlight.",
+    "Long wait but worth it, staff were friendly.",
+    "Vegan options are clearly marked and delicious.",
+    "Cozy atmosphere with outdoor seating in summer."
+]
+
+QUERIES = [
+    "Find me the best Italian restaurants in San Francisco",
+    "cheap vegan food near me",
+    "romantic french dinner with a view",
+    "top rated sushi open late",
+    "family friendly mexican place with outdoor seating",
+    "gluten free pizza under $$",
+    "nearest ramen spot",
+    "spicy thai curry, at least 4.5 stars",
+    "fine dining tasting menu for an anniversary",
+    "quick burgers and fries downtown",
+    "korean bbq for a group of 8",
+    "halal indian buffet"
+]
+
+
+def business(rng: random.Random, idx: int) -> Dict[str, Any]:
+    """A Yelp business search result"""
+    alias, title = rng.choice(CUISINES)
+    latitude = 37.70 + rng.random() * 0.12
+    longitude = -122.51 + rng.random() * 0.16
+    return {
+        "id": f"business-{idx:06d}",
+        "alias": f"business-{idx}-san-francisco",
+        "name": f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {title}",
+        "image_url": f"https://s3-media.fl.yelpcdn.com/bphoto/{idx}/o.jpg",
+        "is_closed": rng.random() < 0.05,
+        "url": f"https://www.yelp.com/biz/business-{idx}",
+        "review_count": rng.randint(5, 4000),
+        "categories": [{"alias": alias, "title": title}, {"alias": "bars", "title": "Bars"}],
+        "rating": rng.choice([3.0, 3.5, 4.0, 4.5, 5.0]),
+        "coordinates": {"latitude": latitude, "longitude": longitude},
+        "transactions": ["pickup", "delivery"],
+        "price": "$" * rng.randint(1, 4),
+        "location": {
+            "address1": f"{rng.randint(1, 3000)} Mission St",
+            "address2": "",
+            "city": "San Francisco",
+            "zip_code": "94103",
+            "country": "US",
+            "state": "CA",
+            "display_address": [f"{rng.randint(1, 3000)} Mission St", "San Francisco, CA 94103"]
+        },
+        "phone": f"+1415555{idx % 10000:04d}",
+        "display_phone": f"(415) 555-{idx % 10000:04d}",
+        "distance": rng.random() * 5000
+    }
+
+
+def review(rng: random.Random, idx: int) -> Dict[str, Any]:
+    """A Yelp review"""
+    return {
+        "id": f"review-{idx:06d}",
+        "rating": rng.randint(1, 5),
+        "text": " ".join(rng.sample(REVIEW_SENTENCES, 3)),
+        "time_created": "2024-05-01 19:30:00",
+        "user": {"name": f"User {idx}"}
+    }
+
+
+def businesses(count: int, seed: int = 0, start: int = 0) -> List[Dict[str, Any]]:
+    """A list of businesses with stable IDs ``start`` .. ``start + count``"""
+    rng = random.Random(seed)
+    return [business(rng, idx) for idx in range(start, start + count)]
+
+
+def with_reviews(restaurants: List[Dict[str, Any]], per_restaurant: int = 3, seed: int = 0):
+    """Attach review snippets to restaurants in place"""
+    rng = random.Random(seed)
+    for idx, restaurant in enumerate(restaurants):
+        restaurant["reviews"] = [
+            review(rng, idx * per_restaurant + offset) for offset in range(per_restaurant)
+        ]
+    return restaurants
+
+
+def google_places(restaurants: List[Dict[str, Any]], seed: int = 0) -> List[Dict[str, Any]]:
+    """Google results for the same restaurants, slightly renamed and displaced"""
+    rng = random.Random(seed)
+    places = []
+    for idx, restaurant in enumerate(restaurants):
+        coordinates = restaurant["coordinates"]
+        name = restaurant["name"] + (" Restaurant" if rng.random() < 0.5 else "")
+        places.append({
+            "id": f"google:place-{idx:06d}",
+            "google_place_id": f"place-{idx:06d}",
+            "name": name,
+            "rating": restaurant["rating"],
+            "review_count": restaurant["review_count"],
+            "price": restaurant["price"],
+            "categories": [{"alias": "restaurant", "title": "Restaurant"}],
+            "coordinates": {
+                "latitude": coordinates["latitude"] + rng.uniform(-2e-4, 2e-4),
+                "longitude": coordinates["longitude"] + rng.uniform(-2e-4, 2e-4)
+            },
+            "location": {"display_address": restaurant["location"]["display_address"]},
+            "is_closed": False
+        })
+    return places
+
+
+def search_response(count: int = 20, seed: int = 0) -> Dict[str, Any]:
+    """A Yelp business search response"""
+    return {
+        "businesses": businesses(count, seed=seed),
+        "total": 1200,
+        "region": {"center": {"latitude": 37.7749, "longitude": -122.4194}}
+    }
+
+
+def records(restaurants: List[Dict[str, Any]]) -> List[RestaurantRecord]:
+    """Restaurants projected onto records, as retrieval sources return them"""
+    return [RestaurantRecord.from_upstream(restaurant) for restaurant in restaurants]
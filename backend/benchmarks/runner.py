@@ -0,0 +1,222 @@
+"""Benchmark registry, timing loop and result comparison"""
+
+import asyncio
+import inspect
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Metrics of a result that can be compared between runs (lower is better)
+METRICS = ("min_ns", "median_ns", "mean_ns", "p95_ns")
+
+
+@dataclass
+class Benchmark:
+    """
+    A named operation to time
+    
+    ``func`` takes the value returned by ``setup`` (called before every
+    operation and excluded from the timing) or nothing if there is no
+    setup. It may be a coroutine function.
+    """
+    name: str
+    func: Callable
+    setup: Optional[Callable[[], Any]] = None
+    description: str = ""
+    
+    @property
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(self.func)
+
+
+REGISTRY: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, setup: Optional[Callable[[], Any]] = None):
+    """Register a function as a benchmark"""
+    def decorator(func: Callable) -> Callable:
+        REGISTRY[name] = Benchmark(
+            name=name,
+            func=func,
+            setup=setup,
+            description=(func.__doc__ or "").strip().split("\n")[0]
+        )
+        return func
+    return decorator
+
+
+async def _time_batch(bench: Benchmark, iterations: int) -> int:
+    """Total nanoseconds spent in ``iterations`` operations"""
+    total = 0
+    func, setup = bench.func, bench.setup
+    for _ in range(iterations):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter_ns()
+        if bench.is_async:
+            await func(*args)
+        else:
+            func(*args)
+        total += time.perf_counter_ns() - start
+    return total
+
+
+async def _calibrate(bench: Benchmark, min_round_ns: int) -> int:
+    """Smallest power of two of operations taking at least min_round_ns"""
+    iterations = 1
+    while iterations < 1 << 20:
+        if await _time_batch(bench, iterations) >= min_round_ns:
+            return iterations
+        iterations *= 2
+    return iterations
+
+
+async def run_benchmark(
+    bench: Benchmark,
+    rounds: int = 7,
+    min_round_time: float = 0.05
+) -> Dict[str, Any]:
+    """
+    Time a benchmark
+    
+    Each round runs enough operations to last ``min_round_time`` seconds;
+    statistics are over the per-operation time of each round.
+    
+    Args:
+        bench: Benchmark to run
+        rounds: Number of timed rounds (after a warm-up call and round)
+        min_round_time: Minimum duration of a round in seconds
+        
+    Returns:
+        Result dictionary with per-operation times in nanoseconds
+    """
+    # One untimed call first, so one-time costs (lazy imports, cold caches)
+    # don't make calibration settle on a single operation per round
+    await _time_batch(bench, 1)
+    iterations = await _calibrate(bench, int(min_round_time * 1e9))
+    await _time_batch(bench, iterations)
+    
+    per_op = []
+    for _ in range(rounds):
+        per_op.append(await _time_batch(bench, iterations) / iterations)
+    per_op.sort()
+    
+    return {
+        "description": bench.description,
+        "rounds": rounds,
+        "iterations": iterations,
+        "min_ns": per_op[0],
+        "median_ns": statistics.median(per_op),
+        "mean_ns": statistics.fmean(per_op),
+        "p95_ns": per_op[min(len(per_op) - 1, round(0.95 * (len(per_op) - 1)))],
+        "stdev_ns": statistics.stdev(per_op) if len(per_op) > 1 else 0.0,
+        "ops_per_sec": 1e9 / per_op[len(per_op) // 2] if per_op[len(per_op) // 2] else 0.0
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def report_meta(rounds: int) -> Dict[str, Any]:
+    """Run metadata stored with a report"""
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "rounds": rounds
+    }
+
+
+def run_all(
+    names: Optional[List[str]] = None,
+    rounds: int = 7,
+    min_round_time: float = 0.05,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run registered benchmarks in one event loop
+    
+    Args:
+        names: Benchmarks to run (default all)
+        rounds: Timed rounds per benchmark
+        min_round_time: Minimum duration of a round in seconds
+        progress: Optional callback called with each name and result
+        
+    Returns:
+        Report with run metadata and results keyed by benchmark name
+    """
+    async def run() -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for name in names or sorted(REGISTRY):
+            results[name] = await run_benchmark(REGISTRY[name], rounds, min_round_time)
+            if progress:
+                progress(name, results[name])
+        return results
+    
+    return {"meta": report_meta(rounds), "results": asyncio.run(run())}
+
+
+def save_report(report: Dict[str, Any], path: str):
+    """Write a report as JSON"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """Read a report written by save_report"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    metric: str = "median_ns",
+    threshold: float = 0.10
+) -> List[Dict[str, Any]]:
+    """
+    Compare a metric of every benchmark present in both reports
+    
+    Args:
+        baseline: Earlier report
+        current: Later report
+        metric: One of METRICS
+        threshold: Relative slowdown (0.10 = 10%) counted as a regression
+        
+    Returns:
+        One row per benchmark with baseline, current, relative change and
+        a ``regressed`` flag
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric}; expected one of {', '.join(METRICS)}")
+    
+    rows = []
+    for name, result in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = (result[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+        rows.append({
+            "name": name,
+            "baseline": base[metric],
+            "current": result[metric],
+            "change": change,
+            "regressed": change > threshold
+        })
+    return rows
@@ -0,0 +1,132 @@
+"""Cold-start benchmarks: importing the app and time to a live worker"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Run in a fresh interpreter per round so every import is cold
+_CHILD = """
+import asyncio, json, logging, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+logging.disable(logging.CRITICAL)
+
+async def live():
+    import httpx
+    async with app.main.app.router.lifespan_context(app.main.app):
+        transport = httpx.ASGITransport(app=app.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            response = await client.get("/api/v1/liveness")
+            response.raise_for_status()
+            return time.perf_counter()
+            
+alive = asyncio.run(live()) if {liveness} else imported
+print(json.dumps({{"import": imported - started, "liveness": alive - started}}))
+"""
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # Startup must not depend on network upstreams or API keys
+    env.setdefault("UPSTREAM_MODE", "synthetic")
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    return env
+
+
+def _run_child(liveness: bool) -> Dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(liveness=liveness)],
+        cwd=BACKEND_DIR, env=_child_env(), capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _result(description: str, seconds: List[float]) -> Dict[str, Any]:
+    per_op = sorted(value * 1e9 for value in seconds)
+    median = statistics.median(per_op)
+    return {
+        "description": description,
+        "rounds": len(per_op),
+        "iterations": 1,
+        "min_ns": per_op[0],
+        "median_ns": median,
+        "mean_ns": statistics.fmean(per_op),
+        "p95_ns": per_op[min(len(per_op) - 1, round(0.95 * (len(per_op) - 1)))],
+        "stdev_ns": statistics.stdev(per_op) if len(per_op) > 1 else 0.0,
+        "ops_per_sec": 1e9 / median if median else 0.0
+    }
+
+
+def run_startup(
+    rounds: int = 5,
+    liveness: bool = True,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Time cold starts in fresh interpreters
+    
+    One warm-up round (which also writes bytecode caches) is discarded.
+    
+    Args:
+        rounds: Timed interpreter starts
+        liveness: Also run the lifespan startup and a /liveness request
+        progress: Optional callback called with each name and result
+        
+    Returns:
+        Results keyed by benchmark name, in the format of run_benchmark
+    """
+    _run_child(liveness)
+    samples = [_run_child(liveness) for _ in range(rounds)]
+    
+    results = {
+        "startup.import_app": _result("Import app.main", [sample["import"] for sample in samples])
+    }
+    if liveness:
+        results["startup.liveness"] = _result(
+            "Import, lifespan startup and first /liveness response",
+            [sample["liveness"] for sample in samples]
+        )
+    if progress:
+        for name, result in results.items():
+            progress(name, result)
+    return results
+
+
+def heaviest_imports(top: int = 15, module: str = "app.main") -> List[Dict[str, Any]]:
+    """
+    Modules with the largest cumulative import time (python -X importtime)
+    
+    Args:
+        top: Number of modules
+        module: Module to import
+        
+    Returns:
+        Modules with self and cumulative microseconds, slowest first
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=_child_env(), capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            modules.append({
+                "module": match.group(4),
+                "depth": (len(match.group(3)) - 1) // 2,
+                "self_us": int(match.group(1)),
+                "cumulative_us": int(match.group(2))
+            })
+    # The module and its direct imports, so nested modules aren't counted twice
+    top_level = [entry for entry in modules if entry["depth"] <= 1]
+    return sorted(top_level, key=lambda entry: entry["cumulative_us"], reverse=True)[:top]
@@ -0,0 +1,192 @@
+"""Benchmarks of the request path's CPU-bound components"""
+
+import copy
+import itertools
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.cache import CacheManager, cache_manager, cached
+from app.core.responses import FastJSONResponse
+from app.core.vector_store import VectorStore
+from app.schemas.chat_schemas import ChatResponse
+from app.services.llm_service import llm_service
+from app.services.rag_service import rag_service
+from benchmarks import payloads
+from benchmarks.runner import benchmark
+
+
+class MemoryRedis:
+    """
+    In-memory stand-in for the redis.asyncio client
+    
+    Only get/setex are needed; it keeps network latency out of the cache
+    benchmarks so they measure key building and (de)serialization. The
+    oldest entries are dropped past ``max_entries`` so miss benchmarks
+    don't grow without bound.
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        self.store: Dict[str, str] = {}
+        self.max_entries = max_entries
+    
+    async def get(self, key: str) -> Optional[str]:
+        return self.store.get(key)
+    
+    async def setex(self, key: str, ttl: int, value: str):
+        self.store[key] = value
+        if len(self.store) > self.max_entries:
+            del self.store[next(iter(self.store))]
+
+
+def _connect(manager: CacheManager) -> CacheManager:
+    manager.redis_client = MemoryRedis()
+    manager._connected = True
+    return manager
+
+
+# ===== RAG =====
+
+# Sources hand the pipeline restaurant records
+_YELP = payloads.records(payloads.businesses(20, seed=1))
+_VECTOR = payloads.records(payloads.with_reviews(payloads.businesses(20, seed=1, start=10), seed=2))
+_LEXICAL = payloads.records(payloads.businesses(20, seed=1, start=5))
+_GOOGLE = payloads.records(payloads.google_places(payloads.businesses(20, seed=1), seed=3))
+_QUERIES = itertools.cycle(payloads.QUERIES)
+_UNIQUE_QUERIES = (f"{query} #{n}" for n, query in enumerate(itertools.cycle(payloads.QUERIES)))
+
+
+def _merge_inputs() -> Tuple:
+    # Merging annotates and rewrites records, so every run gets fresh copies
+    return copy.deepcopy((_YELP, _VECTOR, _LEXICAL, _GOOGLE))
+
+
+@benchmark("rag.merge_results", setup=_merge_inputs)
+def merge_results(inputs: Tuple):
+    """Resolve and fuse 4 sources x 20 candidates"""
+    rag_service._merge_results(*inputs)
+
+
+@benchmark("rag.extract_search_params")
+def extract_search_params():
+    """Extract search parameters (parser cache warm)"""
+    rag_service._extract_search_params(next(_QUERIES), {"dietary": "vegetarian"})
+
+
+@benchmark("rag.extract_search_params_cold", setup=lambda: next(_UNIQUE_QUERIES))
+def extract_search_params_cold(query: str):
+    """Extract search parameters from never-seen queries"""
+    rag_service._extract_search_params(query, {})
+
+
+# ===== LLM =====
+
+_CONTEXT_RESTAURANTS = payloads.records(
+    payloads.with_reviews(payloads.businesses(10, seed=4), seed=5)
+)
+
+
+@benchmark("llm.build_restaurant_context")
+def build_restaurant_context():
+    """Format 10 restaurants with reviews into the LLM context"""
+    llm_service.build_restaurant_context(_CONTEXT_RESTAURANTS, payloads.QUERIES[0])
+
+
+# ===== API responses =====
+
+_RAW_SEARCH = payloads.with_reviews(payloads.businesses(20, seed=7), seed=8)
+
+
+def _chat_result() -> Dict[str, Any]:
+    restaurants = payloads.records(_RAW_SEARCH[:10])
+    return {
+        "message": "Here are a few places you might like. " * 20,
+        "session_id": "5f0c6f4e-1d2b-4c1e-9a55-3c2f1e0d9b7a",
+        "restaurants": [restaurant.to_response() for restaurant in restaurants],
+        "suggestions": ["Show me vegetarian options", "What about cheaper places?"],
+        "metadata": {"total_restaurants_found": 42, "location": {"address": "San Francisco, CA"}}
+    }
+
+
+_CHAT_RESULT = _chat_result()
+
+
+@benchmark("api.project_restaurants")
+def project_restaurants():
+    """Project 20 Yelp businesses with 3 reviews each onto records"""
+    payloads.records(_RAW_SEARCH)
+
+
+@benchmark("api.chat_response")
+def chat_response():
+    """Render a 10-restaurant chat response with orjson, unvalidated"""
+    FastJSONResponse(_CHAT_RESULT)
+
+
+@benchmark("api.chat_response_validated")
+def chat_response_validated():
+    """Validate and render the same response the default FastAPI way"""
+    JSONResponse(jsonable_encoder(ChatResponse(**_CHAT_RESULT)))
+
+
+# ===== Cache =====
+
+_SEARCH_RESPONSE = payloads.search_response(20, seed=6)
+_cache = _connect(CacheManager())
+_counter = itertools.count()
+
+
+@cached(ttl=60, key_prefix="bench:")
+async def _cached_search(location: str, term: str, limit: int = 20) -> Dict[str, Any]:
+    return _SEARCH_RESPONSE
+
+
+@benchmark("cache.cached_hit")
+async def cached_hit():
+    """@cached call served from the cache (20-business payload)"""
+    await _cached_search("San Francisco, CA", "pizza")
+
+
+@benchmark("cache.cached_miss", setup=lambda: next(_counter))
+async def cached_miss(n: int):
+    """@cached call that misses and stores (20-business payload)"""
+    await _cached_search("San Francisco, CA", f"pizza {n}")
+
+
+@benchmark("cache.set")
+async def cache_set():
+    """CacheManager.set of a 20-business search response"""
+    await _cache.set("bench:set", _SEARCH_RESPONSE, ttl=60)
+
+
+@benchmark("cache.get")
+async def cache_get():
+    """CacheManager.get of a 20-business search response"""
+    await _cache.get("bench:get")
+
+
+# ===== Vector store =====
+
+_FILTERS = {
+    "type": "restaurant",
+    "price": ["$", "$$"],
+    "rating": {"gte": 4.0},
+    "categories": ["Italian", "Pizza", "Wine Bars"],
+    "location.city": "San Francisco"
+}
+
+
+@benchmark("vector_store.build_filter")
+def build_filter():
+    """Build a Qdrant filter with match, match-any and range conditions"""
+    VectorStore._build_filter(_FILTERS)
+
+
+def prepare():
+    """Connect the cache benchmarks to in-memory storage and warm caches"""
+    _connect(cache_manager)
+    # Pay the deferred qdrant_client import outside the filter benchmark
+    VectorStore._build_filter(_FILTERS)
+    _cache.redis_client.store["bench:get"] = json.dumps(_SEARCH_RESPONSE)
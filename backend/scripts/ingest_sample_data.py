@@ -2,21 +2,28 @@
 Script to ingest sample restaurant data into vector database
 """
 
+import argparse
 import asyncio
 import sys
 from pathlib import Path
+from typing import List, Tuple
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.config import settings
 from app.core.vector_store import vector_store
-from app.core.embeddings import embedding_service
 from app.mcp_server.client import mcp_client
+from app.services.ingestion_service import ingestion_service
 
 
-async def ingest_data():
-    """Ingest sample restaurant data"""
+async def ingest_data(full: bool = False):
+    """
+    Ingest sample restaurant data
+    
+    Args:
+        full: Re-embed every restaurant instead of only new or changed ones
+    """
     print("Ingesting sample restaurant data...")
     
     try:
@@ -33,77 +40,75 @@ async def ingest_data():
             "Austin, TX"
         ]
         
-        all_restaurants = []
-        
-        for location in locations:
-            print(f"\nFetching restaurants from {location}...")
-            
+        async def fetch_location(location: str) -> Tuple[List[dict], bool]:
+            """Stream every result page of one location (pages run concurrently)"""
+            businesses = []
             try:
-                result = await mcp_client.search_restaurants(
+                async for business in mcp_client.iter_restaurants(
                     location=location,
-                    limit=50,
-                    categories="restaurants"
-                )
-                
-                businesses = result.get("businesses", [])
-                print(f"  Found {len(businesses)} restaurants")
-                all_restaurants.extend(businesses)
-                
+                    categories="restaurants",
+                    max_results=settings.ingest_max_per_location
+                ):
+                    businesses.append(business)
             except Exception as e:
                 print(f"  Error fetching from {location}: {e}")
-                continue
+                return businesses, False
+            
+            print(f"  Found {len(businesses)} restaurants in {location}")
+            return businesses, bool(businesses)
+        
+        print(f"\nFetching restaurants from {len(locations)} locations...")
+        results = await asyncio.gather(*(fetch_location(location) for location in locations))
+        
+        all_restaurants = []
+        seen = set()
+        for businesses, _ in results:
+            for business in businesses:
+                if business["id"] not in seen:
+                    seen.add(business["id"])
+                    all_restaurants.append(business)
+        complete = all(ok for _, ok in results)
         
         if not all_restaurants:
             print("No restaurants fetched. Exiting.")
             return
         
-        print(f"\nTotal restaurants to ingest: {len(all_restaurants)}")
+        print(f"\nTotal restaurants fetched: {len(all_restaurants)}")
         
-        # Prepare data for vector DB
-        ids = []
-        texts = []
-        metadata = []
+        # Only new or changed restaurants are embedded. Deletions are skipped
+        # when a location failed, so an upstream error can't wipe a city.
+        stats = await ingestion_service.ingest(
+            all_restaurants,
+            full=full,
+            prune=complete
+        )
         
-        for restaurant in all_restaurants:
-            restaurant_id = restaurant.get("id")
-            if not restaurant_id:
-                continue
-            
-            # Prepare text for embedding
-            text = embedding_service.prepare_restaurant_text(restaurant)
-            
-            ids.append(restaurant_id)
-            texts.append(text)
-            metadata.append({
-                "id": restaurant_id,
-                "name": restaurant.get("name"),
-                "rating": restaurant.get("rating"),
-                "review_count": restaurant.get("review_count"),
-                "price": restaurant.get("price"),
-                "categories": [cat.get("title") for cat in restaurant.get("categories", [])],
-                "location": restaurant.get("location", {}),
-                "source": "yelp"
-            })
-        
-        print(f"\nGenerating embeddings for {len(texts)} restaurants...")
-        embeddings = await embedding_service.generate_embeddings(texts)
-        
-        print("Storing in vector database...")
-        success = await mcp_client.store_embeddings(ids, embeddings, metadata)
-        
-        if success:
-            print("✅ Data ingestion completed successfully!")
-            
-            # Get stats
-            stats = await vector_store.get_collection_stats()
-            print(f"\nVector DB Stats:")
-            print(f"  - Total vectors: {stats.get('vectors_count', 0)}")
-            print(f"  - Total points: {stats.get('points_count', 0)}")
+        # Failed batches stay out of the manifest and are retried next run
+        failed = stats["failed"] + stats["reviews_failed"]
+        if failed:
+            print("⚠️ Data ingestion completed with failures")
         else:
-            print("❌ Failed to store embeddings")
+            print("✅ Data ingestion completed successfully!")
+        print(f"  - Embedded: {stats['embedded']}")
+        print(f"  - Payload updates: {stats['patched']}")
+        print(f"  - Deleted: {stats['deleted']}")
+        print(f"  - Unchanged: {stats['unchanged']}")
+        print(f"  - Failed: {stats['failed']}")
+        print(f"  - Reviews embedded: {stats['reviews_embedded']}")
+        print(f"  - Reviews deleted: {stats['reviews_deleted']}")
+        print(f"  - Reviews failed: {stats['reviews_failed']}")
+        
+        # Get stats
+        stats = await vector_store.get_collection_stats()
+        print(f"\nVector DB Stats:")
+        print(f"  - Total vectors: {stats.get('vectors_count', 0)}")
+        print(f"  - Total points: {stats.get('points_count', 0)}")
         
         await mcp_client.close()
         
+        if failed:
+            sys.exit(1)
+        
     except Exception as e:
         print(f"❌ Error during ingestion: {e}")
         import traceback
@@ -112,5 +117,13 @@ async def ingest_data():
 
 
 if __name__ == "__main__":
-    asyncio.run(ingest_data())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the ingestion manifest and re-embed every restaurant"
+    )
+    args = parser.parse_args()
+    
+    asyncio.run(ingest_data(full=args.full))
 
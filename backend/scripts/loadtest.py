@@ -0,0 +1,557 @@
+"""
+Open-loop load generator for the chat and restaurant search APIs
+
+Requests arrive as a Poisson process at the target rate regardless of how
+quickly earlier requests complete, and latency is measured from each
+request's scheduled arrival. Queueing delay therefore shows up in the
+percentiles instead of silently lowering the offered load, as it does
+with closed-loop tools.
+
+Usage:
+    # In-process (ASGI) against offline upstreams
+    UPSTREAM_MODE=synthetic python scripts/loadtest.py --rps 5 --duration 60
+    
+    # One uvicorn worker over HTTP, stepping the rate to find saturation
+    python scripts/loadtest.py --url http://localhost:8000 --rps 2,4,8,16 \\
+        --duration 60 --output loadtest.json
+        
+In-process runs share the event loop with the app, so they are convenient
+for offline comparisons; saturation of a worker is best measured over HTTP.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.timing import parse_server_timing
+
+PERCENTILES = (50, 95, 99, 99.9)
+
+DEFAULT_QUERIES = [
+    "Find me the best Italian restaurants",
+    "cheap vegan food near me",
+    "romantic french dinner with a view",
+    "top rated sushi open late",
+    "family friendly mexican place with outdoor seating",
+    "gluten free pizza under $$",
+    "nearest ramen spot",
+    "spicy thai curry, at least 4.5 stars",
+    "fine dining tasting menu for an anniversary",
+    "quick burgers and fries",
+    "korean bbq for a group of 8",
+    "halal indian buffet"
+]
+
+DEFAULT_FOLLOW_UPS = [
+    "Tell me more about the first restaurant",
+    "Any vegetarian-friendly options?",
+    "Show me something cheaper",
+    "Which of these has outdoor seating?",
+    "What about places that are open late?",
+    "Is there anything closer?"
+]
+
+DEFAULT_LOCATIONS = [
+    "San Francisco, CA",
+    "New York, NY",
+    "Los Angeles, CA",
+    "Chicago, IL",
+    "Austin, TX"
+]
+
+
+@dataclass
+class Sample:
+    """Outcome of one request"""
+    kind: str
+    scheduled: float  # seconds since the start of the level
+    latency_ms: float  # from scheduled arrival to completion
+    start_lag_ms: float  # from scheduled arrival to the request being sent
+    status: Optional[int] = None
+    error: Optional[str] = None
+    stages: Dict[str, float] = field(default_factory=dict)
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and self.status < 400
+
+
+class Workload:
+    """
+    Picks the next request: a first chat turn, a follow-up or a search
+    
+    Follow-ups continue conversations whose previous turn has completed, so
+    a session is never used by two requests at once. When no conversation
+    is idle a follow-up becomes a first turn.
+    """
+    
+    def __init__(
+        self,
+        queries: List[Dict[str, Any]],
+        follow_ups: List[str],
+        follow_up_ratio: float,
+        search_ratio: float,
+        max_turns: int,
+        rng: random.Random
+    ):
+        self.queries = queries
+        self.follow_ups = follow_ups
+        self.follow_up_ratio = follow_up_ratio
+        self.search_ratio = search_ratio
+        self.max_turns = max_turns
+        self.rng = rng
+        self.idle_sessions: List[Dict[str, Any]] = []
+    
+    def next_request(self) -> Dict[str, Any]:
+        """Kind, path, JSON body and session of the next request"""
+        roll = self.rng.random()
+        
+        if roll < self.search_ratio:
+            query = self.rng.choice(self.queries)
+            return {
+                "kind": "search",
+                "path": "/api/v1/restaurants/search",
+                "body": {"query": query["query"], "location": query["location"]}
+            }
+        
+        if roll < self.search_ratio + self.follow_up_ratio and self.idle_sessions:
+            session = self.idle_sessions.pop(self.rng.randrange(len(self.idle_sessions)))
+            return {
+                "kind": "chat_follow_up",
+                "path": "/api/v1/chat",
+                "body": {
+                    "message": self.rng.choice(self.follow_ups),
+                    "session_id": session["session_id"],
+                    "location": {"address": session["location"]}
+                },
+                "session": session
+            }
+        
+        query = self.rng.choice(self.queries)
+        return {
+            "kind": "chat_first_turn",
+            "path": "/api/v1/chat",
+            "body": {"message": query["query"], "location": {"address": query["location"]}},
+            "session": {"location": query["location"], "turns": 0}
+        }
+    
+    def completed(self, request: Dict[str, Any], response: Optional[httpx.Response]):
+        """Make a chat conversation available for a follow-up"""
+        session = request.get("session")
+        if session is None or response is None or response.status_code >= 400:
+            return
+        try:
+            session["session_id"] = response.json()["session_id"]
+        except (ValueError, KeyError):
+            return
+        session["turns"] += 1
+        if session["turns"] < self.max_turns:
+            self.idle_sessions.append(session)
+
+
+def load_queries(path: Optional[str], locations: List[str]) -> List[Dict[str, Any]]:
+    """
+    Query corpus as dictionaries with ``query`` and ``location``
+    
+    Args:
+        path: Text file with one query per line, or JSON lines with a
+            ``query`` and optional ``location``; built-in queries if None
+        locations: Locations assigned to queries that don't name one
+        
+    Returns:
+        List of queries
+    """
+    if path is None:
+        lines: List[Any] = DEFAULT_QUERIES
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+    
+    queries = []
+    for n, line in enumerate(lines):
+        entry = json.loads(line) if line.startswith("{") else {"query": line}
+        entry.setdefault("location", locations[n % len(locations)])
+        queries.append(entry)
+    return queries
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    scheduled_at: float,
+    level_start: float
+) -> Sample:
+    request = workload.next_request()
+    sent_at = time.perf_counter()
+    response = None
+    error = None
+    try:
+        response = await client.post(request["path"], json=request["body"])
+    except httpx.TimeoutException:
+        error = "timeout"
+    except httpx.HTTPError as e:
+        error = type(e).__name__
+    finished_at = time.perf_counter()
+    
+    workload.completed(request, response)
+    return Sample(
+        kind=request["kind"],
+        scheduled=scheduled_at - level_start,
+        latency_ms=(finished_at - scheduled_at) * 1000.0,
+        start_lag_ms=(sent_at - scheduled_at) * 1000.0,
+        status=response.status_code if response is not None else None,
+        error=error,
+        stages=(
+            parse_server_timing(response.headers.get("server-timing", ""))
+            if response is not None else {}
+        )
+    )
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    rps: float,
+    duration: float,
+    warmup: float,
+    max_in_flight: int,
+    rng: random.Random
+) -> List[Sample]:
+    """
+    Offer Poisson arrivals at ``rps`` for ``warmup + duration`` seconds
+    
+    Arrivals are never delayed by outstanding requests. Past
+    ``max_in_flight`` outstanding requests an arrival is recorded as a
+    ``client_overload`` error instead, so a stalled server can't exhaust
+    the generator.
+    
+    Args:
+        client: HTTP client bound to the app
+        workload: Request mix
+        rps: Mean arrival rate
+        duration: Measured seconds
+        warmup: Seconds before measurement starts (results discarded)
+        max_in_flight: Outstanding request limit
+        rng: Random source for inter-arrival times
+        
+    Returns:
+        Samples of requests scheduled after the warm-up
+    """
+    tasks: List[asyncio.Task] = []
+    overloaded: List[Sample] = []
+    in_flight = 0
+    
+    async def tracked(scheduled_at: float) -> Sample:
+        nonlocal in_flight
+        in_flight += 1
+        try:
+            return await _send(client, workload, scheduled_at, level_start)
+        finally:
+            in_flight -= 1
+    
+    level_start = time.perf_counter()
+    offset = rng.expovariate(rps)
+    while offset < warmup + duration:
+        scheduled_at = level_start + offset
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
+        if in_flight >= max_in_flight:
+            overloaded.append(Sample(
+                kind="overload",
+                scheduled=offset,
+                latency_ms=0.0,
+                start_lag_ms=0.0,
+                error="client_overload"
+            ))
+        else:
+            tasks.append(asyncio.create_task(tracked(scheduled_at)))
+        offset += rng.expovariate(rps)
+    
+    samples = list(await asyncio.gather(*tasks)) + overloaded
+    return [sample for sample in samples if sample.scheduled >= warmup]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted values (0.0 if empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    summary = {"mean": statistics.fmean(values) if values else 0.0}
+    for pct in PERCENTILES:
+        summary[f"p{pct:g}"] = percentile(values, pct)
+    summary["max"] = max(values) if values else 0.0
+    return summary
+
+
+def summarize(samples: List[Sample], duration: float) -> Dict[str, Any]:
+    """
+    Throughput, latency percentiles, errors and stage durations
+    
+    Args:
+        samples: Samples of one request kind (or all of them)
+        duration: Measured seconds
+        
+    Returns:
+        Summary dictionary (latencies in milliseconds)
+    """
+    ok = [sample for sample in samples if sample.ok]
+    errors: Dict[str, int] = {}
+    for sample in samples:
+        if not sample.ok:
+            reason = sample.error or f"http_{sample.status}"
+            errors[reason] = errors.get(reason, 0) + 1
+    
+    stage_values: Dict[str, List[float]] = {}
+    for sample in ok:
+        for name, value in sample.stages.items():
+            stage_values.setdefault(name, []).append(value)
+    
+    return {
+        "requests": len(samples),
+        "throughput_rps": len(samples) / duration if duration else 0.0,
+        "success_rps": len(ok) / duration if duration else 0.0,
+        "error_rate": (len(samples) - len(ok)) / len(samples) if samples else 0.0,
+        "errors": errors,
+        "latency_ms": _distribution([sample.latency_ms for sample in ok]),
+        "start_lag_ms": _distribution(
+            [sample.start_lag_ms for sample in samples if sample.status is not None]
+        ),
+        "stages_ms": {
+            name: {
+                "mean": statistics.fmean(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99)
+            }
+            for name, values in sorted(stage_values.items())
+        }
+    }
+
+
+def is_saturated(
+    summary: Dict[str, Any],
+    offered_rps: float,
+    max_error_rate: float,
+    slo_p99_ms: Optional[float]
+) -> bool:
+    """Whether a level failed to keep up with the offered load"""
+    if summary["success_rps"] < 0.9 * offered_rps:
+        return True
+    if summary["error_rate"] > max_error_rate:
+        return True
+    return slo_p99_ms is not None and summary["latency_ms"]["p99"] > slo_p99_ms
+
+
+def _print_level(rps: float, result: Dict[str, Any]):
+    print(f"\n=== {rps:g} req/s offered{' (SATURATED)' if result['saturated'] else ''} ===")
+    header = f"{'kind':<18}{'reqs':>7}{'ok/s':>8}{'err%':>7}" + "".join(
+        f"{f'p{pct:g}':>10}" for pct in PERCENTILES
+    )
+    print(header)
+    for kind, summary in [("all", result["overall"])] + sorted(result["by_kind"].items()):
+        latency = summary["latency_ms"]
+        print(
+            f"{kind:<18}{summary['requests']:>7}{summary['success_rps']:>8.2f}"
+            f"{summary['error_rate'] * 100:>6.1f}%"
+            + "".join(f"{latency[f'p{pct:g}']:>8.0f}ms" for pct in PERCENTILES)
+        )
+    
+    errors = result["overall"]["errors"]
+    if errors:
+        counts = (f"{reason} x{count}" for reason, count in sorted(errors.items()))
+        print("errors: " + ", ".join(counts))
+    
+    stages = result["overall"]["stages_ms"]
+    if stages:
+        print("stages (p50 / p95 ms): " + ", ".join(
+            f"{name} {values['p50']:.0f}/{values['p95']:.0f}" for name, values in stages.items()
+        ))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every load level and build the report"""
+    rng = random.Random(args.seed)
+    queries = load_queries(args.queries, DEFAULT_LOCATIONS)
+    workload = Workload(
+        queries=queries,
+        follow_ups=DEFAULT_FOLLOW_UPS,
+        follow_up_ratio=args.follow_up_ratio,
+        search_ratio=args.search_ratio,
+        max_turns=args.max_turns,
+        rng=rng
+    )
+    timeout = httpx.Timeout(args.timeout)
+    
+    async def run_levels(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
+        levels = []
+        for rps in args.rps:
+            samples = await run_level(
+                client, workload, rps, args.duration, args.warmup, args.max_in_flight, rng
+            )
+            by_kind: Dict[str, List[Sample]] = {}
+            for sample in samples:
+                by_kind.setdefault(sample.kind, []).append(sample)
+            
+            overall = summarize(samples, args.duration)
+            result = {
+                "offered_rps": rps,
+                "overall": overall,
+                "by_kind": {
+                    kind: summarize(group, args.duration) for kind, group in by_kind.items()
+                },
+                "saturated": is_saturated(overall, rps, args.max_error_rate, args.slo_p99)
+            }
+            levels.append(result)
+            _print_level(rps, result)
+            
+            if result["saturated"] and args.stop_on_saturation:
+                break
+        return levels
+    
+    if args.url:
+        limits = httpx.Limits(
+            max_connections=args.max_in_flight,
+            max_keepalive_connections=args.max_in_flight
+        )
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits) as client:
+            levels = await run_levels(client)
+        target = args.url
+        upstream_mode = None
+    else:
+        from app.config import settings
+        from app.main import app
+        logging.getLogger().setLevel(args.log_level.upper())
+        
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://loadtest", timeout=timeout
+            ) as client:
+                levels = await run_levels(client)
+        target = "in-process"
+        upstream_mode = settings.upstream_mode
+    
+    sustained = [level["offered_rps"] for level in levels if not level["saturated"]]
+    saturated = [level["offered_rps"] for level in levels if level["saturated"]]
+    
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": target,
+            "upstream_mode": upstream_mode,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "mix": {
+                "search": args.search_ratio,
+                "chat_follow_up": args.follow_up_ratio,
+                "chat_first_turn": max(0.0, 1.0 - args.search_ratio - args.follow_up_ratio)
+            },
+            "seed": args.seed
+        },
+        "levels": levels,
+        "max_sustained_rps": max(sustained) if sustained else None,
+        "saturation_rps": min(saturated) if saturated else None
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--url", help="Base URL of a running server (default: drive the app in-process)"
+    )
+    parser.add_argument(
+        "--rps", type=lambda value: [float(rate) for rate in value.split(",")], default=[2.0],
+        help="Arrival rate, or comma-separated rates run in order (e.g. 2,4,8,16)"
+    )
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per level")
+    parser.add_argument(
+        "--warmup", type=float, default=5.0, help="Unmeasured seconds before each level"
+    )
+    parser.add_argument("--search-ratio", type=float, default=0.2, help="Share of search requests")
+    parser.add_argument(
+        "--follow-up-ratio", type=float, default=0.3, help="Share of chat follow-ups"
+    )
+    parser.add_argument("--max-turns", type=int, default=4, help="Chat turns per conversation")
+    parser.add_argument(
+        "--queries", help="Query corpus: text lines or JSON lines with query/location"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="Per-request timeout in seconds"
+    )
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Outstanding request limit")
+    parser.add_argument(
+        "--slo-p99", type=float, help="p99 latency (ms) above which a level is saturated"
+    )
+    parser.add_argument(
+        "--max-error-rate", type=float, default=0.01,
+        help="Error rate above which a level is saturated (default 0.01)"
+    )
+    parser.add_argument(
+        "--stop-on-saturation", action="store_true",
+        help="Skip levels after the first saturated one"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed for arrivals and the request mix"
+    )
+    parser.add_argument("--output", "-o", help="Write the JSON report to this file")
+    parser.add_argument("--log-level", default="WARNING", help="App log level for in-process runs")
+    args = parser.parse_args()
+    
+    if args.search_ratio + args.follow_up_ratio > 1.0:
+        parser.error("--search-ratio and --follow-up-ratio must add up to at most 1")
+    
+    report = asyncio.run(run(args))
+    
+    if report["saturation_rps"] is not None:
+        print(f"\nSaturated at {report['saturation_rps']:g} req/s", end="")
+        if report["max_sustained_rps"] is not None:
+            print(f" (sustained {report['max_sustained_rps']:g} req/s)", end="")
+        print()
+    
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Tests for the batch chat service"""
+
+import pytest
+
+from app.schemas.chat_schemas import ChatRequest
+from app.services import batch_service as batch_module
+from app.services.batch_service import BatchService
+from app.services.chat_service import chat_service
+
+
+@pytest.fixture
+def answered(monkeypatch):
+    """Answer queries without retrieval or LLM; "fail" raises"""
+    preloaded = []
+    
+    async def preload_queries(queries):
+        preloaded.append(list(queries))
+        return len(queries)
+    
+    async def process_message(message, session_id=None, location=None, preferences=None):
+        if message == "fail":
+            raise RuntimeError("upstream down")
+        session = chat_service._open_session(session_id, location, preferences)
+        return {"message": f"re: {message}", "session_id": session.session_id}
+    
+    monkeypatch.setattr(batch_module.embedding_service, "preload_queries", preload_queries)
+    monkeypatch.setattr(chat_service, "process_message", process_message)
+    monkeypatch.setattr(batch_module.settings, "batch_chunk_size", 2)
+    monkeypatch.setattr(chat_service, "sessions", {})
+    return preloaded
+
+
+async def run(queries, **kwargs):
+    requests = [ChatRequest(message=message) for message in queries]
+    return [result async for result in BatchService().run(requests, **kwargs)]
+
+
+async def test_results_are_tagged_with_their_index(answered):
+    results = await run(["a", "fail", "c"])
+    
+    assert sorted(results, key=lambda r: r["index"]) == [
+        {"index": 0, "message": "re: a"},
+        {"index": 1, "error": "Failed to process chat message"},
+        {"index": 2, "message": "re: c"}
+    ]
+    assert answered == [["a", "fail"], ["c"]]
+    assert chat_service.sessions == {}
+
+
+async def test_keep_sessions(answered):
+    results = await run(["a"], keep_sessions=True)
+    
+    assert list(chat_service.sessions) == [results[0]["session_id"]]
@@ -0,0 +1,197 @@
+"""Tests for the chat WebSocket protocol"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI, status
+from starlette.testclient import TestClient
+
+from app.api.routes import chat
+from app.services import chat_socket as socket_module
+from app.services.chat_socket import ChatSocket
+
+
+@pytest.fixture
+def turns(monkeypatch):
+    """
+    Fake chat turns: "slow" blocks after its session frame until cancelled,
+    "fail" raises, anything else streams two tokens
+    """
+    closed = []
+    
+    async def stream_message(message, session_id=None, location=None, preferences=None):
+        try:
+            yield {"type": "session", "session_id": session_id or "new"}
+            if message == "slow":
+                await asyncio.sleep(3600)
+            if message == "fail":
+                raise RuntimeError("upstream down")
+            yield {"type": "restaurants", "restaurants": []}
+            yield {"type": "token", "text": "Hello "}
+            yield {"type": "token", "text": message}
+            yield {"type": "done", "message": f"Hello {message}"}
+        finally:
+            closed.append(message)
+    
+    monkeypatch.setattr(socket_module.chat_service, "stream_message", stream_message)
+    return closed
+
+
+@pytest.fixture
+def client(turns):
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api/v1")
+    with TestClient(app) as client:
+        yield client
+
+
+def receive_turn(ws, turn_id):
+    """Frames of one turn up to its last frame"""
+    frames = []
+    while True:
+        frame = ws.receive_json()
+        if frame.get("id") == turn_id:
+            frames.append(frame)
+            if frame["type"] in ("done", "cancelled", "error"):
+                return frames
+
+
+def test_turn_streams_tagged_frames(client):
+    with client.websocket_connect("/api/v1/chat/ws") as ws:
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+        
+        ws.send_json({"type": "message", "id": "t1", "message": "world"})
+        frames = receive_turn(ws, "t1")
+    
+    assert [frame["type"] for frame in frames][:2] == ["session", "restaurants"]
+    assert frames[-1] == {"id": "t1", "type": "done", "message": "Hello world"}
+    assert "".join(f["text"] for f in frames if f["type"] == "token") == "Hello world"
+
+
+def test_cancel_closes_the_turn(client, turns):
+    with client.websocket_connect("/api/v1/chat/ws") as ws:
+        ws.send_json({"type": "message", "id": "t1", "message": "slow"})
+        assert ws.receive_json()["type"] == "session"
+        
+        ws.send_json({"type": "cancel", "id": "t1"})
+        assert ws.receive_json() == {"type": "cancelled", "id": "t1"}
+        
+        # The id is free again once the turn is gone
+        ws.send_json({"type": "message", "id": "t1", "message": "again"})
+        assert receive_turn(ws, "t1")[-1]["type"] == "done"
+    
+    assert turns == ["slow", "again"]
+
+
+def test_cancel_before_the_turn_starts(client):
+    with client.websocket_connect("/api/v1/chat/ws") as ws:
+        ws.send_json({"type": "message", "id": "t1", "message": "slow"})
+        ws.send_json({"type": "cancel", "id": "t1"})
+        
+        assert receive_turn(ws, "t1")[-1] == {"type": "cancelled", "id": "t1"}
+
+
+def test_turns_run_concurrently(client):
+    with client.websocket_connect("/api/v1/chat/ws") as ws:
+        ws.send_json({"type": "message", "id": "slow", "message": "slow"})
+        ws.send_json({"type": "message", "id": "fast", "message": "fast"})
+        
+        # The blocked turn doesn't hold up the other one
+        assert receive_turn(ws, "fast")[-1]["type"] == "done"
+        ws.send_json({"type": "cancel", "id": "slow"})
+        assert receive_turn(ws, "slow")[-1]["type"] == "cancelled"
+
+
+def test_failed_turn_reports_an_error(client):
+    with client.websocket_connect("/api/v1/chat/ws") as ws:
+        ws.send_json({"type": "message", "id": "t1", "message": "fail"})
+        
+        assert receive_turn(ws, "t1")[-1] == {
+            "type": "error", "id": "t1", "detail": "Failed to process chat message"
+        }
+
+
+def test_invalid_frames(client, monkeypatch):
+    monkeypatch.setattr(socket_module.settings, "ws_max_turns", 1)
+    with client.websocket_connect("/api/v1/chat/ws") as ws:
+        ws.send_text("not json")
+        assert ws.receive_json()["detail"] == "Frames must be JSON objects"
+        
+        ws.send_json(["message"])
+        assert ws.receive_json()["detail"] == "Frames must be JSON objects"
+        
+        ws.send_json({"type": "shout"})
+        assert ws.receive_json()["detail"] == "Unknown frame type: shout"
+        
+        ws.send_json({"type": "message", "message": "no id"})
+        assert ws.receive_json()["detail"] == "A message needs a string id"
+        
+        ws.send_json({"type": "message", "id": "t1", "message": ""})
+        frame = ws.receive_json()
+        assert frame["id"] == "t1" and frame["detail"][0]["type"] == "string_too_short"
+        
+        ws.send_json({"type": "message", "id": "t1", "message": "slow"})
+        assert ws.receive_json()["type"] == "session"
+        ws.send_json({"type": "message", "id": "t1", "message": "slow"})
+        assert ws.receive_json()["detail"] == "Turn id already in flight"
+        ws.send_json({"type": "message", "id": "t2", "message": "slow"})
+        assert ws.receive_json()["detail"] == "Too many turns in flight"
+
+
+class FakeWebSocket:
+    """Records sent frames; a client that never writes and may never read"""
+    
+    def __init__(self, reads: bool = True):
+        self.sent = []
+        self.reads = reads
+        self.close_code = None
+    
+    async def receive(self):
+        await asyncio.sleep(3600)
+    
+    async def send_text(self, text):
+        if not self.reads:
+            await asyncio.sleep(3600)
+        self.sent.append(text)
+    
+    async def close(self, code, reason=None):
+        self.close_code = code
+
+
+async def test_queued_tokens_of_a_turn_are_merged():
+    websocket = FakeWebSocket()
+    socket = ChatSocket(websocket)
+    for frame in (
+        {"type": "token", "id": "a", "text": "one "},
+        {"type": "token", "id": "a", "text": "two"},
+        {"type": "token", "id": "b", "text": "other"},
+        {"type": "token", "id": "a", "text": " three"},
+        {"type": "done", "id": "a"}
+    ):
+        socket.outbox.put_nowait(frame)
+    
+    sender = asyncio.create_task(socket._send_loop())
+    while len(websocket.sent) < 4:
+        await asyncio.sleep(0)
+    sender.cancel()
+    await asyncio.gather(sender, return_exceptions=True)
+    
+    assert websocket.sent == [
+        '{"type":"token","id":"a","text":"one two"}',
+        '{"type":"token","id":"b","text":"other"}',
+        '{"type":"token","id":"a","text":" three"}',
+        '{"type":"done","id":"a"}'
+    ]
+
+
+async def test_client_that_stops_reading_is_dropped(monkeypatch):
+    monkeypatch.setattr(socket_module.settings, "ws_send_timeout", 0.01)
+    websocket = FakeWebSocket(reads=False)
+    socket = ChatSocket(websocket)
+    socket.outbox.put_nowait({"type": "pong"})
+    
+    await asyncio.wait_for(socket.run(), timeout=5)
+    
+    assert websocket.close_code == status.WS_1008_POLICY_VIOLATION
+    assert socket.closed
@@ -0,0 +1,96 @@
+"""Tests for cross-source entity resolution"""
+
+from typing import Optional
+
+import pytest
+
+from app.core.entity_resolution import (
+    EntityResolver,
+    id_namespace,
+    name_similarity,
+    normalize_name,
+    resolve_entities,
+)
+from app.models.restaurant import RestaurantRecord
+
+# Roughly 11 m per 0.0001 degrees of latitude
+LAT, LNG = 37.7749, -122.4194
+
+
+def record(
+    record_id: str,
+    name: str,
+    north: Optional[float] = 0.0
+) -> RestaurantRecord:
+    """A record ``north`` ten-thousandths of a degree north of (LAT, LNG)"""
+    if north is None:
+        return RestaurantRecord(id=record_id, name=name)
+    return RestaurantRecord(id=record_id, name=name, latitude=LAT + north / 10000, longitude=LNG)
+
+
+@pytest.fixture
+def resolver() -> EntityResolver:
+    return EntityResolver(cell_size=0.002, max_distance=150.0, min_similarity=0.6)
+
+
+def test_normalize_name():
+    assert normalize_name("Café Joe's & Co.") == "cafe joes"
+    assert normalize_name("The Pizza Place Restaurant") == "pizza place"
+    assert normalize_name("") == ""
+
+
+def test_name_similarity_and_id_namespace():
+    assert name_similarity({"pizza", "place"}, {"pizza", "place", "mission"}) == 1.0
+    assert name_similarity({"pizza", "place"}, {"pizza", "hut"}) == 0.5
+    assert name_similarity(set(), {"pizza"}) == 0.0
+    assert id_namespace("google:abc") == "google"
+    assert id_namespace("yelp-id") == ""
+
+
+def test_match_needs_similar_names_nearby(resolver):
+    resolver.add("yelp-1", record("yelp-1", "Tony's Pizza Napoletana"))
+    
+    assert resolver.match(record("google:1", "Tonys Pizza Napoletana", north=5)) == "yelp-1"
+    assert resolver.match(record("google:2", "Tonys Pizza Napoletana", north=30)) is None
+    assert resolver.match(record("google:3", "Golden Boy Pizza", north=1)) is None
+
+
+def test_match_prefers_the_closest_entity(resolver):
+    resolver.add("far", record("far", "Blue Bottle Coffee", north=10))
+    resolver.add("near", record("near", "Blue Bottle Coffee", north=2))
+    
+    assert resolver.match(record("google:1", "Blue Bottle", north=1)) == "near"
+
+
+def test_records_without_coordinates_match_identical_names_only(resolver):
+    resolver.add("yelp-1", record("yelp-1", "Zuni Cafe"))
+    
+    assert resolver.match(record("google:1", "Zuni Café", north=None)) == "yelp-1"
+    assert resolver.match(record("google:2", "Zuni", north=None)) is None
+
+
+def test_same_namespace_is_never_merged(resolver):
+    resolver.add("yelp-1", record("yelp-1", "Zuni Cafe"))
+    
+    assert resolver.match(record("yelp-2", "Zuni Cafe", north=1)) is None
+
+
+def test_resolve_entities_rewrites_ids_onto_earlier_sources():
+    yelp = [record("yelp-1", "Nopa"), record("yelp-2", "Nopalito", north=100)]
+    google = [record("google:1", "NOPA", north=3), record("google:2", "Nopa", north=500)]
+    vector = [record("yelp-1", "Nopa")]
+    
+    resolved = resolve_entities({"yelp": yelp, "google": google, "vector": vector})
+    
+    assert [r.id for r in resolved["google"]] == ["yelp-1", "google:2"]
+    assert resolved["google"][0].source_id == "google:1"
+    assert resolved["vector"][0].id == "yelp-1" and resolved["vector"][0].source_id is None
+
+
+def test_records_of_one_source_never_resolve_onto_each_other():
+    # Different namespaces, so only registering per source keeps them apart
+    lexical = [record("yelp-1", "Nopa"), record("google:1", "Nopa", north=1)]
+    
+    resolved = resolve_entities({"lexical": lexical})
+    
+    assert [r.id for r in resolved["lexical"]] == ["yelp-1", "google:1"]
@@ -0,0 +1,72 @@
+"""Tests for reciprocal rank fusion and reranking of fused candidates"""
+
+from app.core.fusion import reciprocal_rank_fusion
+from app.core.reranker import FEATURES, Reranker
+from app.models.restaurant import RestaurantRecord
+
+
+def record(business_id: str, **fields) -> RestaurantRecord:
+    return RestaurantRecord(id=business_id, name=business_id.title(), **fields)
+
+
+def test_fusion_scores_by_rank_across_sources():
+    fused = reciprocal_rank_fusion(
+        {
+            "yelp": [record("a"), record("b")],
+            "vector": [record("b"), record("c")]
+        },
+        k=60
+    )
+    
+    assert [r.id for r in fused] == ["b", "a", "c"]
+    assert fused[0].retrieval_score == 1 / 62 + 1 / 61
+    assert fused[0].sources == ["yelp", "vector"]
+
+
+def test_fusion_applies_source_weights():
+    fused = reciprocal_rank_fusion(
+        {"yelp": [record("a")], "vector": [record("b")]},
+        weights={"yelp": 0.5, "vector": 2.0}
+    )
+    
+    assert [r.id for r in fused] == ["b", "a"]
+
+
+def test_fusion_ignores_duplicates_within_a_source():
+    fused = reciprocal_rank_fusion({"yelp": [record("a"), record("a"), record("")]}, k=0)
+    
+    assert [r.id for r in fused] == ["a"]
+    assert fused[0].retrieval_score == 1.0
+
+
+def test_fusion_keeps_first_source_data_and_merges_annotations():
+    yelp = record("a", rating=4.5)
+    vector = record(
+        "a",
+        rating=1.0,
+        semantic_score=0.83,
+        reviews=[{"id": "r1", "text": "great pasta"}]
+    )
+    
+    fused = reciprocal_rank_fusion({"yelp": [yelp], "vector": [vector]})
+    
+    assert fused[0] is yelp
+    assert fused[0].rating == 4.5
+    assert fused[0].semantic_score == 0.83
+    assert fused[0].reviews == [{"id": "r1", "text": "great pasta"}]
+
+
+def test_semantic_feature_survives_fusion_into_reranking():
+    # Yelp returns both; only the vector source knows "b" matches the query
+    fused = reciprocal_rank_fusion({
+        "yelp": [record("a"), record("b")],
+        "vector": [record("b", semantic_score=0.9), record("a", semantic_score=0.1)]
+    })
+    
+    reranker = Reranker({"semantic": 1.0})
+    matrix = reranker.feature_matrix(fused)
+    column = FEATURES.index("semantic")
+    semantic = {r.id: matrix[i, column] for i, r in enumerate(fused)}
+    
+    assert semantic == {"a": 0.1, "b": 0.9}
+    assert [r.id for r in reranker.rerank(fused)] == ["b", "a"]
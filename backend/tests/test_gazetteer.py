@@ -0,0 +1,99 @@
+"""Tests for address normalization and the offline gazetteer"""
+
+import pytest
+
+from app.core.gazetteer import Gazetteer, normalize_address
+
+DATA = {
+    "states": {"CA": "California", "NV": "Nevada", "NY": "New York"},
+    "places": [
+        {"name": "San Francisco", "type": "city", "state": "CA",
+         "latitude": 37.7749, "longitude": -122.4194, "aliases": ["sf"]},
+        {"name": "New York", "type": "city", "state": "NY",
+         "latitude": 40.7128, "longitude": -74.006, "aliases": ["nyc"]},
+        {"name": "Palo Alto", "type": "city", "state": "CA",
+         "latitude": 37.4419, "longitude": -122.143},
+        {"name": "Las Vegas", "type": "city", "state": "NV",
+         "latitude": 36.1699, "longitude": -115.1398},
+        {"name": "Mission District", "type": "neighborhood", "city": "San Francisco", "state": "CA",
+         "latitude": 37.7599, "longitude": -122.4148, "aliases": ["the mission"]},
+        {"name": "Chinatown", "type": "neighborhood", "city": "San Francisco", "state": "CA",
+         "latitude": 37.7941, "longitude": -122.4078},
+        {"name": "Chinatown", "type": "neighborhood", "city": "New York", "state": "NY",
+         "latitude": 40.7158, "longitude": -73.997}
+    ],
+    "postal_codes": {
+        "94102": {"latitude": 37.7793, "longitude": -122.4193,
+                  "city": "San Francisco", "state": "CA"}
+    }
+}
+
+
+@pytest.fixture
+def gazetteer() -> Gazetteer:
+    return Gazetteer(DATA)
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("St. Louis, MO", "st louis mo"),
+    ("Washington, D.C., USA", "washington dc"),
+    ("  San   Francisco, CA 94102-1234 ", "san francisco ca 94102"),
+    ("Fisherman's Wharf & Pier 39", "fishermans wharf and pier 39"),
+    ("USA", "usa"),
+    ("!!!", "")
+])
+def test_normalize_address(address, expected):
+    assert normalize_address(address) == expected
+
+
+@pytest.mark.parametrize("address", [
+    "San Francisco", "san francisco, ca", "SF", "San Francisco, California, USA"
+])
+def test_city_names_aliases_and_qualifiers(gazetteer, address):
+    result = gazetteer.lookup(address)
+    
+    assert (result["latitude"], result["longitude"]) == (37.7749, -122.4194)
+    assert result["formatted_address"] == "San Francisco, CA, USA"
+    assert result["source"] == "gazetteer"
+
+
+def test_neighborhoods_are_qualified_by_any_city_name(gazetteer):
+    assert gazetteer.lookup("the mission, sf")["formatted_address"] == (
+        "Mission District, San Francisco, CA, USA"
+    )
+    assert gazetteer.lookup("Mission District")["type"] == "neighborhood"
+
+
+def test_ambiguous_names_only_resolve_when_qualified(gazetteer):
+    assert gazetteer.lookup("Chinatown") is None
+    assert gazetteer.lookup("Chinatown, New York")["latitude"] == 40.7158
+    assert gazetteer.lookup("chinatown nyc")["latitude"] == 40.7158
+
+
+@pytest.mark.parametrize("address", [
+    "downtown San Francisco", "near sf", "in greater San Francisco, CA"
+])
+def test_position_words_resolve_the_place_after_them(gazetteer, address):
+    assert gazetteer.lookup(address)["latitude"] == 37.7749
+
+
+@pytest.mark.parametrize("address", [
+    "South San Francisco", "East Palo Alto", "North Las Vegas, NV", "Old Town San Francisco"
+])
+def test_other_prefixes_are_left_to_the_geocoder(gazetteer, address):
+    assert gazetteer.lookup(address) is None
+
+
+def test_postal_codes(gazetteer):
+    result = gazetteer.lookup("94102")
+    
+    assert result["type"] == "postal_code"
+    assert result["formatted_address"] == "San Francisco, CA 94102, USA"
+    assert gazetteer.lookup("10001") is None
+
+
+@pytest.mark.parametrize("address", [
+    "1 Market Street, San Francisco", "500 Howard St", "Unit 5, 94102 94103", "Atlantis", ""
+])
+def test_street_addresses_and_unknown_places_are_left_to_the_geocoder(gazetteer, address):
+    assert gazetteer.lookup(address) is None
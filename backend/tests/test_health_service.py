@@ -0,0 +1,39 @@
+"""Tests for the readiness decision"""
+
+import pytest
+
+from app.config import settings
+from app.core.cache import cache_manager
+from app.services.health_service import health_service
+from app.services.startup import startup_manager
+
+
+def health(cache: str = "healthy") -> dict:
+    return {"services": {"mcp_server": "healthy", "cache": cache, "vector_db": "healthy"}}
+
+
+@pytest.fixture(autouse=True)
+def live_and_started(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_mode", "live")
+    monkeypatch.setattr(startup_manager, "ready", True)
+    monkeypatch.setattr(cache_manager, "_connected", True)
+
+
+@pytest.mark.parametrize("cache", ["healthy", "timeout", "unhealthy"])
+def test_redis_ping_results_do_not_gate_readiness(cache):
+    assert health_service.readiness(health(cache)) == {"ready": True, "reasons": []}
+
+
+def test_live_mode_needs_a_redis_connection(monkeypatch):
+    monkeypatch.setattr(cache_manager, "_connected", False)
+    
+    assert health_service.readiness(health("disconnected"))["reasons"] == ["cache"]
+    
+    monkeypatch.setattr(settings, "upstream_mode", "replay")
+    assert health_service.readiness(health("disconnected"))["ready"]
+
+
+def test_not_ready_while_warming_up(monkeypatch):
+    monkeypatch.setattr(startup_manager, "ready", False)
+    
+    assert health_service.readiness(health())["reasons"] == ["warming_up"]
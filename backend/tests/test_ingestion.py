@@ -0,0 +1,140 @@
+"""Tests for incremental ingestion planning and failure accounting"""
+
+import pytest
+
+from app.core.lexical_index import LexicalIndex
+from app.services import ingestion_service as ingestion_module
+from app.services.ingestion_service import IngestionManifest, IngestionService
+
+
+def business(business_id: str, name: str = "Trattoria", rating: float = 4.5) -> dict:
+    return {
+        "id": business_id,
+        "name": name,
+        "rating": rating,
+        "review_count": 10,
+        "price": "$$",
+        "categories": [{"alias": "italian", "title": "Italian"}],
+        "location": {"address1": "1 Main St", "city": "San Francisco"},
+        "coordinates": {"latitude": 37.77, "longitude": -122.42}
+    }
+
+
+def ingested(service: IngestionService, manifest: IngestionManifest, restaurants: list):
+    """Record restaurants in the manifest as if a previous run stored them"""
+    plan = service.plan(restaurants, manifest)
+    service._record(manifest, plan.embed)
+
+
+@pytest.fixture
+def service() -> IngestionService:
+    return IngestionService()
+
+
+@pytest.fixture
+def manifest(tmp_path) -> IngestionManifest:
+    return IngestionManifest(str(tmp_path / "manifest.json"))
+
+
+@pytest.fixture
+def upstream(monkeypatch, tmp_path):
+    """Fake embedding, vector DB and Yelp review calls; calls are recorded"""
+    calls = {"store": [], "patch": [], "delete": [], "fail": set()}
+    
+    async def generate_embeddings(texts):
+        return [[0.0] for _ in texts]
+    
+    async def store_embeddings(ids, embeddings, metadata):
+        calls["store"].append(ids)
+        return "store" not in calls["fail"]
+    
+    async def update_payloads(ids, metadata):
+        calls["patch"].append(ids)
+        return "patch" not in calls["fail"]
+    
+    async def delete_embeddings(ids):
+        calls["delete"].append(ids)
+        return "delete" not in calls["fail"]
+    
+    async def get_business_reviews(business_id, limit=3):
+        return {"reviews": [{"id": f"{business_id}-r1", "rating": 5, "text": "Great"}]}
+    
+    monkeypatch.setattr(
+        ingestion_module.embedding_service, "generate_embeddings", generate_embeddings
+    )
+    monkeypatch.setattr(ingestion_module.mcp_client, "store_embeddings", store_embeddings)
+    monkeypatch.setattr(ingestion_module.mcp_client, "update_payloads", update_payloads)
+    monkeypatch.setattr(ingestion_module.mcp_client, "delete_embeddings", delete_embeddings)
+    monkeypatch.setattr(ingestion_module.mcp_client, "get_business_reviews", get_business_reviews)
+    lexical = LexicalIndex(str(tmp_path / "lexical.json"))
+    monkeypatch.setattr(ingestion_module, "lexical_index", lexical)
+    return calls
+
+
+def test_plan_embeds_new_restaurants_once(service, manifest):
+    plan = service.plan([business("a"), business("a"), business("b"), {"name": "no id"}], manifest)
+    
+    assert [item["id"] for item in plan.embed] == ["a", "b"]
+    assert plan.patch == [] and plan.delete == [] and plan.unchanged == 0
+
+
+def test_plan_skips_unchanged_restaurants(service, manifest):
+    ingested(service, manifest, [business("a")])
+    
+    plan = service.plan([business("a")], manifest)
+    
+    assert plan.embed == [] and plan.patch == []
+    assert plan.unchanged == 1
+
+
+def test_plan_reembeds_changed_text_and_patches_payload_only_changes(service, manifest):
+    ingested(service, manifest, [business("a"), business("b")])
+    
+    # The name is embedded; the review count only lives in the payload
+    changed_text = business("a", name="Osteria")
+    changed_payload = {**business("b"), "review_count": 11}
+    plan = service.plan([changed_text, changed_payload], manifest)
+    
+    assert [item["id"] for item in plan.embed] == ["a"]
+    assert [item["id"] for item in plan.patch] == ["b"]
+
+
+def test_plan_prunes_missing_restaurants_only_when_asked(service, manifest):
+    ingested(service, manifest, [business("a"), business("b")])
+    
+    assert service.plan([business("a")], manifest).delete == ["b"]
+    assert service.plan([business("a")], manifest, prune=False).delete == []
+
+
+async def test_ingest_counts_stored_restaurants_and_reviews(service, manifest, upstream):
+    stats = await service.ingest([business("a"), business("b")], manifest=manifest)
+    
+    assert stats["embedded"] == 2 and stats["failed"] == 0
+    assert stats["reviews_embedded"] == 2 and stats["reviews_failed"] == 0
+    assert set(manifest.entries) == {"a", "b"}
+
+
+async def test_ingest_counts_failed_batches_and_leaves_them_for_the_next_run(
+    service, manifest, upstream
+):
+    upstream["fail"].add("store")
+    
+    stats = await service.ingest([business("a"), business("b")], manifest=manifest, batch_size=1)
+    
+    assert stats["embedded"] == 0 and stats["failed"] == 2
+    assert manifest.entries == {}
+    
+    upstream["fail"].clear()
+    stats = await service.ingest([business("a"), business("b")], manifest=manifest)
+    assert stats["embedded"] == 2 and stats["failed"] == 0
+
+
+async def test_ingest_counts_failed_patches_and_deletes(service, manifest, upstream):
+    await service.ingest([business("a"), business("b")], manifest=manifest)
+    upstream["fail"].update({"patch", "delete"})
+    
+    stats = await service.ingest([{**business("a"), "review_count": 11}], manifest=manifest)
+    
+    assert stats["patched"] == 0 and stats["deleted"] == 0
+    assert stats["failed"] == 2
+    assert "b" in manifest.entries
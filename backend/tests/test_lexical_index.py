@@ -0,0 +1,70 @@
+"""Tests for the BM25 lexical index"""
+
+import math
+
+import pytest
+
+from app.core.lexical_index import LexicalIndex, tokenize
+
+
+@pytest.fixture
+def index(tmp_path) -> LexicalIndex:
+    index = LexicalIndex(str(tmp_path / "lexical.json"), k1=1.2, b=0.75)
+    index.upsert("a", "Cacio e pepe and carbonara", {"type": "restaurant", "name": "A"})
+    index.upsert("b", "Carbonara carbonara carbonara", {"type": "restaurant", "name": "B"})
+    index.upsert("a:review:1", "The tonkotsu ramen is rich", {"type": "review", "business_id": "a"})
+    return index
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The Best Pho in SF, isn't it?") == ["best", "pho", "sf", "isn't"]
+
+
+def test_search_ranks_by_term_frequency_and_rarity(index):
+    results = index.search("carbonara")
+    
+    assert [doc_id for doc_id, _ in results] == ["b", "a"]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_search_matches_bm25_formula(index):
+    (doc_id, score), = index.search("tonkotsu")
+    
+    # df = 1 of 3 documents; the review has 3 terms, the average is 10/3
+    idf = math.log(1 + (3 - 1 + 0.5) / (1 + 0.5))
+    norm = 1.2 * (1 - 0.75 + 0.75 * 3 / (10 / 3))
+    assert doc_id == "a:review:1"
+    assert score == pytest.approx(idf * 2.2 / (1 + norm))
+
+
+def test_search_without_matching_terms(index):
+    assert index.search("sushi") == []
+    assert LexicalIndex("unused.json").search("carbonara") == []
+
+
+def test_upsert_replaces_and_remove_deletes(index):
+    index.upsert("b", "Sushi omakase", {"type": "restaurant", "name": "B"})
+    assert [doc_id for doc_id, _ in index.search("carbonara")] == ["a"]
+    
+    index.remove("b")
+    index.remove("missing")
+    assert index.search("sushi") == []
+    assert "b" not in index and len(index) == 2
+    assert index.total_length == 4 + 3
+
+
+def test_restaurants_excludes_reviews(index):
+    assert set(index.restaurants()) == {"a", "b"}
+
+
+def test_save_and_reload_when_the_file_changes(index, tmp_path):
+    index.save()
+    
+    reader = LexicalIndex(str(tmp_path / "lexical.json"), k1=1.2, b=0.75).load()
+    assert reader.search("carbonara") == index.search("carbonara")
+    
+    index.upsert("c", "Spicy ramen", {"type": "restaurant"})
+    index.save()
+    reader._mtime = None  # file mtimes may not tick within one test
+    reader.reload_if_changed()
+    assert "c" in reader
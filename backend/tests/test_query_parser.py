@@ -0,0 +1,78 @@
+"""Tests for the taxonomy query parser and search parameter extraction"""
+
+import re
+
+import pytest
+
+from app.core.query_parser import QueryParser, _trie_pattern
+from app.services.rag_service import RAGService
+
+TAXONOMY = {
+    "cuisine": {"thai": ["thai"], "italian": ["italian", "trattoria"]},
+    "dish": {"pad_thai": ["pad thai"], "pizza": ["pizza", "pizzas"]},
+    "dietary": {"vegan": ["vegan", "plant based"]},
+    "price": {"1,2": ["cheap", "inexpensive"], "4": ["fine dining", "fine"]},
+    "ambience": {"romantic": ["romantic", "date night"], "outdoor_seating": ["patio"]},
+    "sort": {"distance": ["nearest", "closest"]}
+}
+
+
+@pytest.fixture
+def parser() -> QueryParser:
+    return QueryParser(TAXONOMY)
+
+
+def test_trie_pattern_prefers_the_longest_term():
+    pattern = re.compile(_trie_pattern(["fine", "fine dining", "pizza", "pizzas"]))
+    
+    assert pattern.match("fine dining").group(0) == "fine dining"
+    assert pattern.match("pizzas").group(0) == "pizzas"
+
+
+def test_parse_finds_every_kind_in_order(parser):
+    parsed = parser.parse("Cheap vegan Thai with a patio, nearest first")
+    
+    assert parsed.values("price") == ["1,2"]
+    assert parsed.values("dietary") == ["vegan"]
+    assert parsed.values("cuisine") == ["thai"]
+    assert parsed.values("ambience") == ["outdoor_seating"]
+    assert parsed.first("sort") == "distance"
+    assert parsed.first("dish") == ""
+
+
+def test_matches_respect_word_boundaries_and_prefer_longer_terms(parser):
+    assert parser.parse("thailand trip").matches == ()
+    
+    matches = parser.find("Pad Thai or fine dining")
+    assert [(m.kind, m.value, m.text) for m in matches] == [
+        ("dish", "pad_thai", "Pad Thai"),
+        ("price", "4", "fine dining")
+    ]
+    assert (matches[0].start, matches[0].end) == (0, 8)
+
+
+def test_values_are_distinct(parser):
+    assert parser.parse("pizza, more pizzas and a trattoria").values("dish") == ["pizza"]
+
+
+def test_empty_taxonomy_matches_nothing():
+    assert QueryParser({}).find("thai") == []
+
+
+def test_extract_search_params_combines_parsed_terms_and_preferences(monkeypatch, parser):
+    monkeypatch.setattr("app.services.rag_service.query_parser", parser)
+    rag = RAGService()
+    
+    params = rag._extract_search_params("romantic vegan pizza, 4.5 stars, closest", {})
+    assert params == {
+        "term": "pizza vegan",
+        "categories": "restaurants",
+        "sort_by": "distance",
+        "ambience": ["romantic"],
+        "min_rating": 4.5
+    }
+    
+    preferences = {"cuisine": "sushi", "dietary": "gluten free"}
+    params = rag._extract_search_params("cheap thai", preferences)
+    assert params["term"] == "sushi gluten free"
+    assert params["price"] == "1,2"
@@ -0,0 +1,53 @@
+"""Tests for the feature-based reranker"""
+
+import pytest
+
+from app.core.reranker import FEATURES, Reranker
+from app.models.restaurant import RestaurantRecord
+
+
+def record(business_id: str, **fields) -> RestaurantRecord:
+    return RestaurantRecord(id=business_id, name=business_id.title(), **fields)
+
+
+def column(matrix, name: str):
+    return list(matrix[:, FEATURES.index(name)])
+
+
+def test_ambience_match_reads_categories_menu_and_reviews():
+    candidates = [
+        record("a", reviews=[{"text": "Lovely patio, perfect for date night"}]),
+        record("b", menu_summary="Quiet dining room"),
+        record("c", categories=(("sportsbars", "Sports Bars"),)),
+        record("d")
+    ]
+    
+    matrix = Reranker().feature_matrix(
+        candidates,
+        {"ambience": ["romantic", "outdoor_seating"]}
+    )
+    
+    assert column(matrix, "ambience_match") == [1.0, 0.0, 0.0, 0.0]
+
+
+def test_ambience_match_is_zero_without_requested_ambience():
+    candidates = [record("a", reviews=[{"text": "so romantic"}])]
+    
+    assert column(Reranker().feature_matrix(candidates, {}), "ambience_match") == [0.0]
+
+
+def test_ambience_weight_promotes_matching_candidates():
+    candidates = [record("a"), record("b", reviews=[{"text": "Great rooftop views"}])]
+    
+    ranked = Reranker({"ambience_match": 1.0}).rerank(
+        candidates,
+        {"ambience": ["outdoor_seating"]}
+    )
+    
+    assert [r.id for r in ranked] == ["b", "a"]
+    assert ranked[0].rerank_score == 1.0
+
+
+def test_unknown_weights_are_rejected():
+    with pytest.raises(ValueError):
+        Reranker({"ambience": 1.0})
@@ -0,0 +1,81 @@
+"""Tests for call coalescing"""
+
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight, share, shared_calls
+
+
+class Upstream:
+    """Counts calls; each call waits until released"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+    
+    async def call(self, value="result"):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+async def test_concurrent_callers_share_one_call():
+    group, upstream = SingleFlight(), Upstream()
+    
+    waiters = [asyncio.create_task(group.do("key", upstream.call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    upstream.release.set()
+    
+    assert await asyncio.gather(*waiters) == ["result"] * 3
+    assert upstream.calls == 1
+    assert len(group) == 0
+
+
+async def test_keep_memoizes_results_but_not_failures():
+    group, upstream = SingleFlight(keep=True), Upstream()
+    upstream.release.set()
+    
+    assert await group.do("ok", upstream.call) == "result"
+    assert await group.do("ok", upstream.call) == "result"
+    assert upstream.calls == 1
+    
+    with pytest.raises(ValueError):
+        await group.do("bad", lambda: upstream.call(ValueError("boom")))
+    assert await group.do("bad", upstream.call) == "result"
+    assert upstream.calls == 3
+
+
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    group, upstream = SingleFlight(), Upstream()
+    
+    first = asyncio.create_task(group.do("key", upstream.call))
+    second = asyncio.create_task(group.do("key", upstream.call))
+    await asyncio.sleep(0)
+    first.cancel()
+    upstream.release.set()
+    
+    assert await second == "result"
+    assert first.cancelled()
+
+
+async def test_share_only_coalesces_inside_shared_calls():
+    upstream = Upstream()
+    upstream.release.set()
+    
+    await share("test", "key", upstream.call)
+    await share("test", "key", upstream.call)
+    assert upstream.calls == 2
+    
+    with shared_calls(SingleFlight(keep=True)) as group:
+        results = await asyncio.gather(*(share("test", "key", upstream.call) for _ in range(3)))
+        await share("other", "key", upstream.call)
+    
+    assert results == ["result"] * 3
+    assert upstream.calls == 4
+    assert len(group) == 2
+    
+    await share("test", "key", upstream.call)
+    assert upstream.calls == 5
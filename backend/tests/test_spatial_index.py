@@ -0,0 +1,59 @@
+"""Tests for the in-memory spatial index"""
+
+import pytest
+
+from app.core.spatial_index import SpatialIndex
+
+# Roughly 111 m per 0.001 degrees of latitude
+CENTER = (37.7749, -122.4194)
+
+
+def restaurant(restaurant_id: str, north: float) -> dict:
+    """A restaurant ``north`` thousandths of a degree north of CENTER"""
+    return {
+        "id": restaurant_id,
+        "name": restaurant_id,
+        "coordinates": {"latitude": CENTER[0] + north / 1000, "longitude": CENTER[1]}
+    }
+
+
+@pytest.fixture
+def index() -> SpatialIndex:
+    index = SpatialIndex(cell_size=0.01)
+    index.sync({
+        "far": restaurant("far", 50),
+        "near": restaurant("near", 1),
+        "mid": restaurant("mid", 5),
+        "nowhere": {"id": "nowhere", "name": "No coordinates"}
+    })
+    return index
+
+
+def test_within_radius_returns_nearest_first_with_distances(index):
+    results, total = index.within_radius(*CENTER, radius=1000)
+    
+    assert [r["id"] for r in results] == ["near", "mid"] and total == 2
+    assert results[0]["distance"] == pytest.approx(111, abs=1)
+    assert "distance" not in index.records["near"]
+
+
+def test_within_radius_limit_keeps_the_total(index):
+    results, total = index.within_radius(*CENTER, radius=10000, limit=1)
+    
+    assert [r["id"] for r in results] == ["near"] and total == 3
+    assert index.within_radius(*CENTER, radius=50) == ([], 0)
+
+
+def test_nearest_grows_the_radius_until_k_found(index):
+    assert [r["id"] for r in index.nearest(*CENTER, k=2)] == ["near", "mid"]
+    assert [r["id"] for r in index.nearest(*CENTER, k=5)] == ["near", "mid", "far"]
+    assert index.nearest(*CENTER, k=3, max_radius=1000) == index.within_radius(*CENTER, 1000)[0]
+
+
+def test_sync_moves_and_removes_restaurants(index):
+    index.sync({"near": restaurant("near", 60), "mid": restaurant("mid", 5)})
+    
+    assert len(index) == 2
+    assert [r["id"] for r in index.within_radius(*CENTER, radius=1000)[0]] == ["mid"]
+    assert index.covers(CENTER[0] + 0.06, CENTER[1])
+    assert not index.covers(CENTER[0] + 0.05, CENTER[1])
@@ -0,0 +1,105 @@
+"""Tests for vector store setup and filters"""
+
+from types import SimpleNamespace
+
+import pytest
+import qdrant_client
+
+from app.config import settings
+from app.core.vector_store import VectorStore
+
+
+class FakeQdrantClient:
+    """Records collection and index calls; knows the given collections"""
+    
+    def __init__(self, collections):
+        self.collections = list(collections)
+        self.created = []
+        self.indexed = []
+    
+    async def get_collections(self):
+        collections = [SimpleNamespace(name=name) for name in self.collections]
+        return SimpleNamespace(collections=collections)
+    
+    async def create_collection(self, collection_name, vectors_config):
+        self.created.append(collection_name)
+    
+    async def create_payload_index(self, collection_name, field_name, field_schema):
+        self.indexed.append(field_name)
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    def install(collections):
+        client = FakeQdrantClient(collections)
+        monkeypatch.setattr(qdrant_client, "AsyncQdrantClient", lambda **kwargs: client)
+        return client
+    return install
+
+
+@pytest.mark.parametrize("existing", [False, True])
+async def test_initialize_creates_payload_indexes_for_new_and_existing_collections(
+    fake_client, existing
+):
+    store = VectorStore()
+    client = fake_client([store.collection_name] if existing else [])
+    
+    await store.initialize()
+    
+    assert client.created == ([] if existing else [store.collection_name])
+    assert client.indexed == ["type", "parent_id", "business_id"]
+    assert store._initialized
+
+
+def test_build_filter_conditions():
+    search_filter = VectorStore._build_filter({
+        "type": "restaurant",
+        "business_id": ["a", "b"],
+        "rating": {"gte": 4.0}
+    })
+    
+    match, match_any, rating = search_filter.must
+    assert (match.key, match.match.value) == ("type", "restaurant")
+    assert (match_any.key, match_any.match.any) == ("business_id", ["a", "b"])
+    assert (rating.key, rating.range.gte, rating.range.lte) == ("rating", 4.0, None)
+
+
+def test_build_filter_without_conditions():
+    assert VectorStore._build_filter({}) is None
+
+
+def test_point_id_keeps_uuids_and_maps_other_keys_deterministically():
+    uuid = "0f8fad5b-d9cb-469f-a165-70867728950e"
+    
+    assert VectorStore.point_id(uuid) == uuid
+    assert VectorStore.point_id("yelp-id") == VectorStore.point_id("yelp-id")
+    assert VectorStore.point_id("yelp-id") != VectorStore.point_id("other-id")
+
+
+@pytest.mark.parametrize("mode", ["replay", "synthetic"])
+async def test_offline_modes_skip_searches_without_qdrant(monkeypatch, mode):
+    monkeypatch.setattr(settings, "upstream_mode", mode)
+    store = VectorStore()
+    
+    async def unreachable():
+        raise AssertionError("searches should not connect")
+    
+    monkeypatch.setattr(store, "initialize", unreachable)
+    
+    assert await store.search_groups([0.1, 0.2]) == []
+    assert await store.search_similar([0.1, 0.2]) == []
+    assert await store.scroll({"type": "review"}) == []
+
+
+async def test_live_mode_connects_on_demand(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_mode", "live")
+    store = VectorStore()
+    
+    async def unreachable():
+        raise ConnectionError("Qdrant is down")
+    
+    monkeypatch.setattr(store, "initialize", unreachable)
+    
+    assert not store.searches_skipped
+    with pytest.raises(ConnectionError):
+        await store.search_groups([0.1, 0.2])
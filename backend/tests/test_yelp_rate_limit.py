@@ -0,0 +1,62 @@
+"""Tests for which Yelp calls wait for the Yelp rate limiter"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.http import http_pool
+from app.core.rate_limit import RateLimiter
+from app.mcp_server.client import mcp_client
+from app.mcp_server.tools import yelp_business
+
+
+def respond(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path == "/v3/businesses/search":
+        offset = int(request.url.params.get("offset", 0))
+        return httpx.Response(200, json={
+            "businesses": [{"id": f"biz-{offset}", "name": f"Restaurant {offset}"}],
+            "total": 100
+        })
+    if path.endswith("/reviews"):
+        return httpx.Response(200, json={"reviews": [{"id": "r1", "text": "Great"}], "total": 1})
+    return httpx.Response(200, json={"id": path.rsplit("/", 1)[-1]})
+
+
+@pytest.fixture
+def held_limiter(monkeypatch) -> RateLimiter:
+    """A Yelp limiter with a single slot, which the test holds"""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    monkeypatch.setattr(http_pool, "_client", client)
+    limiter = RateLimiter(0, concurrency=1)
+    monkeypatch.setattr(yelp_business, "yelp_limiter", limiter)
+    return limiter
+
+
+async def test_chat_turn_calls_are_not_queued_behind_the_limiter(held_limiter):
+    async with held_limiter:
+        search, reviews, details = await asyncio.wait_for(
+            asyncio.gather(
+                mcp_client.search_restaurants(location="San Francisco, CA", term="sushi"),
+                mcp_client.get_business_reviews("biz-0"),
+                mcp_client.get_business_details("biz-0")
+            ),
+            timeout=1.0
+        )
+    
+    assert [r.id for r in search["businesses"]] == ["biz-0"]
+    assert reviews["total"] == 1
+    assert details["id"] == "biz-0"
+
+
+async def test_search_paging_waits_for_the_limiter(held_limiter):
+    async def collect():
+        return [b["id"] async for b in yelp_business.iter_businesses(location="SF", page_size=50)]
+    
+    async with held_limiter:
+        paging = asyncio.create_task(collect())
+        await asyncio.sleep(0.05)
+        assert not paging.done()
+    
+    assert await asyncio.wait_for(paging, timeout=1.0) == ["biz-0", "biz-50"]